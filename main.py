@@ -3,10 +3,6 @@ import asyncio
 import sys
 import os
 import logging
-from datetime import datetime
-import pytz
-import requests
-import win32api
 import time
 from dotenv import load_dotenv
 
@@ -24,17 +20,40 @@ from domain.services.deals.deal_service import DealService
 from domain.services.orders.order_service import OrderService  # Используем .new версию
 from domain.services.orders.order_execution_service import OrderExecutionService  # НОВЫЙ главный сервис
 from domain.services.orders.buy_order_monitor import BuyOrderMonitor  # 🆕 МОНИТОРИНГ ТУХЛЯКОВ
+from domain.services.orders.order_event_service import OrderEventService  # 📨 Поток ордеров
 from domain.factories.order_factory import OrderFactory  # Используем .new версию
 
+# 📊 АНАЛИЗ СТАКАНА
+from domain.services.market_data.orderbook_analyzer import OrderBookAnalyzer
+from domain.services.market_data.orderbook_service import OrderBookService
+from domain.services.trading.trading_decision_engine import TradingDecisionEngine
+from domain.services.market_data.history_warmup_service import HistoryWarmupService
+from domain.services.market_data.market_data_cache_service import MarketDataCacheService
+from domain.services.trading.balance_service import BalanceService
+from domain.services.indicators.indicator_checkpoint_service import IndicatorCheckpointService
+from domain.services.indicators.batched_indicator_engine import BatchedIndicatorEngine
+
 # 🚀 ОБНОВЛЕННЫЕ РЕПОЗИТОРИИ
 from infrastructure.repositories.deals_repository import InMemoryDealsRepository
 from infrastructure.repositories.orders_repository import InMemoryOrdersRepository  # Используем .new версию
+from infrastructure.repositories.sqlite_repositories import create_sqlite_repositories, SqliteOrdersRepository
+from infrastructure.repositories.order_journal import OrderJournal
+from infrastructure.repositories.closed_orders_archive import ClosedOrdersArchive
+from infrastructure.repositories.order_history_archive import OrderHistoryArchive
+from infrastructure.repositories.write_behind import (
+    WriteBehindQueue, WriteBehindOrdersRepository, WriteBehindDealsRepository
+)
 
 # 🚀 ОБНОВЛЕННЫЕ КОННЕКТОРЫ
 from infrastructure.connectors.pro_exchange_connector import CcxtProMarketDataConnector
 from infrastructure.connectors.exchange_connector import CcxtExchangeConnector  # Используем .new версию
+from infrastructure.connectors.server_clock import ServerClock, set_default_clock
+from infrastructure.connectors.redundant_ticker_feed import RedundantTickerFeed
 from config.config_loader import load_config
 
+# ⚙️ Вынос тяжелых вычислений из event loop
+from application.utils.compute_executor import ComputeExecutor
+
 # Use-case запуска торговли
 from application.use_cases.run_realtime_trading import run_realtime_trading
 
@@ -50,43 +69,13 @@ if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
-def time_sync():
-    """Синхронизация времени с серверами Binance"""
-    try:
-        response = requests.get('https://api.binance.com/api/v3/time')
-        server_time = response.json()['serverTime']
-
-        current_time = datetime.fromtimestamp(server_time / 1000)
-        tz = pytz.timezone('Europe/Kiev')
-        current_time = tz.localize(current_time)
-
-        # Convert to UTC
-        utc_dt = current_time.astimezone(pytz.utc)
-
-        # Use the UTC datetime to set the system time
-        win32api.SetSystemTime(
-            utc_dt.year,
-            utc_dt.month,
-            utc_dt.weekday(),
-            utc_dt.day,
-            utc_dt.hour,
-            utc_dt.minute,
-            utc_dt.second,
-            utc_dt.microsecond // 1000
-        )
-        logger.info("⏰ Time synchronized with Binance servers")
-
-    except Exception as e:
-        logger.warning(f"⚠️ Failed to sync time: {e}")
-
-
 async def main():
     """
     🚀 ГЛАВНАЯ функция с интеграцией OrderExecutionService (Issue #7) + BuyOrderMonitor
     """
 
-    # Синхронизация времени
-    time_sync()
+    # ⏱️ Отсчет холодного старта до первого тика
+    startup_started_at = time.perf_counter()
 
     # Настройки торговой пары из конфигурации
     config = load_config()
@@ -104,6 +93,16 @@ async def main():
 
     # Инициализация переменных для finally блока
     buy_order_monitor = None
+    balance_service = None
+    order_event_service = None
+    server_clock = None
+    ticker_feed = None
+    extra_feed_clients = []
+    order_journal = None
+    cold_tier = None
+    order_history = None
+    persistence_queue = None
+    compute_executor = ComputeExecutor.from_config(config.get("compute_offload", {}))
 
     try:
         # 1. 🏗️ СОЗДАНИЕ ВАЛЮТНОЙ ПАРЫ
@@ -135,6 +134,16 @@ async def main():
             use_sandbox=True
         )
 
+        # ⏰ Время биржи в процессе (смещение NTP-style) вместо установки системных часов
+        clock_cfg = config.get("clock_sync", {})
+        if clock_cfg.get("enabled", True):
+            server_clock = ServerClock.from_config(
+                pro_exchange_connector_prod, clock_cfg,
+                signing_connectors=[pro_exchange_connector_prod, pro_exchange_connector_sandbox]
+            )
+            set_default_clock(server_clock)
+            await server_clock.start()
+
         logger.info("✅ Коннекторы инициализированы")
         logger.info(f"   📡 Production connector: ✅ (live data)")
         logger.info(f"   🧪 Sandbox connector: ✅ (trading operations)")
@@ -143,14 +152,71 @@ async def main():
         # 3. 💾 СОЗДАНИЕ РЕПОЗИТОРИЕВ (Enhanced версии)
         logger.info("💾 Инициализация репозиториев...")
 
-        deals_repo = InMemoryDealsRepository()
-
-        # 🆕 ENHANCED Orders Repository с индексами и поиском
-        orders_repo = InMemoryOrdersRepository(max_orders=50000)
+        persistence_cfg = config.get("persistence", {})
+
+        # 🗃️ Колоночный архив закрытых ордеров: живыми объектами остаются только активные
+        archive_cfg = config.get("orders_archive", {})
+        archive_kwargs = {}
+        if archive_cfg.get("enabled", True):
+            archive_kwargs = {
+                "archive": ClosedOrdersArchive(),
+                "archive_after_ms": int(archive_cfg.get("archive_after_seconds", 300) * 1000),
+                "archive_check_every": archive_cfg.get("check_every_saves", 1000),
+            }
+
+        # 🧊 Холодный уровень: вытесненные по лимиту ордера уходят в SQLite, а не удаляются
+        cold_cfg = config.get("orders_cold_tier", {})
+        if cold_cfg.get("enabled", True) and persistence_cfg.get("backend", "memory") != "sqlite":
+            cold_tier = SqliteOrdersRepository.from_path(cold_cfg.get("sqlite_path", "data/orders_cold.db"))
+            archive_kwargs["cold_tier"] = cold_tier
+
+        # 📚 История на диске (дневные файлы, memmap): отчеты за месяцы без хранения в RAM
+        history_cfg = config.get("orders_history", {})
+        if history_cfg.get("enabled", True) and persistence_cfg.get("backend", "memory") != "sqlite":
+            order_history = OrderHistoryArchive.from_config(history_cfg)
+            archive_kwargs["history"] = order_history
+
+        if cold_tier is not None or order_history is not None:
+            # ⏳ Вытесненные ордера пишутся на диск в фоне, а не внутри save()
+            persistence_queue = WriteBehindQueue.from_config(persistence_cfg)
+            archive_kwargs["persistence_queue"] = persistence_queue
+            await persistence_queue.start()
+
+        if persistence_cfg.get("backend", "memory") == "sqlite":
+            # 🗄️ SQLite (WAL): открытые ордера и сделки переживают падение процесса
+            orders_repo, deals_repo = create_sqlite_repositories(
+                persistence_cfg.get("sqlite_path", "data/trading.db"),
+                synchronous=persistence_cfg.get("sqlite_synchronous", "NORMAL")
+            )
+            repo_kind = f"SQLite ({persistence_cfg.get('sqlite_path', 'data/trading.db')})"
+
+            if persistence_cfg.get("write_behind_enabled", True):
+                # ⏳ Чтение из памяти, запись на диск пакетами в фоне
+                persistence_queue = WriteBehindQueue.from_config(persistence_cfg)
+                orders_repo = WriteBehindOrdersRepository(orders_repo, persistence_queue)
+                deals_repo = WriteBehindDealsRepository(deals_repo, persistence_queue)
+                orders_repo.load()
+                deals_repo.load()
+                await persistence_queue.start()
+                repo_kind += f" + write-behind ({persistence_queue.max_latency_ms:.0f}ms)"
+        elif persistence_cfg.get("backend") == "journal":
+            # 📒 InMemory + журнал событий: снимок и хвост журнала при старте
+            order_journal = OrderJournal.from_config(persistence_cfg)
+            orders_repo = InMemoryOrdersRepository(max_orders=50000, journal=order_journal, **archive_kwargs)
+            deals_repo = InMemoryDealsRepository(journal=order_journal, orders_repo=orders_repo)
+            order_journal.recover(orders_repo, deals_repo)
+            await order_journal.start()
+            repo_kind = f"InMemory + journal ({order_journal.journal_dir})"
+        else:
+            # 🆕 ENHANCED Orders Repository с индексами и поиском
+            orders_repo = InMemoryOrdersRepository(max_orders=50000, **archive_kwargs)
+            # Завершенные сделки держат id ордеров, а не объекты: архив освобождает память
+            deals_repo = InMemoryDealsRepository(orders_repo=orders_repo)
+            repo_kind = "Enhanced InMemory (max: 50K)"
 
         logger.info("✅ Репозитории созданы")
-        logger.info(f"   📋 Deals repository: InMemory")
-        logger.info(f"   📦 Orders repository: Enhanced InMemory (max: 50K)")
+        logger.info(f"   📋 Deals repository: {repo_kind}")
+        logger.info(f"   📦 Orders repository: {repo_kind}")
 
         # 4. 🏭 СОЗДАНИЕ ФАБРИК (Enhanced версии)
         logger.info("🏭 Инициализация фабрик...")
@@ -178,13 +244,41 @@ async def main():
         # 5. 🎛️ СОЗДАНИЕ СЕРВИСОВ (Issue #7)
         logger.info("🎛️ Создание торговых сервисов...")
 
+        # 📡 Общий кеш тикеров/стаканов из websocket (REST fallback через prod коннектор)
+        market_data_cfg = config.get("market_data_cache", {})
+        market_data_cache = None
+        if market_data_cfg.get("enabled", True):
+            market_data_cache = MarketDataCacheService(
+                exchange_connector=pro_exchange_connector_prod,
+                default_max_age_ms=market_data_cfg.get("max_age_ms", 2000)
+            )
+
+        # 💰 Баланс в памяти по watch_balance + локальные резервы под ордера
+        balance_cfg = config.get("balance", {})
+        if balance_cfg.get("enabled", True):
+            balance_service = BalanceService(
+                exchange_connector=pro_exchange_connector_sandbox,
+                reconcile_interval_seconds=balance_cfg.get("reconcile_interval_seconds", 60),
+                max_age_ms=balance_cfg.get("max_age_ms", 120000)
+            )
+
         # 🚀 ENHANCED Order Service с реальным API
         order_service = OrderService(
             orders_repo=orders_repo,
             order_factory=order_factory,
-            exchange_connector=pro_exchange_connector_sandbox  # Подключаем реальный API
+            exchange_connector=pro_exchange_connector_sandbox,  # Подключаем реальный API
+            balance_service=balance_service
         )
 
+        # 📨 Обновления ордеров из watch_orders / watch_my_trades
+        order_events_cfg = config.get("order_events", {})
+        if order_events_cfg.get("enabled", True):
+            order_event_service = OrderEventService(
+                order_service=order_service,
+                exchange_connector=pro_exchange_connector_sandbox,
+                reconcile_interval_seconds=order_events_cfg.get("reconcile_interval_seconds", 300)
+            )
+
         # Deal Service (остается старым)
         deal_service = DealService(deals_repo, order_service, deal_factory)
 
@@ -192,7 +286,11 @@ async def main():
         order_execution_service = OrderExecutionService(
             order_service=order_service,
             deal_service=deal_service,
-            exchange_connector=pro_exchange_connector_sandbox
+            exchange_connector=pro_exchange_connector_sandbox,
+            market_data_cache=market_data_cache,
+            balance_service=balance_service,
+            order_event_service=order_event_service,
+            persistence_queue=persistence_queue
         )
 
         # 🕒 НОВЫЙ BuyOrderMonitor (мониторинг тухляков)
@@ -201,14 +299,68 @@ async def main():
             exchange_connector=pro_exchange_connector_sandbox,
             max_age_minutes=15.0,           # 15 минут максимум
             max_price_deviation_percent=3.0, # 3% отклонение цены
-            check_interval_seconds=60       # Проверка каждую минуту
+            check_interval_seconds=60,      # Проверка каждую минуту
+            market_data_cache=market_data_cache
         )
 
+        # 📊 Фоновый мониторинг стакана + фильтр BUY сигналов
+        orderbook_cfg = config.get("orderbook_analyzer", {})
+        trading_cfg = config.get("trading", {})
+        orderbook_service = None
+        decision_engine = None
+        if orderbook_cfg.get("enabled", True):
+            orderbook_analyzer = OrderBookAnalyzer(orderbook_cfg, compute_executor=compute_executor)
+            orderbook_service = OrderBookService(orderbook_analyzer, market_data_cache=market_data_cache)
+            decision_engine = TradingDecisionEngine(orderbook_analyzer)
+
+        # 🔥 Прогрев индикаторов историческими свечами
+        warmup_cfg = config.get("warmup", {})
+        warmup_service = None
+        if warmup_cfg.get("enabled", True):
+            warmup_service = HistoryWarmupService.from_config(pro_exchange_connector_prod, warmup_cfg)
+
+        # 🏁 Резервные потоки тикеров: первая пришедшая копия каждого обновления
+        feeds_cfg = config.get("redundant_feeds", {})
+        # Потоки 'book' (синтетический тикер из стакана) - только по явному enabled
+        enabled_feeds = [feed for feed in feeds_cfg.get("feeds", [])
+                         if feed.get("enabled", feed.get("kind", "ticker") != "book")]
+        if feeds_cfg.get("enabled", True) and len(enabled_feeds) > 1:
+            feed_clients, feed_kinds = {}, {}
+            for feed in enabled_feeds:
+                if feed.get("ws_url"):
+                    client = CcxtProMarketDataConnector(exchange_name="binance", ws_url=feed["ws_url"]).client
+                    extra_feed_clients.append(client)
+                else:
+                    client = pro_exchange_connector_prod.async_client
+                feed_clients[feed["name"]] = client
+                feed_kinds[feed["name"]] = feed.get("kind", "ticker")
+            ticker_feed = RedundantTickerFeed.from_clients(
+                feed_clients, feed_kinds, dedup_window=feeds_cfg.get("dedup_window", 2048)
+            )
+
+        # 💾 Чекпоинт состояния индикаторов для быстрых рестартов
+        checkpoint_cfg = config.get("indicator_checkpoint", {})
+        checkpoint_service = None
+        if checkpoint_cfg.get("enabled", True):
+            checkpoint_service = IndicatorCheckpointService.from_config(checkpoint_cfg)
+
+        # 📊 Пакетный расчет индикаторов (numpy по всем парам) вместо talib на каждую пару
+        indicator_engine_cfg = config.get("indicator_engine", {})
+        indicator_engine = None
+        if indicator_engine_cfg.get("batched", False):
+            indicator_engine = BatchedIndicatorEngine.from_config(indicator_engine_cfg)
+
         logger.info("✅ Торговые сервисы созданы")
         logger.info(f"   🎛️ OrderService: Enhanced с реальным API")
         logger.info(f"   💼 DealService: Standard")
         logger.info(f"   🚀 OrderExecutionService: НОВЫЙ главный сервис")
         logger.info(f"   🕒 BuyOrderMonitor: Мониторинг протухших BUY ордеров")
+        logger.info(f"   ⚙️ Compute offload: {compute_executor.mode} (workers: {compute_executor.max_workers})")
+        logger.info(f"   📊 OrderBook gating: {'✅' if orderbook_service else '❌'} "
+                    f"(max age: {trading_cfg.get('orderbook_max_age_ms', 2000)}ms)")
+        logger.info(f"   📊 Batched indicators: {'✅' if indicator_engine else '❌'}")
+        logger.info(f"   🔥 Warm-up: {'✅' if warmup_service else '❌'} "
+                    f"({warmup_cfg.get('limit', 200)} x {warmup_cfg.get('timeframe', '1m')})")
 
         # 6. 🧪 ТЕСТ ПОДКЛЮЧЕНИЯ К БИРЖЕ
         logger.info("🧪 Тестирование подключения к бирже...")
@@ -229,6 +381,14 @@ async def main():
             logger.error("❌ Завершение работы...")
             return
 
+        if balance_service:
+            await balance_service.start()
+            logger.info(f"   💰 BalanceService: watch_balance + сверка каждые "
+                        f"{balance_service.reconcile_interval_seconds}s")
+
+        if order_event_service:
+            await order_event_service.start()
+
         # 7. ⚙️ НАСТРОЙКА OrderExecutionService
         logger.info("⚙️ Настройка OrderExecutionService...")
 
@@ -284,7 +444,17 @@ async def main():
             currency_pair=currency_pair,
             deal_service=deal_service,
             order_execution_service=order_execution_service,  # 🆕 Передаем новый сервис
-            buy_order_monitor=buy_order_monitor  # 🕒 Передаем монитор тухляков
+            buy_order_monitor=buy_order_monitor,  # 🕒 Передаем монитор тухляков
+            orderbook_service=orderbook_service,  # 📊 Фоновые метрики стакана
+            decision_engine=decision_engine,
+            trading_config=trading_cfg,
+            compute_executor=compute_executor,  # ⚙️ talib/анализ вне event loop
+            indicator_engine=indicator_engine,  # 📊 Пакетные индикаторы (если включены)
+            warmup_service=warmup_service,  # 🔥 Прогрев индикаторов до старта
+            checkpoint_service=checkpoint_service,  # 💾 Чекпоинт индикаторов
+            market_data_cache=market_data_cache,  # 📡 Тикеры для предпроверок и мониторов
+            startup_started_at=startup_started_at,  # ⏱️ Холодный старт до первого тика
+            ticker_feed=ticker_feed  # 🏁 Гонка резервных потоков тикеров
         )
 
     except Exception as e:
@@ -298,6 +468,32 @@ async def main():
                 buy_order_monitor.stop_monitoring()
                 logger.info("🔴 BuyOrderMonitor остановлен")
 
+            if balance_service:
+                await balance_service.stop()
+
+            if order_event_service:
+                await order_event_service.stop()
+
+            if server_clock:
+                await server_clock.stop()
+
+            if ticker_feed:
+                await ticker_feed.stop()
+
+            if order_journal:
+                await order_journal.stop()
+
+            if persistence_queue:
+                await persistence_queue.stop()
+            if cold_tier:
+                cold_tier.db.close()
+            if order_history:
+                order_history.close()
+            for client in extra_feed_clients:
+                await client.close()
+
+            compute_executor.shutdown(wait=False)
+
         except Exception as e:
             logger.error(f"❌ Error closing connections: {e}")
 
@@ -4,14 +4,24 @@
 import asyncio
 import time
 import logging
+from typing import Any, Dict, Optional
 
 from domain.entities.currency_pair import CurrencyPair
 from domain.services.deals.deal_service import DealService
 from infrastructure.connectors.exchange_connector import CcxtExchangeConnector
+from domain.clock import now_ms
+from infrastructure.connectors.redundant_ticker_feed import RedundantTickerFeed
 from infrastructure.repositories.tickers_repository import InMemoryTickerRepository
 from domain.services.market_data.ticker_service import TickerService
+from domain.services.indicators.batched_indicator_engine import BatchedIndicatorEngine
+from domain.services.market_data.history_warmup_service import HistoryWarmupService
+from domain.services.indicators.indicator_checkpoint_service import IndicatorCheckpointService
+from domain.services.market_data.market_data_cache_service import MarketDataCacheService
 from application.utils.performance_logger import PerformanceLogger
+from application.utils.compute_executor import ComputeExecutor, EventLoopLagMonitor
 from domain.services.trading.signal_cooldown_manager import SignalCooldownManager
+from domain.services.trading.trading_decision_engine import TradingDecisionEngine
+from domain.services.market_data.orderbook_service import OrderBookService
 
 logger = logging.getLogger(__name__)
 
@@ -23,22 +33,125 @@ async def run_realtime_trading(
     deal_service: DealService,
     order_execution_service,
     buy_order_monitor,
+    orderbook_service: Optional[OrderBookService] = None,
+    decision_engine: Optional[TradingDecisionEngine] = None,
+    trading_config: Optional[Dict[str, Any]] = None,
+    compute_executor: Optional[ComputeExecutor] = None,
+    indicator_engine: Optional[BatchedIndicatorEngine] = None,
+    warmup_service: Optional[HistoryWarmupService] = None,
+    checkpoint_service: Optional[IndicatorCheckpointService] = None,
+    market_data_cache: Optional[MarketDataCacheService] = None,
+    startup_started_at: Optional[float] = None,
+    ticker_feed: Optional[RedundantTickerFeed] = None,
 ):
-    """Simplified trading loop using OrderExecutionService and BuyOrderMonitor."""
+    """Simplified trading loop using OrderExecutionService and BuyOrderMonitor.
+
+    When ``orderbook_service`` and ``decision_engine`` are given, BUY signals are
+    gated by the background-maintained ``OrderBookService.latest_metrics`` only,
+    so the signal path never waits for a REST ``fetch_order_book``.
+
+    ``compute_executor`` moves talib indicator updates off the event loop;
+    repository reads (statistics) stay on the loop, since the loop mutates
+    the repository. Loop lag is sampled and reported with the periodic
+    statistics.
+
+    ``indicator_engine`` is a shared ``BatchedIndicatorEngine``: when several
+    trading loops run in one process, their medium/heavy indicators are
+    computed together in one vectorized pass instead of per pair.
+
+    ``warmup_service`` pre-fills ticker and indicator buffers from historical
+    OHLCV (local cache file or ``fetch_ohlcv``) before the websocket loop, so
+    signals are available right after a restart instead of after 50 ticks.
+
+    ``checkpoint_service`` restores a recent binary checkpoint of the price
+    history and indicator caches (skipping the warm-up download when it is
+    sufficient) and saves a new one periodically and on shutdown.
+
+    ``market_data_cache`` receives every websocket ticker so services that
+    need the current price read it from memory instead of REST.
+
+    ``startup_started_at`` is the ``time.perf_counter()`` value taken when the
+    process started; the cold-start time until the first processed tick is
+    logged against the one-second target.
+
+    ``ticker_feed`` races several independent ticker streams and yields the
+    first copy of each update; without it the loop reads ``watch_ticker`` of
+    the production connector directly.
+    """
 
     repository = InMemoryTickerRepository(max_size=5000)
-    ticker_service = TickerService(repository)
+    ticker_service = TickerService(
+        repository,
+        compute_executor=compute_executor,
+        batched_engine=indicator_engine,
+        symbol=currency_pair.symbol,
+    )
+    loop_lag_monitor = EventLoopLagMonitor()
     logger_perf = PerformanceLogger(log_interval_seconds=10)
     cooldown_manager = SignalCooldownManager()
 
+    trading_config = trading_config or {}
+    orderbook_gating_enabled = (
+        orderbook_service is not None
+        and decision_engine is not None
+        and trading_config.get("enable_orderbook_validation", True)
+    )
+    orderbook_max_age_ms = trading_config.get("orderbook_max_age_ms", 2000)
+    orderbook_confidence_threshold = trading_config.get("orderbook_confidence_threshold", 0.0)
+    require_orderbook_support = trading_config.get("require_orderbook_support", False)
+    log_orderbook_analysis = trading_config.get("log_orderbook_analysis", True)
+
     counter = 0
+    # ⏱️ Задержка тикеров: метка биржи против времени биржи (now_ms), а не локальных часов
+    feed_latency = {"samples": 0, "total_ms": 0.0, "max_ms": 0.0}
 
     logger.info("🚀 Запуск расширенного торгового цикла с OrderExecutionService + BuyOrderMonitor")
 
+    if orderbook_gating_enabled and not orderbook_service.is_monitoring:
+        await orderbook_service.start_monitoring(
+            pro_exchange_connector_prod.async_client, currency_pair.symbol
+        )
+
+    # ♻️ Восстановление из чекпоинта (если свежий и того же символа)
+    restored_prices = 0
+    if checkpoint_service is not None:
+        restored_prices = checkpoint_service.restore(ticker_service, currency_pair.symbol)
+        if restored_prices:
+            logger.info(
+                "📊 Startup metrics: checkpoint restore %.1fms | prices: %s",
+                checkpoint_service.stats['last_restore_ms'],
+                restored_prices,
+            )
+
+    # 🔥 Прогрев индикаторов историей до подписки на тикеры
+    if warmup_service is not None and len(repository.tickers) < 50:
+        warmup_metrics = await warmup_service.warm_up(ticker_service, currency_pair.symbol)
+        logger.info(
+            "📊 Startup metrics: warm-up %.1fms | source: %s | candles: %s | signal ready: %s",
+            warmup_metrics['duration_ms'],
+            warmup_metrics['source'],
+            warmup_metrics['candles'],
+            warmup_metrics['signal_ready'],
+        )
+
+    await loop_lag_monitor.start_monitoring()
+
+    watch_ticker = (
+        ticker_feed.watch_ticker if ticker_feed is not None
+        else pro_exchange_connector_prod.async_client.watch_ticker
+    )
+
     try:
         while True:
             try:
-                ticker_data = await pro_exchange_connector_prod.async_client.watch_ticker(currency_pair.symbol)
+                ticker_data = await watch_ticker(currency_pair.symbol)
+                if market_data_cache is not None:
+                    market_data_cache.update_ticker(currency_pair.symbol, ticker_data)
+                if ticker_data.get("timestamp"):
+                    latency_ms = max(0.0, now_ms() - float(ticker_data["timestamp"]))
+                    feed_latency["samples"] += 1
+                    feed_latency["total_ms"] += latency_ms
+                    feed_latency["max_ms"] = max(feed_latency["max_ms"], latency_ms)
 
                 start_process = time.time()
                 await ticker_service.process_ticker(ticker_data)
@@ -47,6 +160,14 @@ async def run_realtime_trading(
                 processing_time = end_process - start_process
                 counter += 1
 
+                if counter == 1 and startup_started_at is not None:
+                    cold_start_ms = (time.perf_counter() - startup_started_at) * 1000
+                    log = logger.info if cold_start_ms <= 1000 else logger.warning
+                    log("📊 Startup metrics: cold start %.1fms до первого тика (цель < 1000ms)", cold_start_ms)
+
+                if checkpoint_service is not None and checkpoint_service.should_save(counter):
+                    checkpoint_service.save(ticker_service)
+
                 if len(repository.tickers) < 50:
                     if counter % 100 == 0:
                         logger.info(
@@ -106,8 +227,35 @@ async def run_realtime_trading(
                                 currency_pair.deal_count,
                             )
 
+                            orderbook_gate = None
+                            applied_modifications = None
+                            if orderbook_gating_enabled:
+                                orderbook_gate = decision_engine.gate_buy_signal(
+                                    orderbook_metrics=orderbook_service.get_latest_metrics(),
+                                    metrics_age_ms=orderbook_service.get_metrics_age_ms(),
+                                    max_age_ms=orderbook_max_age_ms,
+                                    confidence_threshold=orderbook_confidence_threshold,
+                                    require_orderbook_support=require_orderbook_support,
+                                )
+                                if log_orderbook_analysis:
+                                    logger.info("   📊 %s", orderbook_gate["reason"])
+
+                                if not orderbook_gate["execute"]:
+                                    logger.info("🚫 BUY отклонен стаканом")
+                                    logger.info("=" * 80)
+                                    continue
+
+                                if orderbook_gate["modifications"]:
+                                    applied_modifications = decision_engine.apply_orderbook_modifications(
+                                        current_price,
+                                        currency_pair.deal_quota,
+                                        orderbook_gate["modifications"],
+                                    )
+                                    for line in applied_modifications["modifications_applied"]:
+                                        logger.info("   %s", line)
+
                             try:
-                                strategy_result = ticker_service.calculate_strategy(
+                                strategy_result = ticker_service.calculate_strategy_with_orderbook(
                                     buy_price=current_price,
                                     budget=currency_pair.deal_quota,
                                     min_step=currency_pair.min_step,
@@ -115,6 +263,7 @@ async def run_realtime_trading(
                                     buy_fee_percent=0.1,
                                     sell_fee_percent=0.1,
                                     profit_percent=currency_pair.profit_markup,
+                                    orderbook_modifications=applied_modifications,
                                 )
 
                                 if isinstance(strategy_result, dict) and "comment" in strategy_result:
@@ -136,6 +285,8 @@ async def run_realtime_trading(
                                             'histogram': hist,
                                         },
                                         'market_price': current_price,
+                                        'orderbook_gate': orderbook_gate,
+                                        'orderbook_modifications': applied_modifications,
                                         'timestamp': int(time.time() * 1000),
                                     },
                                 )
@@ -164,6 +315,7 @@ async def run_realtime_trading(
                     logger.info("   ✅ Успешных: %s", execution_stats["successful_executions"])
                     logger.info("   ❌ Неудачных: %s", execution_stats["failed_executions"])
 
+                    # Счетчики репозитория - O(1), читаем в loop (не в потоке параллельно с записью)
                     order_stats = order_execution_service.order_service.get_statistics()
                     logger.info("   📦 Всего ордеров: %s", order_stats["total_orders"])
                     logger.info("   🔄 Открытых ордеров: %s", order_stats["open_orders"])
@@ -178,6 +330,53 @@ async def run_realtime_trading(
                     logger.info("   ❌ Ордеров отменено: %s", monitor_stats["orders_cancelled"])
                     logger.info("   🔄 Ордеров пересоздано: %s", monitor_stats["orders_recreated"])
 
+                    if feed_latency["samples"]:
+                        logger.info(
+                            "\n📡 Задержка тикеров: avg %.1fms | max %.1fms",
+                            feed_latency["total_ms"] / feed_latency["samples"],
+                            feed_latency["max_ms"],
+                        )
+
+                    if ticker_feed is not None:
+                        for feed_name, feed_stats in ticker_feed.get_statistics()["feeds"].items():
+                            logger.info(
+                                "   🏁 %s: побед %.1f%% | avg %.1fms | отставание %.1fms | ошибок %s",
+                                feed_name,
+                                feed_stats["win_rate"],
+                                feed_stats["avg_latency_ms"],
+                                feed_stats["avg_lag_when_late_ms"],
+                                feed_stats["errors"],
+                            )
+
+                    lag_stats = loop_lag_monitor.get_statistics()
+                    logger.info(
+                        "\n⏱️ Задержка event loop: avg %.1fms | p99 %.1fms | max %.1fms",
+                        lag_stats["avg_lag_ms"],
+                        lag_stats["p99_lag_ms"],
+                        lag_stats["max_lag_ms"],
+                    )
+                    if compute_executor is not None:
+                        for task_name, task_stats in compute_executor.get_statistics()["tasks"].items():
+                            logger.info(
+                                "   ⚙️ %s: %s вызовов | avg %.1fms | max %.1fms | ожидание %.1fms",
+                                task_name,
+                                task_stats["count"],
+                                task_stats["avg_run_ms"],
+                                task_stats["max_run_ms"],
+                                task_stats["avg_wait_ms"],
+                            )
+
+                    exchange_connector = order_execution_service.exchange_connector
+                    if hasattr(exchange_connector, "get_coalescing_statistics"):
+                        coalescing_stats = exchange_connector.get_coalescing_statistics()
+                        logger.info(
+                            "   🔀 Single-flight: %s запросов | из кеша %s | объединено %s | hit rate %.1f%%",
+                            coalescing_stats["requests"],
+                            coalescing_stats["cache_hits"],
+                            coalescing_stats["coalesced"],
+                            coalescing_stats["hit_rate"],
+                        )
+
             except Exception as e:
                 logger.exception("❌ Ошибка в торговом цикле: %s", e)
                 await asyncio.sleep(1)
@@ -185,6 +384,13 @@ async def run_realtime_trading(
     except KeyboardInterrupt:
         logger.info("🛑 Получен сигнал остановки...")
     finally:
+        if checkpoint_service is not None and ticker_service.price_history_cache:
+            checkpoint_service.save(ticker_service)
+
+        if orderbook_service is not None:
+            await orderbook_service.stop_monitoring()
+        await loop_lag_monitor.stop_monitoring()
+
         logger.info("🚨 Выполнение экстренной остановки...")
         emergency_result = await order_execution_service.emergency_stop_all_trading()
         logger.info("🚨 Экстренная остановка завершена: %s", emergency_result)
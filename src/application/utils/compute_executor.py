@@ -0,0 +1,218 @@
+# application/utils/compute_executor.py
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(call: Callable[[], Any]):
+    """Выполняет вызов в воркере и возвращает (результат, старт, финиш)"""
+    started = time.perf_counter()
+    result = call()
+    return result, started, time.perf_counter()
+
+
+class ComputeExecutor:
+    """
+    ⚙️ Вынос тяжелых вычислений (talib, анализ стакана, экспорт, статистика) из event loop
+
+    Режимы:
+    - inline: вызов прямо в цикле (как раньше, удобно для отладки и сравнения)
+    - thread: пул потоков для numpy/talib и прочих вызовов над общими объектами
+    Для чистого Python можно запросить пул процессов (use_process=True),
+    если задан process_workers > 0; функция и аргументы должны быть picklable.
+    """
+
+    MODE_INLINE = "inline"
+    MODE_THREAD = "thread"
+
+    def __init__(self, mode: str = MODE_THREAD, max_workers: int = 2, process_workers: int = 0):
+        if mode not in (self.MODE_INLINE, self.MODE_THREAD):
+            raise ValueError(f"Unknown compute offload mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.process_workers = process_workers
+
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # Статистика по задачам: task_name -> метрики
+        self.task_stats: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'ComputeExecutor':
+        """Создание из секции compute_offload конфигурации"""
+        config = config or {}
+        return cls(
+            mode=config.get("mode", cls.MODE_THREAD),
+            max_workers=config.get("max_workers", 2),
+            process_workers=config.get("process_workers", 0),
+        )
+
+    @property
+    def is_offloading(self) -> bool:
+        return self.mode != self.MODE_INLINE
+
+    async def run(
+        self,
+        func: Callable,
+        *args,
+        task_name: Optional[str] = None,
+        use_process: bool = False,
+        **kwargs
+    ) -> Any:
+        """Выполняет func(*args, **kwargs) согласно режиму и возвращает результат"""
+        name = task_name or getattr(func, "__name__", "task")
+        call = partial(func, *args, **kwargs)
+        submitted = time.perf_counter()
+
+        if not self.is_offloading:
+            try:
+                result = call()
+            except Exception:
+                self._record(name, 0.0, (time.perf_counter() - submitted) * 1000, failed=True)
+                raise
+            self._record(name, 0.0, (time.perf_counter() - submitted) * 1000)
+            return result
+
+        loop = asyncio.get_running_loop()
+        try:
+            result, started, finished = await loop.run_in_executor(
+                self._get_pool(use_process), _timed_call, call
+            )
+        except Exception:
+            self._record(name, 0.0, (time.perf_counter() - submitted) * 1000, failed=True)
+            raise
+
+        self._record(name, (started - submitted) * 1000, (finished - started) * 1000)
+        return result
+
+    def submit(
+        self,
+        func: Callable,
+        *args,
+        task_name: Optional[str] = None,
+        use_process: bool = False,
+        **kwargs
+    ) -> asyncio.Future:
+        """Запускает вычисление в фоне и сразу возвращает future с результатом"""
+        return asyncio.ensure_future(
+            self.run(func, *args, task_name=task_name, use_process=use_process, **kwargs)
+        )
+
+    def _get_pool(self, use_process: bool) -> Executor:
+        if use_process and self.process_workers > 0:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
+
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="compute"
+            )
+        return self._thread_pool
+
+    def _record(self, name: str, wait_ms: float, run_ms: float, failed: bool = False):
+        stats = self.task_stats.get(name)
+        if stats is None:
+            stats = {
+                'count': 0,
+                'errors': 0,
+                'total_run_ms': 0.0,
+                'max_run_ms': 0.0,
+                'total_wait_ms': 0.0,
+                'max_wait_ms': 0.0
+            }
+            self.task_stats[name] = stats
+
+        stats['count'] += 1
+        if failed:
+            stats['errors'] += 1
+        stats['total_run_ms'] += run_ms
+        stats['max_run_ms'] = max(stats['max_run_ms'], run_ms)
+        stats['total_wait_ms'] += wait_ms
+        stats['max_wait_ms'] = max(stats['max_wait_ms'], wait_ms)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика выполнения по задачам"""
+        tasks = {}
+        for name, stats in self.task_stats.items():
+            count = max(stats['count'], 1)
+            tasks[name] = {
+                **stats,
+                'avg_run_ms': stats['total_run_ms'] / count,
+                'avg_wait_ms': stats['total_wait_ms'] / count
+            }
+
+        return {
+            'mode': self.mode,
+            'max_workers': self.max_workers,
+            'process_workers': self.process_workers,
+            'tasks': tasks
+        }
+
+    def shutdown(self, wait: bool = True):
+        """🔚 Остановка пулов"""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=wait)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+
+class EventLoopLagMonitor:
+    """
+    ⏱️ Замер задержки event loop: насколько позже запланированного
+    просыпается короткий sleep. Показывает, блокирует ли что-то цикл.
+    """
+
+    def __init__(self, interval_ms: float = 100, window: int = 1000):
+        self.interval_ms = interval_ms
+        self.samples = deque(maxlen=window)
+        self.is_monitoring = False
+        self._monitoring_task = None
+
+    async def start_monitoring(self):
+        if self.is_monitoring:
+            return
+        self.is_monitoring = True
+        self._monitoring_task = asyncio.create_task(self._probe())
+
+    async def stop_monitoring(self):
+        if not self.is_monitoring:
+            return
+        self.is_monitoring = False
+        if self._monitoring_task:
+            self._monitoring_task.cancel()
+            try:
+                await self._monitoring_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _probe(self):
+        interval = self.interval_ms / 1000
+        while self.is_monitoring:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    def get_statistics(self) -> Dict[str, float]:
+        """📊 Средняя / p99 / максимальная задержка цикла в мс"""
+        if not self.samples:
+            return {'samples': 0, 'avg_lag_ms': 0.0, 'p99_lag_ms': 0.0, 'max_lag_ms': 0.0}
+
+        ordered = sorted(self.samples)
+        p99_index = min(len(ordered) - 1, int(len(ordered) * 0.99))
+        return {
+            'samples': len(ordered),
+            'avg_lag_ms': sum(ordered) / len(ordered),
+            'p99_lag_ms': ordered[p99_index],
+            'max_lag_ms': ordered[-1]
+        }
@@ -0,0 +1,32 @@
+# domain/clock.py
+import time
+from typing import Optional, Protocol
+
+
+class Clock(Protocol):
+    def now_ms(self) -> int:
+        ...
+
+
+# 🌐 ОБЩИЕ ЧАСЫ ПРОЦЕССА
+# Домен знает только про now_ms(); часы биржи (infrastructure.connectors.server_clock.ServerClock)
+# устанавливаются при запуске через set_default_clock.
+
+_default_clock: Optional[Clock] = None
+
+
+def set_default_clock(clock: Optional[Clock]):
+    """Устанавливает часы, которые используют now_ms() во всех компонентах"""
+    global _default_clock
+    _default_clock = clock
+
+
+def get_default_clock() -> Optional[Clock]:
+    return _default_clock
+
+
+def now_ms() -> int:
+    """Время биржи в мс (локальное время, пока часы не установлены)"""
+    if _default_clock is None:
+        return int(time.time() * 1000)
+    return _default_clock.now_ms()
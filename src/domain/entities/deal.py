@@ -1,5 +1,5 @@
 # my_trading_app/domain/entities/deal.py
-import time
+from domain.clock import now_ms
 from .order import Order
 
 class Deal:
@@ -27,7 +27,7 @@ class Deal:
         self.status = status
         self.buy_order = buy_order
         self.sell_order = sell_order
-        self.created_at = created_at or int(time.time() * 1000)
+        self.created_at = created_at or now_ms()
         self.closed_at = closed_at
 
         # Если buy_order или sell_order есть — установим им deal_id
@@ -55,12 +55,12 @@ class Deal:
     def close(self):
         """Простейший метод: пометить сделку как закрытую."""
         self.status = self.STATUS_CLOSED
-        self.closed_at = int(time.time() * 1000)
+        self.closed_at = now_ms()
 
     def cancel(self):
         """Простейший метод: пометить сделку как отменённую."""
         self.status = self.STATUS_CANCELED
-        self.closed_at = int(time.time() * 1000)
+        self.closed_at = now_ms()
 
     def is_open(self) -> bool:
         return self.status == self.STATUS_OPEN
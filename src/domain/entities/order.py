@@ -1,8 +1,9 @@
 # domain/entities/order.py.new - ENHANCED для реальной торговли
-import time
 from typing import Optional, Dict, Any
 from dataclasses import dataclass, field
 
+from domain.clock import now_ms
+
 class Order:
     """
     🚀 РАСШИРЕННАЯ сущность "Ордер" для реальной торговли на бирже
@@ -63,7 +64,7 @@ class Order:
         self.price = price
         self.amount = amount
         self.status = status
-        self.created_at = created_at or int(time.time() * 1000)
+        self.created_at = created_at or now_ms()
         self.closed_at = closed_at
         self.deal_id = deal_id
 
@@ -128,14 +129,20 @@ class Order:
     # 🆕 МЕТОДЫ ОБНОВЛЕНИЯ СТАТУСА
     def update_from_exchange(self, exchange_data: Dict[str, Any]) -> None:
         """Обновляет ордер данными с биржи"""
-        self.exchange_id = exchange_data.get('id', self.exchange_id)
-        self.filled_amount = float(exchange_data.get('filled', self.filled_amount))
-        self.remaining_amount = float(exchange_data.get('remaining', self.remaining_amount))
-        self.average_price = float(exchange_data.get('average', self.average_price))
-        self.fees = float(exchange_data.get('fee', {}).get('cost', self.fees))
+        # В событиях потока (watch_orders) часть полей может прийти как None
+        def value_or(key, default):
+            value = exchange_data.get(key)
+            return default if value is None else value
+
+        self.exchange_id = value_or('id', self.exchange_id)
+        self.filled_amount = float(value_or('filled', self.filled_amount))
+        self.remaining_amount = float(value_or('remaining', self.remaining_amount))
+        self.average_price = float(value_or('average', self.average_price))
+        fee = exchange_data.get('fee') or {}
+        self.fees = float(fee.get('cost') if fee.get('cost') is not None else self.fees)
 
         # Обновляем статус на основе данных биржи
-        exchange_status = exchange_data.get('status', '').lower()
+        exchange_status = (exchange_data.get('status') or '').lower()
         if exchange_status == 'closed':
             self.status = self.STATUS_FILLED
         elif exchange_status == 'canceled':
@@ -146,21 +153,21 @@ class Order:
             else:
                 self.status = self.STATUS_OPEN
 
-        self.last_update = int(time.time() * 1000)
-        self.exchange_timestamp = exchange_data.get('timestamp', self.exchange_timestamp)
+        self.last_update = now_ms()
+        self.exchange_timestamp = value_or('timestamp', self.exchange_timestamp)
 
     def mark_as_placed(self, exchange_id: str, exchange_timestamp: int = None) -> None:
         """Помечает ордер как размещенный на бирже"""
         self.exchange_id = exchange_id
         self.status = self.STATUS_OPEN
-        self.exchange_timestamp = exchange_timestamp or int(time.time() * 1000)
-        self.last_update = int(time.time() * 1000)
+        self.exchange_timestamp = exchange_timestamp or now_ms()
+        self.last_update = now_ms()
 
     def mark_as_failed(self, error_message: str) -> None:
         """Помечает ордер как неудачный"""
         self.status = self.STATUS_FAILED
         self.error_message = error_message
-        self.closed_at = int(time.time() * 1000)
+        self.closed_at = now_ms()
         self.last_update = self.closed_at
 
     # 🆕 МЕТОДЫ ДЛЯ ЗАКРЫТИЯ
@@ -172,13 +179,13 @@ class Order:
             self.average_price = average_price
 
         self.status = self.STATUS_FILLED if self.is_fully_filled() else self.STATUS_PARTIALLY_FILLED
-        self.closed_at = int(time.time() * 1000)
+        self.closed_at = now_ms()
         self.last_update = self.closed_at
 
     def cancel(self, reason: str = None):
         """Отменяет ордер"""
         self.status = self.STATUS_CANCELED
-        self.closed_at = int(time.time() * 1000)
+        self.closed_at = now_ms()
         self.last_update = self.closed_at
         if reason:
             self.error_message = f"Canceled: {reason}"
@@ -0,0 +1,302 @@
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from domain.services.indicators.cached_indicator_service import CachedIndicatorService
+
+logger = logging.getLogger(__name__)
+
+
+def _last_value(values: np.ndarray) -> List[float]:
+    """Округление последних значений так же, как в CachedIndicatorService (NaN -> 0)"""
+    return [round(float(v), 8) if not np.isnan(v) else 0 for v in values]
+
+
+def _ema(matrix: np.ndarray, period: int, seed_index: int) -> np.ndarray:
+    """EMA по оси времени для всех строк; затравка - SMA окна, заканчивающегося на seed_index (как в talib)"""
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] <= seed_index:
+        return result
+
+    k = 2.0 / (period + 1)
+    value = matrix[:, seed_index - period + 1:seed_index + 1].mean(axis=1)
+    result[:, seed_index] = value
+    for t in range(seed_index + 1, matrix.shape[1]):
+        value = (matrix[:, t] - value) * k + value
+        result[:, t] = value
+    return result
+
+
+def _rsi_last(matrix: np.ndarray, period: int) -> np.ndarray:
+    """Последнее значение RSI (сглаживание Уайлдера, как talib.RSI)"""
+    if matrix.shape[1] <= period:
+        return np.full(matrix.shape[0], np.nan)
+
+    diffs = np.diff(matrix, axis=1)
+    gains = np.where(diffs > 0, diffs, 0.0)
+    losses = np.where(diffs < 0, -diffs, 0.0)
+
+    avg_gain = gains[:, :period].sum(axis=1) / period
+    avg_loss = losses[:, :period].sum(axis=1) / period
+    for t in range(period, diffs.shape[1]):
+        avg_gain = (avg_gain * (period - 1) + gains[:, t]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, t]) / period
+
+    total = avg_gain + avg_loss
+    safe_total = np.where(np.abs(total) < 1e-8, 1.0, total)
+    return np.where(np.abs(total) < 1e-8, 0.0, 100.0 * avg_gain / safe_total)
+
+
+def _sma_last(matrix: np.ndarray, period: int) -> np.ndarray:
+    if matrix.shape[1] < period:
+        return np.full(matrix.shape[0], np.nan)
+    return matrix[:, -period:].mean(axis=1)
+
+
+def _medium_values(closes: np.ndarray) -> Dict[str, List[float]]:
+    """RSI(5), RSI(15) для строк матрицы цен (чистая функция: годится для compute_executor)"""
+    return {
+        "rsi_5": _last_value(_rsi_last(closes, 5)),
+        "rsi_15": _last_value(_rsi_last(closes, 15)),
+    }
+
+
+def _heavy_values(closes: np.ndarray) -> Dict[str, List[float]]:
+    """MACD(12,26,9), SMA(75), Bollinger(20,2) для строк матрицы цен (чистая функция)"""
+    fast = _ema(closes, 12, 25)
+    slow = _ema(closes, 26, 25)
+    macd_line = fast - slow
+    signal_line = _ema(np.nan_to_num(macd_line), 9, 33)
+    hist = macd_line - signal_line
+
+    middle = _sma_last(closes, 20)
+    deviation = closes[:, -20:].std(axis=1)
+
+    return {
+        "macd": _last_value(macd_line[:, -1]),
+        "signal": _last_value(signal_line[:, -1]),
+        "histogram": _last_value(hist[:, -1]),
+        "sma_99": _last_value(_sma_last(closes, 75)),
+        "bb_upper": _last_value(middle + 2 * deviation),
+        "bb_middle": _last_value(middle),
+        "bb_lower": _last_value(middle - 2 * deviation),
+    }
+
+
+class BatchedIndicatorEngine:
+    """
+    📊 Пакетный расчет индикаторов для многих пар сразу
+
+    Хранит матрицу цен symbols × window (кольцевой буфер на строку) и считает
+    RSI / MACD / SMA / Bollinger векторно по оси времени для всех пар за один
+    проход numpy вместо отдельного вызова talib на каждую пару.
+    Результаты совпадают с CachedIndicatorService и записываются в его кеши.
+
+    refresh_due_async() снимает копии матриц на event loop, считает их через
+    compute_executor и записывает результаты обратно на loop: буферы цен и
+    кеши пайплайнов меняются только в loop.
+    """
+
+    MEDIUM_WINDOW = 30
+    MIN_HEAVY_HISTORY = 50
+
+    def __init__(self, window: int = 100, initial_capacity: int = 16):
+        if window < self.MIN_HEAVY_HISTORY:
+            raise ValueError(f"window must be >= {self.MIN_HEAVY_HISTORY}")
+
+        self.window = window
+        self._prices = np.zeros((initial_capacity, window))
+        self._heads = np.zeros(initial_capacity, dtype=np.int64)   # Следующая позиция записи
+        self._counts = np.zeros(initial_capacity, dtype=np.int64)  # Сколько цен накоплено (<= window)
+        self._rows: Dict[str, int] = {}
+        self._services: Dict[str, CachedIndicatorService] = {}
+        self._refreshing = False  # Пересчет уже идет в executor
+
+        self.stats = {
+            'medium_batches': 0,
+            'heavy_batches': 0,
+            'symbols_computed': 0,
+            'total_compute_ms': 0.0,
+            'skipped_refreshes': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'BatchedIndicatorEngine':
+        """Создание из секции indicator_engine конфигурации"""
+        config = config or {}
+        return cls(
+            window=config.get("window", 100),
+            initial_capacity=config.get("initial_capacity", 16),
+        )
+
+    # 📥 РЕГИСТРАЦИЯ И ОБНОВЛЕНИЕ ЦЕН
+
+    def register(self, symbol: str, indicator_service: CachedIndicatorService) -> None:
+        """Подключает пайплайн пары: результаты пойдут в его кеш"""
+        if symbol not in self._rows:
+            row = len(self._rows)
+            if row >= self._prices.shape[0]:
+                self._grow()
+            self._rows[symbol] = row
+        self._services[symbol] = indicator_service
+
+    def _grow(self):
+        added = self._prices.shape[0]
+        self._prices = np.vstack([self._prices, np.zeros_like(self._prices)])
+        self._heads = np.concatenate([self._heads, np.zeros(added, dtype=np.int64)])
+        self._counts = np.concatenate([self._counts, np.zeros(added, dtype=np.int64)])
+
+    def push(self, symbol: str, price: float) -> None:
+        """Добавляет цену в строку пары (O(1))"""
+        if not isinstance(price, (int, float)) or np.isnan(price):
+            return
+        row = self._rows[symbol]
+        self._prices[row, self._heads[row]] = price
+        self._heads[row] = (self._heads[row] + 1) % self.window
+        if self._counts[row] < self.window:
+            self._counts[row] += 1
+
+    def get_prices(self, symbol: str) -> np.ndarray:
+        """Накопленные цены пары в хронологическом порядке"""
+        row = self._rows[symbol]
+        return self._ordered(np.array([row]), int(self._counts[row]))[0]
+
+    def _ordered(self, rows: np.ndarray, length: int) -> np.ndarray:
+        """Последние length цен для строк rows, упорядоченные по времени"""
+        offsets = np.arange(length) - length
+        idx = (self._heads[rows][:, None] + offsets[None, :]) % self.window
+        return self._prices[rows[:, None], idx]
+
+    # 🔄 ПАКЕТНЫЙ РАСЧЕТ
+
+    def _due(self) -> Tuple[List[str], List[str]]:
+        """Пары, у которых подошла очередь средних и тяжелых индикаторов"""
+        medium_due = []
+        heavy_due = []
+        for symbol, service in self._services.items():
+            count = self._counts[self._rows[symbol]]
+            if service.should_update_medium() and count >= self.MEDIUM_WINDOW:
+                medium_due.append(symbol)
+            if service.should_update_heavy() and count >= self.MIN_HEAVY_HISTORY:
+                heavy_due.append(symbol)
+        return medium_due, heavy_due
+
+    def refresh_due(self) -> Dict[str, Dict]:
+        """Пересчитывает индикаторы всех пар, у которых подошла очередь, одним батчем"""
+        medium_due, heavy_due = self._due()
+        results: Dict[str, Dict] = {}
+        if medium_due:
+            for symbol, values in self.compute_medium(medium_due).items():
+                results.setdefault(symbol, {}).update(values)
+        if heavy_due:
+            for symbol, values in self.compute_heavy(heavy_due).items():
+                results.setdefault(symbol, {}).update(values)
+        return results
+
+    async def refresh_due_async(self, compute_executor=None) -> Dict[str, Dict]:
+        """
+        refresh_due() с расчетом через compute_executor (None - прямо в loop).
+        Пока пересчет идет, повторные вызовы пропускаются: очередь пар
+        не сбрасывается, и они будут посчитаны следующим вызовом.
+        """
+        if compute_executor is None:
+            return self.refresh_due()
+        if self._refreshing:
+            self.stats['skipped_refreshes'] += 1
+            return {}
+
+        self._refreshing = True
+        try:
+            medium_due, heavy_due = self._due()
+            results: Dict[str, Dict] = {}
+            if medium_due:
+                start = time.perf_counter()
+                symbols, batches = self._medium_batches(medium_due)
+                values = [await compute_executor.run(_medium_values, closes, task_name="batched_medium_indicators")
+                          for _, closes in batches]
+                stored = self._store(batches, values, medium=True)
+                self._record(len(symbols), start)
+                for symbol, symbol_values in stored.items():
+                    results.setdefault(symbol, {}).update(symbol_values)
+            if heavy_due:
+                start = time.perf_counter()
+                symbols, batches = self._heavy_batches(heavy_due)
+                values = [await compute_executor.run(_heavy_values, closes, task_name="batched_heavy_indicators")
+                          for _, closes in batches]
+                stored = self._store(batches, values, medium=False)
+                self._record(len(symbols), start)
+                for symbol, symbol_values in stored.items():
+                    results.setdefault(symbol, {}).update(symbol_values)
+            return results
+        finally:
+            self._refreshing = False
+
+    def _medium_batches(self, symbols: Optional[List[str]]) -> Tuple[List[str], List[Tuple[List[str], np.ndarray]]]:
+        """Копия последних 30 цен пар с достаточной историей: [(пары, матрица)]"""
+        symbols = [s for s in (symbols or list(self._rows))
+                   if self._counts[self._rows[s]] >= self.MEDIUM_WINDOW]
+        if not symbols:
+            return symbols, []
+        rows = np.array([self._rows[s] for s in symbols])
+        return symbols, [(symbols, self._ordered(rows, self.MEDIUM_WINDOW))]
+
+    def _heavy_batches(self, symbols: Optional[List[str]]) -> Tuple[List[str], List[Tuple[List[str], np.ndarray]]]:
+        """Копии цен пар, сгруппированных по длине истории (окно как price_history[-100:])"""
+        symbols = [s for s in (symbols or list(self._rows))
+                   if self._counts[self._rows[s]] >= self.MIN_HEAVY_HISTORY]
+        groups: Dict[int, List[str]] = {}
+        for symbol in symbols:
+            groups.setdefault(int(self._counts[self._rows[symbol]]), []).append(symbol)
+        return symbols, [(group, self._ordered(np.array([self._rows[s] for s in group]), length))
+                         for length, group in groups.items()]
+
+    def _store(self, batches: List[Tuple[List[str], np.ndarray]],
+               values: List[Dict[str, List[float]]], medium: bool) -> Dict[str, Dict]:
+        """Раскладывает столбцы результатов по парам и пишет их в кеши пайплайнов"""
+        results = {}
+        for (group, _), columns in zip(batches, values):
+            for i, symbol in enumerate(group):
+                symbol_values = {name: column[i] for name, column in columns.items()}
+                service = self._services.get(symbol)
+                if service is not None:
+                    if medium:
+                        service.store_medium_cache(symbol_values)
+                    else:
+                        service.store_heavy_cache(symbol_values)
+                results[symbol] = symbol_values
+        if batches:
+            self.stats['medium_batches' if medium else 'heavy_batches'] += 1
+        return results
+
+    def compute_medium(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """RSI(5), RSI(15) по последним 30 ценам для всех переданных пар"""
+        start = time.perf_counter()
+        symbols, batches = self._medium_batches(symbols)
+        if not symbols:
+            return {}
+        results = self._store(batches, [_medium_values(closes) for _, closes in batches], medium=True)
+        self._record(len(symbols), start)
+        return results
+
+    def compute_heavy(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """MACD(12,26,9), SMA(75), Bollinger(20,2) по последним window ценам"""
+        start = time.perf_counter()
+        symbols, batches = self._heavy_batches(symbols)
+        if not symbols:
+            return {}
+        results = self._store(batches, [_heavy_values(closes) for _, closes in batches], medium=False)
+        self._record(len(symbols), start)
+        return results
+
+    def _record(self, symbols_count: int, start: float):
+        self.stats['symbols_computed'] += symbols_count
+        self.stats['total_compute_ms'] += (time.perf_counter() - start) * 1000
+
+    def get_statistics(self) -> Dict:
+        """📊 Статистика пакетных расчетов"""
+        return {
+            'symbols': len(self._rows),
+            'window': self.window,
+            **self.stats
+        }
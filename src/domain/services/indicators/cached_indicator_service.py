@@ -131,6 +131,46 @@ class CachedIndicatorService:
 
         return self.heavy_cache
 
+    def store_medium_cache(self, values: Dict) -> Dict:
+        """Записывает готовые средние индикаторы (например, из BatchedIndicatorEngine)"""
+        self.medium_cache = values
+        self.last_medium_update = self.tick_count
+        return self.medium_cache
+
+    def store_heavy_cache(self, values: Dict) -> Dict:
+        """Записывает готовые тяжелые индикаторы (например, из BatchedIndicatorEngine)"""
+        self.heavy_cache = values
+        self.last_heavy_update = self.tick_count
+        return self.heavy_cache
+
+    def export_state(self) -> Dict:
+        """Полное состояние кешей и инкрементальных буферов для чекпоинта"""
+        return {
+            "fast_cache": dict(self.fast_cache),
+            "medium_cache": dict(self.medium_cache),
+            "heavy_cache": dict(self.heavy_cache),
+            "last_medium_update": self.last_medium_update,
+            "last_heavy_update": self.last_heavy_update,
+            "tick_count": self.tick_count,
+            "sma_7_buffer": list(self.sma_7_buffer),
+            "sma_25_buffer": list(self.sma_25_buffer),
+            "price_sum_7": self.price_sum_7,
+            "price_sum_25": self.price_sum_25,
+        }
+
+    def restore_state(self, state: Dict):
+        """Восстанавливает состояние из export_state()"""
+        self.fast_cache = dict(state.get("fast_cache", {}))
+        self.medium_cache = dict(state.get("medium_cache", {}))
+        self.heavy_cache = dict(state.get("heavy_cache", {}))
+        self.last_medium_update = int(state.get("last_medium_update", 0))
+        self.last_heavy_update = int(state.get("last_heavy_update", 0))
+        self.tick_count = int(state.get("tick_count", 0))
+        self.sma_7_buffer = [float(p) for p in state.get("sma_7_buffer", [])]
+        self.sma_25_buffer = [float(p) for p in state.get("sma_25_buffer", [])]
+        self.price_sum_7 = float(state.get("price_sum_7", sum(self.sma_7_buffer)))
+        self.price_sum_25 = float(state.get("price_sum_25", sum(self.sma_25_buffer)))
+
     def get_all_cached_signals(self) -> Dict:
         """Возвращает все кешированные сигналы"""
         return {
@@ -0,0 +1,156 @@
+# domain/services/indicators/indicator_checkpoint_service.py
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorCheckpointService:
+    """
+    💾 Чекпоинт состояния индикаторов в компактный бинарный файл
+
+    Формат: заголовок (magic, версия, длина метаданных, число цен, crc32),
+    JSON-метаданные (символ, время, кеши и буферы CachedIndicatorService),
+    затем массивы float64 цен и int64 меток времени.
+    Восстановление занимает миллисекунды и не требует ни сети, ни пересчета.
+    """
+
+    MAGIC = b"ATIC"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHIII")
+
+    def __init__(
+        self,
+        checkpoint_file: str = "indicator_checkpoint.bin",
+        max_gap_seconds: float = 300,
+        save_every_ticks: int = 500
+    ):
+        self.checkpoint_file = checkpoint_file
+        self.max_gap_seconds = max_gap_seconds
+        self.save_every_ticks = save_every_ticks
+
+        self.stats = {
+            'saves': 0,
+            'restores': 0,
+            'rejected': 0,
+            'last_save_ms': 0.0,
+            'last_restore_ms': 0.0,
+            'last_size_bytes': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'IndicatorCheckpointService':
+        """Создание из секции indicator_checkpoint конфигурации"""
+        config = config or {}
+        return cls(
+            checkpoint_file=config.get("file", "indicator_checkpoint.bin"),
+            max_gap_seconds=config.get("max_gap_seconds", 300),
+            save_every_ticks=config.get("save_every_ticks", 500),
+        )
+
+    def should_save(self, tick_counter: int) -> bool:
+        return self.save_every_ticks > 0 and tick_counter % self.save_every_ticks == 0
+
+    # 💾 СОХРАНЕНИЕ
+
+    def save(self, ticker_service) -> bool:
+        """Атомарно пишет состояние ticker_service в файл"""
+        start = time.perf_counter()
+        try:
+            state = ticker_service.export_state()
+            prices = np.asarray(state["prices"], dtype="<f8")
+            timestamps = np.asarray(state["timestamps"], dtype="<i8")
+            meta = json.dumps({
+                "symbol": state["symbol"],
+                "saved_at": time.time(),
+                "indicators": state["indicators"],
+            }).encode("utf-8")
+
+            body = meta + prices.tobytes() + timestamps.tobytes()
+            header = self._HEADER.pack(self.MAGIC, self.VERSION, len(meta), len(prices), zlib.crc32(body))
+
+            tmp_file = f"{self.checkpoint_file}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(header + body)
+            os.replace(tmp_file, self.checkpoint_file)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить чекпоинт индикаторов: {e}")
+            return False
+
+        self.stats['saves'] += 1
+        self.stats['last_save_ms'] = (time.perf_counter() - start) * 1000
+        self.stats['last_size_bytes'] = len(header) + len(body)
+        return True
+
+    # ♻️ ВОССТАНОВЛЕНИЕ
+
+    def load(self, symbol: str) -> Optional[Dict]:
+        """Читает и проверяет чекпоинт. None, если файла нет или он не подходит"""
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return None
+
+        try:
+            with open(self.checkpoint_file, "rb") as f:
+                data = f.read()
+
+            magic, version, meta_len, count, crc = self._HEADER.unpack_from(data)
+            body = data[self._HEADER.size:]
+            if magic != self.MAGIC or version != self.VERSION:
+                return self._reject("неизвестный формат")
+            if len(body) != meta_len + count * 16 or zlib.crc32(body) != crc:
+                return self._reject("поврежден (crc/размер)")
+
+            meta = json.loads(body[:meta_len].decode("utf-8"))
+            prices = np.frombuffer(body, dtype="<f8", count=count, offset=meta_len)
+            timestamps = np.frombuffer(body, dtype="<i8", count=count, offset=meta_len + count * 8)
+        except Exception as e:
+            return self._reject(f"ошибка чтения: {e}")
+
+        if meta.get("symbol") != symbol:
+            return self._reject(f"другой символ {meta.get('symbol')}")
+
+        gap = time.time() - meta.get("saved_at", 0)
+        if gap > self.max_gap_seconds:
+            return self._reject(f"устарел на {gap:.0f}s (лимит {self.max_gap_seconds}s)")
+
+        return {
+            "symbol": symbol,
+            "prices": prices.tolist(),
+            "timestamps": timestamps.tolist(),
+            "indicators": meta.get("indicators", {}),
+        }
+
+    def restore(self, ticker_service, symbol: str) -> int:
+        """Восстанавливает ticker_service из чекпоинта, возвращает число цен (0 - не восстановлено)"""
+        start = time.perf_counter()
+        state = self.load(symbol)
+        if state is None:
+            return 0
+
+        restored = ticker_service.restore_state(state)
+        self.stats['restores'] += 1
+        self.stats['last_restore_ms'] = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"♻️ Чекпоинт индикаторов {symbol} восстановлен: {restored} цен "
+            f"за {self.stats['last_restore_ms']:.1f}ms"
+        )
+        return restored
+
+    def _reject(self, reason: str) -> None:
+        self.stats['rejected'] += 1
+        logger.info(f"💾 Чекпоинт индикаторов пропущен: {reason}")
+        return None
+
+    def get_statistics(self) -> Dict:
+        """📊 Статистика чекпоинтов"""
+        return {
+            'checkpoint_file': self.checkpoint_file,
+            **self.stats
+        }
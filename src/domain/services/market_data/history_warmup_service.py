@@ -0,0 +1,121 @@
+# domain/services/market_data/history_warmup_service.py
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWarmupService:
+    """
+    🔥 Прогрев индикаторов перед запуском торгового цикла
+
+    Источник истории по приоритету:
+    1. Локальный файл-кеш свечей, если он свежий и содержит достаточно данных
+    2. REST fetch_ohlcv у коннектора (результат сохраняется в файл-кеш)
+    Буферы TickerService заполняются сразу, и бот готов к сигналам через секунды.
+    """
+
+    def __init__(
+        self,
+        exchange_connector=None,
+        timeframe: str = "1m",
+        limit: int = 200,
+        cache_file: Optional[str] = None,
+        max_cache_age_seconds: float = 300
+    ):
+        self.exchange_connector = exchange_connector
+        self.timeframe = timeframe
+        self.limit = limit
+        self.cache_file = cache_file
+        self.max_cache_age_seconds = max_cache_age_seconds
+
+        self.last_warmup: Dict = {}
+
+    @classmethod
+    def from_config(cls, exchange_connector, config: Optional[Dict]) -> 'HistoryWarmupService':
+        """Создание из секции warmup конфигурации"""
+        config = config or {}
+        return cls(
+            exchange_connector=exchange_connector,
+            timeframe=config.get("timeframe", "1m"),
+            limit=config.get("limit", 200),
+            cache_file=config.get("cache_file") or None,
+            max_cache_age_seconds=config.get("max_cache_age_seconds", 300),
+        )
+
+    async def warm_up(self, ticker_service, symbol: str) -> Dict:
+        """Загружает историю и прогревает ticker_service. Возвращает метрики прогрева"""
+        start = time.perf_counter()
+        source = "none"
+        candles: List[List[float]] = []
+
+        try:
+            candles = self._load_cache(symbol)
+            if candles:
+                source = "cache"
+            elif self.exchange_connector is not None:
+                candles = await self.exchange_connector.fetch_ohlcv(
+                    symbol, timeframe=self.timeframe, limit=self.limit
+                ) or []
+                source = "exchange"
+                self._save_cache(symbol, candles)
+        except Exception as e:
+            logger.warning(f"⚠️ Прогрев истории не удался: {e}")
+
+        loaded = await ticker_service.warm_up(candles) if candles else 0
+
+        self.last_warmup = {
+            'source': source,
+            'candles': loaded,
+            'timeframe': self.timeframe,
+            'duration_ms': (time.perf_counter() - start) * 1000,
+            'signal_ready': len(ticker_service.repository.tickers) >= 50
+        }
+        logger.info(
+            f"🔥 Прогрев {symbol}: {loaded} свечей из {source} "
+            f"за {self.last_warmup['duration_ms']:.1f}ms"
+        )
+        return self.last_warmup
+
+    # 💾 ФАЙЛ-КЕШ СВЕЧЕЙ
+
+    def _load_cache(self, symbol: str) -> List[List[float]]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return []
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось прочитать кеш истории {self.cache_file}: {e}")
+            return []
+
+        if payload.get('symbol') != symbol or payload.get('timeframe') != self.timeframe:
+            return []
+        if time.time() - payload.get('saved_at', 0) > self.max_cache_age_seconds:
+            return []
+
+        candles = payload.get('candles', [])
+        return candles[-self.limit:] if len(candles) >= 50 else []
+
+    def _save_cache(self, symbol: str, candles: List[List[float]]):
+        if not self.cache_file or not candles:
+            return
+
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'symbol': symbol,
+                    'timeframe': self.timeframe,
+                    'saved_at': time.time(),
+                    'candles': candles
+                }, f)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить кеш истории {self.cache_file}: {e}")
+
+    def get_statistics(self) -> Dict:
+        """📊 Метрики последнего прогрева"""
+        return dict(self.last_warmup)
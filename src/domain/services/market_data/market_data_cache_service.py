@@ -0,0 +1,131 @@
+# domain/services/market_data/market_data_cache_service.py
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _symbol_key(symbol: str) -> str:
+    """'ETH/USDT' и 'ETHUSDT' -> один ключ кеша"""
+    return symbol.replace('/', '').upper()
+
+
+class MarketDataCacheService:
+    """
+    📡 Общий кеш рыночных данных внутри процесса
+
+    Торговый цикл и мониторинг стакана складывают сюда последние тикеры и стаканы
+    из websocket. Потребители (предпроверки, BuyOrderMonitor, OrderTimeoutService)
+    читают их с ограничением по возрасту и идут в REST только если данные устарели.
+    fetch_ticker / fetch_orderbook совместимы по сигнатуре с CcxtExchangeConnector.
+    """
+
+    def __init__(self, exchange_connector=None, default_max_age_ms: int = 2000):
+        self.exchange_connector = exchange_connector
+        self.default_max_age_ms = default_max_age_ms
+
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self.orderbooks: Dict[str, Dict[str, Any]] = {}
+        self.ticker_timestamps: Dict[str, int] = {}
+        self.orderbook_timestamps: Dict[str, int] = {}
+
+        self.stats = {
+            'ticker_updates': 0,
+            'orderbook_updates': 0,
+            'cache_hits': 0,
+            'rest_fallbacks': 0,
+            'rest_errors': 0
+        }
+
+    # 📥 ОБНОВЛЕНИЕ ИЗ ПОТОКОВ
+
+    def update_ticker(self, symbol: str, ticker: Dict[str, Any]):
+        """Сохраняет последний тикер из websocket"""
+        key = _symbol_key(symbol)
+        self.tickers[key] = ticker
+        self.ticker_timestamps[key] = int(time.time() * 1000)
+        self.stats['ticker_updates'] += 1
+
+    def update_orderbook(self, symbol: str, orderbook: Dict[str, Any], depth: int = 50):
+        """Сохраняет снимок стакана (ccxt меняет объект стакана на месте, поэтому копируем)"""
+        key = _symbol_key(symbol)
+        self.orderbooks[key] = {
+            'symbol': orderbook.get('symbol', symbol),
+            'bids': [list(level[:2]) for level in orderbook.get('bids', [])[:depth]],
+            'asks': [list(level[:2]) for level in orderbook.get('asks', [])[:depth]],
+            'timestamp': orderbook.get('timestamp'),
+        }
+        self.orderbook_timestamps[key] = int(time.time() * 1000)
+        self.stats['orderbook_updates'] += 1
+
+    # 📤 ЧТЕНИЕ С ОГРАНИЧЕНИЕМ ВОЗРАСТА
+
+    def get_ticker_age_ms(self, symbol: str) -> Optional[int]:
+        timestamp = self.ticker_timestamps.get(_symbol_key(symbol))
+        return None if timestamp is None else int(time.time() * 1000) - timestamp
+
+    def get_orderbook_age_ms(self, symbol: str) -> Optional[int]:
+        timestamp = self.orderbook_timestamps.get(_symbol_key(symbol))
+        return None if timestamp is None else int(time.time() * 1000) - timestamp
+
+    def get_cached_ticker(self, symbol: str, max_age_ms: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Тикер из кеша без REST; None, если его нет или он старше max_age_ms"""
+        age = self.get_ticker_age_ms(symbol)
+        limit = self.default_max_age_ms if max_age_ms is None else max_age_ms
+        if age is None or age > limit:
+            return None
+        return self.tickers[_symbol_key(symbol)]
+
+    async def fetch_ticker(self, symbol: str, max_age_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Свежий тикер из кеша, иначе REST fetch_ticker (результат кешируется)"""
+        ticker = self.get_cached_ticker(symbol, max_age_ms)
+        if ticker is not None:
+            self.stats['cache_hits'] += 1
+            return ticker
+
+        if self.exchange_connector is None:
+            raise LookupError(f"No fresh ticker for {symbol} and no REST fallback")
+
+        self.stats['rest_fallbacks'] += 1
+        try:
+            ticker = await self.exchange_connector.fetch_ticker(symbol)
+        except Exception:
+            self.stats['rest_errors'] += 1
+            raise
+        self.update_ticker(symbol, ticker)
+        return ticker
+
+    async def get_last_price(self, symbol: str, max_age_ms: Optional[int] = None) -> float:
+        ticker = await self.fetch_ticker(symbol, max_age_ms)
+        return float(ticker['last'])
+
+    async def fetch_orderbook(self, symbol: str, limit: int = 100, max_age_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Свежий стакан из кеша, иначе REST fetch_orderbook"""
+        age = self.get_orderbook_age_ms(symbol)
+        max_age = self.default_max_age_ms if max_age_ms is None else max_age_ms
+        key = _symbol_key(symbol)
+        if age is not None and age <= max_age:
+            self.stats['cache_hits'] += 1
+            return self.orderbooks[key]
+
+        if self.exchange_connector is None:
+            raise LookupError(f"No fresh orderbook for {symbol} and no REST fallback")
+
+        self.stats['rest_fallbacks'] += 1
+        try:
+            orderbook = await self.exchange_connector.fetch_orderbook(symbol, limit)
+        except Exception:
+            self.stats['rest_errors'] += 1
+            raise
+        self.update_orderbook(symbol, orderbook, depth=limit)
+        return self.orderbooks[key]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Попадания в кеш и обращения к REST"""
+        reads = self.stats['cache_hits'] + self.stats['rest_fallbacks']
+        return {
+            **self.stats,
+            'symbols': len(self.tickers),
+            'hit_rate': (self.stats['cache_hits'] / reads * 100) if reads else 0.0
+        }
@@ -36,20 +36,34 @@ class OrderBookMetrics:
 class OrderBookAnalyzer:
     """Анализатор биржевого стакана"""
     
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, compute_executor=None):
         self.config = config
+        # ⚙️ ComputeExecutor для анализа глубокого стакана вне event loop
+        self.compute_executor = compute_executor
         self.min_volume_threshold = config.get('min_volume_threshold', 1000)
         self.big_wall_threshold = config.get('big_wall_threshold', 5000)
         self.max_spread_percent = config.get('max_spread_percent', 0.5)
         self.min_liquidity_depth = config.get('min_liquidity_depth', 10)
         self.typical_order_size = config.get('typical_order_size', 10)  # USDT
         
-    async def get_orderbook_stream(self, exchange, symbol: str):
-        """Получение потока данных стакана через вебсокет"""
+    async def get_orderbook_stream(self, exchange, symbol: str, on_orderbook=None):
+        """Получение потока данных стакана через вебсокет (on_orderbook получает сырой стакан)"""
         try:
             while True:
                 orderbook = await exchange.watch_order_book(symbol)
-                metrics = self.analyze_orderbook(orderbook)
+                if on_orderbook is not None:
+                    on_orderbook(symbol, orderbook)
+                if self.compute_executor is not None:
+                    # Снимок стакана: ccxt обновляет его на event loop, пока поток считает
+                    snapshot = {
+                        'bids': [list(level[:2]) for level in orderbook['bids']],
+                        'asks': [list(level[:2]) for level in orderbook['asks']]
+                    }
+                    metrics = await self.compute_executor.run(
+                        self.analyze_orderbook, snapshot, task_name="analyze_orderbook"
+                    )
+                else:
+                    metrics = self.analyze_orderbook(orderbook)
                 yield metrics
                 await asyncio.sleep(0.1)  # Небольшая задержка
                 
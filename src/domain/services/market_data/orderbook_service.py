@@ -1,6 +1,7 @@
 # domain/services/orderbook_service.py
 import asyncio
 import logging
+import time
 from typing import Optional
 from .orderbook_analyzer import OrderBookAnalyzer, OrderBookMetrics, OrderBookSignal
 
@@ -9,9 +10,11 @@ logger = logging.getLogger(__name__)
 class OrderBookService:
     """Сервис для мониторинга стакана в фоновом режиме"""
 
-    def __init__(self, orderbook_analyzer: OrderBookAnalyzer):
+    def __init__(self, orderbook_analyzer: OrderBookAnalyzer, market_data_cache=None):
         self.orderbook_analyzer = orderbook_analyzer
+        self.market_data_cache = market_data_cache  # MarketDataCacheService: сюда кладем сырой стакан
         self.latest_metrics: Optional[OrderBookMetrics] = None
+        self.latest_metrics_timestamp: Optional[int] = None  # мс, когда метрики были посчитаны
         self.is_monitoring = False
         self._monitoring_task = None
 
@@ -42,11 +45,13 @@ class OrderBookService:
     async def _monitor_orderbook(self, exchange, symbol: str):
         """Фоновый мониторинг стакана"""
         try:
-            async for metrics in self.orderbook_analyzer.get_orderbook_stream(exchange, symbol):
+            on_orderbook = self.market_data_cache.update_orderbook if self.market_data_cache else None
+            async for metrics in self.orderbook_analyzer.get_orderbook_stream(exchange, symbol, on_orderbook):
                 if not self.is_monitoring:
                     break
 
                 self.latest_metrics = metrics
+                self.latest_metrics_timestamp = int(time.time() * 1000)
                 await asyncio.sleep(0.1)  # Небольшая пауза
 
         except asyncio.CancelledError:
@@ -59,10 +64,23 @@ class OrderBookService:
         """Получение последних метрик стакана"""
         return self.latest_metrics
 
-    async def get_current_metrics(self, exchange, symbol: str) -> Optional[OrderBookMetrics]:
-        """Получение текущих метрик стакана (разовый запрос)"""
+    def get_metrics_age_ms(self) -> Optional[int]:
+        """Возраст последних метрик в миллисекундах (None если метрик еще нет)"""
+        if self.latest_metrics is None or self.latest_metrics_timestamp is None:
+            return None
+        return int(time.time() * 1000) - self.latest_metrics_timestamp
+
+    def get_fresh_metrics(self, max_age_ms: int) -> Optional[OrderBookMetrics]:
+        """Последние метрики стакана, если они не старше max_age_ms (без сетевых запросов)"""
+        age_ms = self.get_metrics_age_ms()
+        if age_ms is None or age_ms > max_age_ms:
+            return None
+        return self.latest_metrics
+
+    async def get_current_metrics(self, exchange_connector, symbol: str) -> Optional[OrderBookMetrics]:
+        """Получение текущих метрик стакана (разовый REST запрос через лимитер коннектора)"""
         try:
-            orderbook = await exchange.fetch_order_book(symbol)
+            orderbook = await exchange_connector.fetch_orderbook(symbol)
             return self.orderbook_analyzer.analyze_orderbook(orderbook)
         except Exception as e:
             logger.error(f"Ошибка получения стакана: {e}")
@@ -7,6 +7,7 @@ from talib import MA_Type
 
 # В начале файла добавить:
 from domain.services.indicators.cached_indicator_service import CachedIndicatorService
+from domain.services.indicators.batched_indicator_engine import BatchedIndicatorEngine
 from domain.entities.ticker import Ticker
 from infrastructure.repositories.tickers_repository import InMemoryTickerRepository
 
@@ -32,11 +33,33 @@ def floor_to_step(value: Decimal, step: Decimal) -> Decimal:
 
 
 class TickerService:
-    def __init__(self, repository: InMemoryTickerRepository):
+    def __init__(
+            self,
+            repository: InMemoryTickerRepository,
+            compute_executor=None,
+            batched_engine: Optional[BatchedIndicatorEngine] = None,
+            symbol: Optional[str] = None
+    ):
         self.repository = repository
         self.cached_indicators = CachedIndicatorService()  # 🆕 Добавляем кеш
         self.price_history_cache = []  # 🆕 Кеш истории цен
         self.volatility_window = 20
+        # ⚙️ ComputeExecutor для talib вызовов (None = считаем прямо в event loop)
+        self.compute_executor = compute_executor
+
+        # 📊 Общий пакетный движок индикаторов для многих пар (вместо talib на каждую пару)
+        self.batched_engine = batched_engine
+        self.symbol = symbol
+        if batched_engine is not None:
+            if not symbol:
+                raise ValueError("symbol is required when using batched_engine")
+            batched_engine.register(symbol, self.cached_indicators)
+
+    async def _compute(self, func, *args, task_name: str):
+        """Выполняет тяжелый расчет через compute_executor, если он задан"""
+        if self.compute_executor is None:
+            return func(*args)
+        return await self.compute_executor.run(func, *args, task_name=task_name)
 
     async def process_ticker(self, data: Dict):
         """🚀 ОПТИМИЗИРОВАННАЯ обработка тикера"""
@@ -51,15 +74,26 @@ class TickerService:
         # 2. Быстрые индикаторы (каждый тик)
         fast_signals = self.cached_indicators.update_fast_indicators(current_price)
 
+        # 3-4. Пакетный режим: движок пересчитывает все пары, у которых подошла очередь
+        if self.batched_engine is not None:
+            self.batched_engine.push(self.symbol, current_price)
+            await self.batched_engine.refresh_due_async(self.compute_executor)
+
         # 3. Средние индикаторы (каждые 10 тиков)
-        medium_signals = {}
-        if self.cached_indicators.should_update_medium():
-            medium_signals = self.cached_indicators.update_medium_indicators(self.price_history_cache)
+        elif self.cached_indicators.should_update_medium():
+            await self._compute(
+                self.cached_indicators.update_medium_indicators,
+                list(self.price_history_cache),
+                task_name="medium_indicators",
+            )
 
         # 4. Тяжелые индикаторы (каждые 50 тиков)
-        heavy_signals = {}
-        if self.cached_indicators.should_update_heavy():
-            heavy_signals = self.cached_indicators.update_heavy_indicators(self.price_history_cache)
+        if self.batched_engine is None and self.cached_indicators.should_update_heavy():
+            await self._compute(
+                self.cached_indicators.update_heavy_indicators,
+                list(self.price_history_cache),
+                task_name="heavy_indicators",
+            )
 
         # 5. Получаем все кешированные сигналы
         all_signals = self.cached_indicators.get_all_cached_signals()
@@ -68,6 +102,92 @@ class TickerService:
         # 6. Сохраняем тикер
         self.repository.save(ticker)
 
+    async def warm_up(self, candles: List[List[float]]) -> int:
+        """
+        🔥 Прогрев буферов и индикаторов историческими свечами до старта websocket
+
+        candles: [[timestamp, open, high, low, close, volume], ...] в хронологическом порядке
+        Возвращает количество принятых свечей.
+        """
+        accepted = 0
+        for candle in candles:
+            if len(candle) < 6 or candle[4] is None:
+                continue
+            timestamp, open_, high, low, close, volume = candle[:6]
+            close = float(close)
+
+            self.price_history_cache.append(close)
+            if len(self.price_history_cache) > 200:
+                self.price_history_cache.pop(0)
+            self.cached_indicators.update_fast_indicators(close)
+            if self.batched_engine is not None:
+                self.batched_engine.push(self.symbol, close)
+
+            self.repository.save(Ticker({
+                "timestamp": int(timestamp),
+                "symbol": self.symbol or "",
+                "last": close,
+                "open": open_,
+                "close": close,
+                "high": high,
+                "low": low,
+                "baseVolume": volume,
+            }))
+            accepted += 1
+
+        if not accepted:
+            return 0
+
+        # Средние/тяжелые индикаторы считаем один раз по всей истории
+        if self.batched_engine is not None:
+            self.batched_engine.compute_medium([self.symbol])
+            self.batched_engine.compute_heavy([self.symbol])
+        else:
+            history = list(self.price_history_cache)
+            await self._compute(self.cached_indicators.update_medium_indicators, history,
+                                task_name="medium_indicators")
+            await self._compute(self.cached_indicators.update_heavy_indicators, history,
+                                task_name="heavy_indicators")
+
+        self.repository.tickers[-1].update_signals(self.cached_indicators.get_all_cached_signals())
+        return accepted
+
+    def export_state(self) -> Dict:
+        """💾 Состояние буферов и индикаторов для чекпоинта"""
+        prices = list(self.price_history_cache)
+        recent = self.repository.tickers[-len(prices):] if prices else []
+        timestamps = [int(t.timestamp) for t in recent]
+        # История цен и тикеры пишутся вместе, но выравниваем на всякий случай
+        timestamps = [timestamps[0] if timestamps else 0] * (len(prices) - len(timestamps)) + timestamps
+        return {
+            "symbol": self.symbol,
+            "prices": prices,
+            "timestamps": timestamps,
+            "indicators": self.cached_indicators.export_state(),
+        }
+
+    def restore_state(self, state: Dict) -> int:
+        """♻️ Восстановление из export_state(): буферы, индикаторы и последние тикеры"""
+        prices = [float(p) for p in state.get("prices", [])][-200:]
+        timestamps = list(state.get("timestamps", []))[-len(prices):] if prices else []
+
+        self.price_history_cache = prices
+        self.cached_indicators.restore_state(state.get("indicators", {}))
+
+        for timestamp, price in zip(timestamps, prices):
+            self.repository.save(Ticker({
+                "timestamp": int(timestamp),
+                "symbol": self.symbol or "",
+                "last": price,
+                "close": price,
+            }))
+            if self.batched_engine is not None:
+                self.batched_engine.push(self.symbol, price)
+
+        if self.repository.tickers:
+            self.repository.tickers[-1].update_signals(self.cached_indicators.get_all_cached_signals())
+        return len(prices)
+
     async def get_signal(self) -> str:
         """🎯 УПРОЩЕННАЯ логика сигналов"""
         # Получаем последние тикеры БЕЗ get_last_n каждый раз
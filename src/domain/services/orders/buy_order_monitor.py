@@ -1,11 +1,11 @@
 # domain/services/buy_order_monitor.py.new
 import asyncio
 import logging
-import time
 from typing import List, Optional
 from domain.entities.order import Order
 from domain.services.orders.order_service import OrderService
 from infrastructure.connectors.exchange_connector import CcxtExchangeConnector
+from domain.clock import now_ms
 
 logger = logging.getLogger(__name__)
 
@@ -26,10 +26,13 @@ class BuyOrderMonitor:
         exchange_connector: CcxtExchangeConnector,
         max_age_minutes: float = 15.0,
         max_price_deviation_percent: float = 3.0,
-        check_interval_seconds: int = 60
+        check_interval_seconds: int = 60,
+        market_data_cache=None
     ):
         self.order_service = order_service
         self.exchange = exchange_connector
+        # 📡 Тикеры из общего кеша websocket (REST только если данные устарели)
+        self.ticker_source = market_data_cache or exchange_connector
         self.max_age_minutes = max_age_minutes
         self.max_price_deviation_percent = max_price_deviation_percent
         self.check_interval_seconds = check_interval_seconds
@@ -92,7 +95,7 @@ class BuyOrderMonitor:
         """Проверяет протух ли BUY ордер"""
         try:
             # 1. Проверка возраста
-            current_time = int(time.time() * 1000)
+            current_time = now_ms()  # Время биржи: created_at ордера в той же шкале
             age_minutes = (current_time - order.created_at) / 1000 / 60
             
             if age_minutes > self.max_age_minutes:
@@ -100,7 +103,7 @@ class BuyOrderMonitor:
                 return True
             
             # 2. Проверка отклонения цены
-            ticker = await self.exchange.fetch_ticker(order.symbol)
+            ticker = await self.ticker_source.fetch_ticker(order.symbol)
             current_price = float(ticker['last'])
             
             # Для BUY: если рынок ушел выше нашей цены
@@ -149,7 +152,7 @@ class BuyOrderMonitor:
         """Пересоздание BUY ордера по текущей рыночной цене"""
         try:
             # Получаем текущую цену
-            ticker = await self.exchange.fetch_ticker(old_order.symbol)
+            ticker = await self.ticker_source.fetch_ticker(old_order.symbol)
             current_price = float(ticker['last'])
             
             # Размещаем ордер немного ниже рынка для вероятности исполнения
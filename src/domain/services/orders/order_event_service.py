@@ -0,0 +1,215 @@
+# domain/services/orders/order_event_service.py
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from domain.entities.order import Order
+from domain.clock import now_ms
+
+logger = logging.getLogger(__name__)
+
+
+class OrderEventService:
+    """
+    📨 Обновления ордеров из user-data потока вместо опроса REST
+
+    - watch_orders: execution reports применяются к Order и репозиторию сразу
+    - watch_my_trades: сделки (fills) доводят filled/average, даже если
+      отчет об ордере запоздал
+    - редкая сверка sync_orders_with_exchange остается как страховка
+    Задержка обнаружения исполнения - миллисекунды вместо интервала опроса.
+    """
+
+    def __init__(
+        self,
+        order_service,
+        exchange_connector,
+        reconcile_interval_seconds: float = 300
+    ):
+        self.order_service = order_service
+        self.orders_repo = order_service.orders_repo
+        self.exchange_connector = exchange_connector
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+
+        self.is_streaming = False
+        self._tasks: List[asyncio.Task] = []
+        self._listeners: List[Callable[[Order], Any]] = []
+
+        # exchange_id ордера -> {trade_id: (amount, price, fee)}
+        self._fills: Dict[str, Dict[str, tuple]] = {}
+        # Ордера, измененные с последнего drain_updated_orders()
+        self._updated: Dict[int, Order] = {}
+
+        self.stats = {
+            'order_events': 0,
+            'trade_events': 0,
+            'orders_updated': 0,
+            'unknown_orders': 0,
+            'stale_events': 0,
+            'fills_detected': 0,
+            'reconciliations': 0,
+            'stream_errors': 0,
+            'total_latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+            'latency_samples': 0
+        }
+
+    def add_listener(self, callback: Callable[[Order], Any]):
+        """Подписка на изменения ордеров (вызывается с обновленным Order)"""
+        self._listeners.append(callback)
+
+    # 🔄 ЖИЗНЕННЫЙ ЦИКЛ
+
+    async def start(self, symbol: Optional[str] = None):
+        if self.is_streaming:
+            return
+        self.is_streaming = True
+        client = self.exchange_connector.async_client
+        if hasattr(client, 'watch_orders'):
+            self._tasks.append(asyncio.create_task(self._stream(client.watch_orders, symbol, self.apply_order_update)))
+        if hasattr(client, 'watch_my_trades'):
+            self._tasks.append(asyncio.create_task(self._stream(client.watch_my_trades, symbol, self.apply_trade)))
+        if self.reconcile_interval_seconds > 0:
+            self._tasks.append(asyncio.create_task(self._reconcile_loop()))
+        logger.info(f"📨 Поток ордеров запущен (сверка каждые {self.reconcile_interval_seconds}s)")
+
+    async def stop(self):
+        self.is_streaming = False
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _stream(self, watch: Callable, symbol: Optional[str], handler: Callable):
+        while self.is_streaming:
+            try:
+                events = await watch(symbol)
+                for event in events or []:
+                    handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['stream_errors'] += 1
+                logger.warning(f"⚠️ Ошибка потока ордеров: {e}")
+                await asyncio.sleep(1)
+
+    async def _reconcile_loop(self):
+        while self.is_streaming:
+            await asyncio.sleep(self.reconcile_interval_seconds)
+            await self.reconcile()
+
+    async def reconcile(self) -> List[Order]:
+        """Страховочная сверка через REST"""
+        updated = await self.order_service.sync_orders_with_exchange()
+        self.stats['reconciliations'] += 1
+        for order in updated:
+            self._updated[order.order_id] = order
+        return updated
+
+    # 📥 ПРИМЕНЕНИЕ СОБЫТИЙ
+
+    def _find_order(self, exchange_id: Optional[str], client_order_id: Optional[str] = None) -> Optional[Order]:
+        order = self.orders_repo.get_by_exchange_id(str(exchange_id)) if exchange_id else None
+        if order is None and client_order_id:
+            for candidate in self.order_service.get_open_orders():
+                if candidate.client_order_id == client_order_id:
+                    return candidate
+        return order
+
+    def apply_order_update(self, data: Dict[str, Any]) -> Optional[Order]:
+        """Применяет execution report (ордер в формате ccxt)"""
+        self.stats['order_events'] += 1
+        order = self._find_order(data.get('id'), data.get('clientOrderId'))
+        if order is None:
+            self.stats['unknown_orders'] += 1
+            return None
+
+        # События могут прийти не по порядку: исполненный объем не уменьшается
+        filled = data.get('filled')
+        if filled is not None and float(filled) < order.filled_amount:
+            self.stats['stale_events'] += 1
+            return order
+        if order.is_filled() or order.status == Order.STATUS_CANCELED:
+            if (data.get('status') or '').lower() == 'open':
+                self.stats['stale_events'] += 1
+                return order
+
+        was_filled = order.is_filled()
+        order.update_from_exchange(data)
+        self._record_latency(data.get('lastUpdateTimestamp') or data.get('lastTradeTimestamp') or data.get('timestamp'))
+        self._commit(order, was_filled)
+        return order
+
+    def apply_trade(self, trade: Dict[str, Any]) -> Optional[Order]:
+        """Применяет сделку: накапливает fills ордера и пересчитывает filled/average"""
+        self.stats['trade_events'] += 1
+        exchange_id = trade.get('order')
+        order = self._find_order(exchange_id)
+        if order is None:
+            self.stats['unknown_orders'] += 1
+            return None
+
+        fills = self._fills.setdefault(str(exchange_id), {})
+        trade_id = str(trade.get('id') or len(fills))
+        if trade_id in fills:
+            return order  # Дубликат
+        fee = trade.get('fee') or {}
+        fills[trade_id] = (float(trade.get('amount') or 0), float(trade.get('price') or 0), float(fee.get('cost') or 0))
+
+        filled = sum(amount for amount, _, _ in fills.values())
+        if filled <= order.filled_amount:
+            return order  # Отчет об ордере уже учел эти сделки
+
+        was_filled = order.is_filled()
+        cost = sum(amount * price for amount, price, _ in fills.values())
+        order.filled_amount = filled
+        order.remaining_amount = max(0.0, order.amount - filled)
+        order.average_price = cost / filled if filled else order.average_price
+        order.fees = sum(fee_cost for _, _, fee_cost in fills.values())
+        order.status = Order.STATUS_FILLED if order.is_fully_filled() else Order.STATUS_PARTIALLY_FILLED
+        order.last_update = now_ms()
+        self._record_latency(trade.get('timestamp'))
+        self._commit(order, was_filled)
+        return order
+
+    def _commit(self, order: Order, was_filled: bool):
+        self.orders_repo.save(order)
+        self._updated[order.order_id] = order
+        self.stats['orders_updated'] += 1
+        if order.is_filled() and not was_filled:
+            self.stats['fills_detected'] += 1
+            self._fills.pop(str(order.exchange_id), None)
+            logger.info(f"✅ Ордер {order.exchange_id} исполнен (поток): {order.filled_amount} @ {order.average_price}")
+
+        for callback in self._listeners:
+            try:
+                callback(order)
+            except Exception as e:
+                logger.error(f"❌ Ошибка обработчика обновления ордера: {e}")
+
+    def _record_latency(self, exchange_timestamp: Optional[int]):
+        if not exchange_timestamp:
+            return
+        # Метка биржи сравнивается со временем биржи, а не с локальными часами
+        latency = max(0.0, now_ms() - float(exchange_timestamp))
+        self.stats['latency_samples'] += 1
+        self.stats['total_latency_ms'] += latency
+        self.stats['max_latency_ms'] = max(self.stats['max_latency_ms'], latency)
+
+    def drain_updated_orders(self) -> List[Order]:
+        """Ордера, изменившиеся с прошлого вызова"""
+        updated = list(self._updated.values())
+        self._updated.clear()
+        return updated
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика потока ордеров"""
+        samples = max(self.stats['latency_samples'], 1)
+        return {
+            **self.stats,
+            'is_streaming': self.is_streaming,
+            'avg_latency_ms': self.stats['total_latency_ms'] / samples
+        }
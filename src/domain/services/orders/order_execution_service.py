@@ -54,11 +54,23 @@ class OrderExecutionService:
         self,
         order_service: OrderService,
         deal_service: DealService,
-        exchange_connector: CcxtExchangeConnector
+        exchange_connector: CcxtExchangeConnector,
+        market_data_cache=None,
+        balance_service=None,
+        order_event_service=None,
+        persistence_queue=None
     ):
         self.order_service = order_service
         self.deal_service = deal_service
         self.exchange_connector = exchange_connector
+        # 📡 Тикеры из общего кеша websocket (REST только если данные устарели)
+        self.ticker_source = market_data_cache or exchange_connector
+        # 💰 Баланс из памяти (watch_balance) вместо REST fetch_balance
+        self.balance_source = balance_service or exchange_connector
+        # 📨 Поток ордеров: статусы обновляются событиями, без опроса REST
+        self.order_event_service = order_event_service
+        # 💾 Отложенная запись репозиториев: сбрасывается при экстренной остановке
+        self.persistence_queue = persistence_queue
         
         # Статистика
         self.execution_stats = {
@@ -287,7 +299,7 @@ class OrderExecutionService:
         try:
             # 1. Проверка баланса
             if self.enable_balance_checks:
-                balance_check = await self.exchange_connector.check_sufficient_balance(
+                balance_check = await self.balance_source.check_sufficient_balance(
                     context.currency_pair.symbol,
                     'buy',
                     strategy_data['buy_amount'],
@@ -303,7 +315,7 @@ class OrderExecutionService:
                     warnings.append("Balance is close to required amount")
             
             # 2. Проверка цен на разумность
-            ticker = await self.exchange_connector.fetch_ticker(context.currency_pair.symbol)
+            ticker = await self.ticker_source.fetch_ticker(context.currency_pair.symbol)
             current_market_price = ticker['last']
             
             buy_price_diff = abs(strategy_data['buy_price'] - current_market_price) / current_market_price
@@ -407,8 +419,15 @@ class OrderExecutionService:
         📊 Мониторинг всех активных ордеров
         """
         try:
-            # Синхронизируем ордера с биржей
-            updated_orders = await self.order_service.sync_orders_with_exchange()
+            if self.order_event_service is not None and self.order_event_service.is_streaming:
+                # Статусы уже актуальны из потока: открытые + изменившиеся с прошлой проверки
+                changed = {order.order_id: order for order in self.order_service.get_open_orders()}
+                for order in self.order_event_service.drain_updated_orders():
+                    changed[order.order_id] = order
+                updated_orders = list(changed.values())
+            else:
+                # Синхронизируем ордера с биржей
+                updated_orders = await self.order_service.sync_orders_with_exchange()
             
             # Группируем по статусам
             open_orders = []
@@ -448,6 +467,9 @@ class OrderExecutionService:
         try:
             # Отменяем все ордера через order_service
             cancelled_count = await self.order_service.emergency_cancel_all_orders(symbol)
+
+            # Состояние после отмен должно оказаться на диске до выхода
+            persisted = self.persistence_queue.flush() if self.persistence_queue else 0
             
             # Получаем статистику
             open_orders = self.order_service.get_open_orders()
@@ -457,6 +479,7 @@ class OrderExecutionService:
                 'cancelled_orders': cancelled_count,
                 'remaining_open_orders': len(open_orders),
                 'open_deals': len(open_deals),
+                'persisted_records': persisted,
                 'timestamp': datetime.now().isoformat(),
                 'symbol': symbol or 'ALL'
             }
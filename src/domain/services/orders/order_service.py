@@ -1,6 +1,7 @@
 # domain/services/order_service.py.new - РЕАЛЬНАЯ торговля с API
 import asyncio
 import logging
+import time
 from typing import Optional, Dict, List, Any, Tuple
 from domain.entities.order import Order, OrderValidationResult, OrderExecutionResult
 from domain.factories.order_factory import OrderFactory
@@ -23,11 +24,14 @@ class OrderService:
         self,
         orders_repo: OrdersRepository,
         order_factory: OrderFactory,
-        exchange_connector: CcxtExchangeConnector = None
+        exchange_connector: CcxtExchangeConnector = None,
+        balance_service=None
     ):
         self.orders_repo = orders_repo
         self.order_factory = order_factory
         self.exchange_connector = exchange_connector
+        # 💰 BalanceService: проверки баланса из памяти + локальные резервы
+        self.balance_service = balance_service
 
         # Retry parameters
         self.max_retries = 3
@@ -68,6 +72,7 @@ class OrderService:
         Returns:
             OrderExecutionResult с информацией о результате
         """
+        reservation_id = None
         try:
             logger.info(f"🛒 Creating BUY order: {amount} {symbol} @ {price}")
 
@@ -81,8 +86,9 @@ class OrderService:
                     error_message=f"Validation failed: {', '.join(validation_result.errors)}"
                 )
 
-            # 2. Проверка баланса
-            balance_check = await self._check_balance_for_order(symbol, Order.SIDE_BUY, amount, price)
+            # 2. Проверка баланса (с локальным резервом при BalanceService)
+            balance_check = await self._reserve_balance_for_order(symbol, Order.SIDE_BUY, amount, price)
+            reservation_id = balance_check[3]
             if not balance_check[0]:
                 return OrderExecutionResult(
                     success=False,
@@ -105,6 +111,7 @@ class OrderService:
             # 5. РЕАЛЬНОЕ размещение на бирже
             if self.exchange_connector:
                 execution_result = await self._execute_order_on_exchange(order)
+                self._release_balance_reservation(reservation_id, placed=execution_result.success)
                 if execution_result.success:
                     self.stats['orders_executed'] += 1
                     logger.info(f"✅ BUY order executed: {order.exchange_id}")
@@ -127,6 +134,7 @@ class OrderService:
 
         except Exception as e:
             logger.error(f"❌ Error creating BUY order: {e}")
+            self._release_balance_reservation(reservation_id)
             self.stats['orders_failed'] += 1
             return OrderExecutionResult(
                 success=False,
@@ -145,6 +153,7 @@ class OrderService:
         """
         🏷️ РЕАЛЬНОЕ создание и размещение SELL ордера на бирже
         """
+        reservation_id = None
         try:
             logger.info(f"🏷️ Creating SELL order: {amount} {symbol} @ {price}")
 
@@ -158,8 +167,9 @@ class OrderService:
                     error_message=f"Validation failed: {', '.join(validation_result.errors)}"
                 )
 
-            # 2. Проверка баланса
-            balance_check = await self._check_balance_for_order(symbol, Order.SIDE_SELL, amount, price)
+            # 2. Проверка баланса (с локальным резервом при BalanceService)
+            balance_check = await self._reserve_balance_for_order(symbol, Order.SIDE_SELL, amount, price)
+            reservation_id = balance_check[3]
             if not balance_check[0]:
                 return OrderExecutionResult(
                     success=False,
@@ -182,6 +192,7 @@ class OrderService:
             # 5. РЕАЛЬНОЕ размещение на бирже
             if self.exchange_connector:
                 execution_result = await self._execute_order_on_exchange(order)
+                self._release_balance_reservation(reservation_id, placed=execution_result.success)
                 if execution_result.success:
                     self.stats['orders_executed'] += 1
                     logger.info(f"✅ SELL order executed: {order.exchange_id}")
@@ -204,6 +215,7 @@ class OrderService:
 
         except Exception as e:
             logger.error(f"❌ Error creating SELL order: {e}")
+            self._release_balance_reservation(reservation_id)
             self.stats['orders_failed'] += 1
             return OrderExecutionResult(
                 success=False,
@@ -336,6 +348,9 @@ class OrderService:
         """
         💰 Проверка баланса для ордера
         """
+        if self.balance_service:
+            return await self.balance_service.check_sufficient_balance(symbol, side, amount, price)
+
         if not self.exchange_connector:
             return True, "UNKNOWN", 0.0  # Пропускаем проверку без коннектора
 
@@ -347,6 +362,33 @@ class OrderService:
             logger.error(f"❌ Error checking balance: {e}")
             return False, "ERROR", 0.0
 
+    async def _reserve_balance_for_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float
+    ) -> Tuple[bool, str, float, Optional[str]]:
+        """
+        🔒 Проверка баланса с резервом: (достаточно, валюта, доступно, id резерва)
+        """
+        if not self.balance_service:
+            sufficient, currency, available = await self._check_balance_for_order(symbol, side, amount, price)
+            return sufficient, currency, available, None
+
+        try:
+            reservation_id, currency, available = await self.balance_service.reserve_for_order(
+                symbol, side, amount, price
+            )
+        except Exception as e:
+            logger.error(f"❌ Error reserving balance: {e}")
+            return False, "ERROR", 0.0, None
+        return reservation_id is not None, currency, available, reservation_id
+
+    def _release_balance_reservation(self, reservation_id: Optional[str], placed: bool = False):
+        if self.balance_service and reservation_id:
+            self.balance_service.release(reservation_id, placed=placed)
+
     # 📊 МЕТОДЫ ОТСЛЕЖИВАНИЯ И УПРАВЛЕНИЯ ОРДЕРАМИ
 
     async def get_order_status(self, order: Order) -> Optional[Order]:
@@ -464,8 +506,8 @@ class OrderService:
 
     def get_open_orders(self) -> List[Order]:
         """📋 Получает все открытые ордера"""
-        all_orders = self.orders_repo.get_all()
-        return [order for order in all_orders if order.is_open() or order.is_partially_filled()]
+        # Индекс статусов репозитория: закрытые (в т.ч. архивные) ордера не загружаются
+        return self.orders_repo.get_open_orders()
 
     def get_order_by_id(self, order_id: int) -> Optional[Order]:
         """📋 Получает ордер по ID"""
@@ -473,12 +515,11 @@ class OrderService:
 
     def get_orders_by_symbol(self, symbol: str) -> List[Order]:
         """📋 Получает все ордера по символу"""
-        all_orders = self.orders_repo.get_all()
-        return [order for order in all_orders if order.symbol == symbol]
+        return self.orders_repo.get_orders_by_symbol(symbol)
 
     # 🚨 ЭКСТРЕННЫЕ МЕТОДЫ
 
-    async def emergency_cancel_all_orders(self, symbol: str = None) -> int:
+    async def emergency_cancel_all_orders(self, symbol: str = None, deadline_seconds: float = 10.0) -> int:
         """
         🚨 Экстренная отмена всех открытых ордеров
         """
@@ -488,26 +529,129 @@ class OrderService:
         if symbol:
             open_orders = [order for order in open_orders if order.symbol == symbol]
 
-        cancelled_count = 0
-        for order in open_orders:
-            try:
-                if await self.cancel_order(order):
-                    cancelled_count += 1
-            except Exception as e:
-                logger.error(f"❌ Failed to cancel order {order.order_id}: {e}")
+        # Отменяются все открытые ордера символа(ов) - можно bulk cancel по символу
+        report = await self.cancel_orders_bulk(open_orders, deadline_seconds, all_for_symbol=True)
+        cancelled_count = report['cancelled']
 
-        logger.warning(f"🚨 Emergency cancelled {cancelled_count}/{len(open_orders)} orders")
+        logger.warning(
+            f"🚨 Emergency cancelled {cancelled_count}/{len(open_orders)} orders "
+            f"in {report['duration_ms']:.0f}ms"
+        )
         return cancelled_count
 
+    async def cancel_orders_bulk(
+        self,
+        orders: List[Order],
+        deadline_seconds: float = 10.0,
+        all_for_symbol: bool = False
+    ) -> Dict[str, Any]:
+        """
+        ⚡ Отмена набора ордеров: параллельные отмены в пределах лимитов, общий
+        дедлайн и один массовый перевод статусов в репозитории.
+
+        all_for_symbol=True - orders это ВСЕ открытые ордера своих символов: тогда,
+        где биржа умеет, используется bulk cancel по символу (он отменяет на бирже
+        все ордера символа, включая не переданные и не отслеживаемые локально).
+
+        Returns:
+            {'cancelled', 'failed', 'timed_out', 'duration_ms', 'results': {order_id: результат}}
+        """
+        started = time.perf_counter()
+        results: Dict[int, str] = {}
+        cancelled_ids: List[int] = []
+
+        remote = []
+        for order in orders:
+            if not self.exchange_connector or not order.exchange_id:
+                results[order.order_id] = "cancelled_locally"
+                cancelled_ids.append(order.order_id)
+            else:
+                remote.append(order)
+
+        # 1. Bulk отмена по символам (только когда отменяется весь символ)
+        if remote and all_for_symbol and hasattr(self.exchange_connector, 'supports_bulk_cancel') \
+                and self.exchange_connector.supports_bulk_cancel():
+            by_symbol: Dict[str, List[Order]] = {}
+            for order in remote:
+                by_symbol.setdefault(order.symbol, []).append(order)
+
+            bulk_calls = {
+                symbol: self.exchange_connector.cancel_all_orders_by_symbol(symbol)
+                for symbol in by_symbol
+            }
+            responses = await self._gather_with_deadline(bulk_calls, deadline_seconds)
+            remaining = []
+            for symbol, symbol_orders in by_symbol.items():
+                response = responses.get(symbol)
+                cancelled_exchange_ids = (
+                    {str(item.get('id')) for item in response}
+                    if isinstance(response, list) else set()
+                )
+                for order in symbol_orders:
+                    if str(order.exchange_id) in cancelled_exchange_ids:
+                        results[order.order_id] = "cancelled"
+                        cancelled_ids.append(order.order_id)
+                    else:
+                        remaining.append(order)
+            remote = remaining
+
+        # 2. Параллельные отмены оставшихся (лимитер коннектора держит бюджет)
+        time_left = deadline_seconds - (time.perf_counter() - started)
+        if remote and time_left > 0:
+            calls = {
+                order.order_id: self.exchange_connector.cancel_order(order.exchange_id, order.symbol)
+                for order in remote
+            }
+            responses = await self._gather_with_deadline(calls, time_left)
+            for order in remote:
+                response = responses.get(order.order_id, asyncio.TimeoutError())
+                if isinstance(response, asyncio.TimeoutError):
+                    results[order.order_id] = "timeout"
+                elif isinstance(response, Exception):
+                    results[order.order_id] = f"error: {response}"
+                else:
+                    results[order.order_id] = "cancelled"
+                    cancelled_ids.append(order.order_id)
+        else:
+            for order in remote:
+                results[order.order_id] = "timeout"
+
+        # 3. Один массовый переход статусов
+        if cancelled_ids:
+            self.orders_repo.bulk_update_status(cancelled_ids, Order.STATUS_CANCELED)
+            self.stats['orders_cancelled'] += len(cancelled_ids)
+
+        return {
+            'cancelled': len(cancelled_ids),
+            'failed': sum(1 for r in results.values() if r.startswith("error")),
+            'timed_out': sum(1 for r in results.values() if r == "timeout"),
+            'duration_ms': (time.perf_counter() - started) * 1000,
+            'results': results
+        }
+
+    @staticmethod
+    async def _gather_with_deadline(calls: Dict[Any, Any], timeout: float) -> Dict[Any, Any]:
+        """Запускает корутины параллельно; незавершенные к дедлайну отменяются и отсутствуют в ответе"""
+        tasks = {key: asyncio.ensure_future(coro) for key, coro in calls.items()}
+        if not tasks:
+            return {}
+        await asyncio.wait(tasks.values(), timeout=max(timeout, 0))
+
+        responses = {}
+        for key, task in tasks.items():
+            if task.done():
+                responses[key] = task.exception() or task.result()
+            else:
+                task.cancel()
+        return responses
+
     # 📊 СТАТИСТИКА И МОНИТОРИНГ
 
     def get_statistics(self) -> Dict[str, Any]:
         """📊 Получение статистики работы сервиса"""
-        all_orders = self.orders_repo.get_all()
-
         stats = self.stats.copy()
         stats.update({
-            'total_orders': len(all_orders),
+            'total_orders': self.orders_repo.count(),
             'open_orders': len(self.get_open_orders()),
             'success_rate': (self.stats['orders_executed'] / max(self.stats['orders_created'], 1)) * 100
         })
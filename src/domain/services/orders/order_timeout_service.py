@@ -10,6 +10,7 @@ from domain.entities.currency_pair import CurrencyPair
 from domain.services.orders.order_service import OrderService
 from domain.services.deals.deal_service import DealService
 from infrastructure.connectors.exchange_connector import CcxtExchangeConnector
+from domain.clock import now_ms
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +31,14 @@ class OrderTimeoutService:
         order_service: OrderService,
         deal_service: DealService,
         exchange_connector: CcxtExchangeConnector,
-        config: Dict[str, Any] = None
+        config: Dict[str, Any] = None,
+        market_data_cache=None
     ):
         self.order_service = order_service
         self.deal_service = deal_service
         self.exchange = exchange_connector
+        # 📡 Тикеры из общего кеша websocket (REST только если данные устарели)
+        self.ticker_source = market_data_cache or exchange_connector
         
         # Конфигурация таймаутов (по умолчанию)
         default_config = {
@@ -180,7 +184,7 @@ class OrderTimeoutService:
 
     async def _check_order_age(self, order: Order) -> Tuple[bool, float]:
         """Проверка превышения времени жизни BUY ордера"""
-        current_time = int(time.time() * 1000)
+        current_time = now_ms()
         order_age_ms = current_time - order.created_at
         order_age_minutes = order_age_ms / 1000 / 60
         
@@ -195,7 +199,7 @@ class OrderTimeoutService:
     async def _check_price_deviation(self, order: Order) -> Tuple[bool, float]:
         """Проверка отклонения цены BUY ордера от рыночной"""
         try:
-            ticker = await self.exchange.fetch_ticker(order.symbol)
+            ticker = await self.ticker_source.fetch_ticker(order.symbol)
             current_price = ticker['last']
             
             # Для BUY ордера: если рынок ушел значительно выше нашей цены покупки
@@ -288,7 +292,7 @@ class OrderTimeoutService:
         last_recreation_time = getattr(order, 'last_recreation_time', None)
         if last_recreation_time:
             min_interval_ms = self.config['min_time_between_recreations_minutes'] * 60 * 1000
-            time_since_last = int(time.time() * 1000) - last_recreation_time
+            time_since_last = now_ms() - last_recreation_time
             
             if time_since_last < min_interval_ms:
                 logger.warning(f"⚠️ Too soon to recreate order {order.order_id}, wait {min_interval_ms - time_since_last}ms")
@@ -315,7 +319,7 @@ class OrderTimeoutService:
             logger.info(f"🔄 Recreating BUY order {old_order.order_id} with current market price")
             
             # Получаем текущую цену
-            ticker = await self.exchange.fetch_ticker(old_order.symbol)
+            ticker = await self.ticker_source.fetch_ticker(old_order.symbol)
             current_price = ticker['last']
             
             # Для BUY ордера: ставим цену немного ниже текущей рыночной
@@ -342,7 +346,7 @@ class OrderTimeoutService:
                 new_order = execution_result.order
                 
                 # Отмечаем время пересоздания
-                new_order.last_recreation_time = int(time.time() * 1000)
+                new_order.last_recreation_time = now_ms()
                 
                 # Увеличиваем счетчик пересозданий для сделки
                 deal_id = old_order.deal_id
@@ -0,0 +1,260 @@
+# domain/services/trading/balance_service.py
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from domain.clock import now_ms
+
+logger = logging.getLogger(__name__)
+
+
+def _split_symbol(symbol: str) -> Tuple[str, str]:
+    """'ETHUSDT' / 'ETH/USDT' -> ('ETH', 'USDT')"""
+    if '/' in symbol:
+        base, quote = symbol.split('/')
+        return base, quote
+    for quote in ('USDT', 'USDC', 'BUSD', 'BTC', 'ETH', 'BNB'):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    return symbol, 'USDT'
+
+
+class BalanceService:
+    """
+    💰 Баланс аккаунта в памяти по потоку watch_balance
+
+    - free / used / total по валютам обновляются из user-data потока
+    - перед размещением ордера сумма резервируется локально, чтобы параллельные
+      исполнения не потратили одни и те же средства
+    - резерв размещенного ордера держится, пока не придет снимок баланса его
+      валюты с меткой времени позже размещения (биржа уже заблокировала средства)
+    - периодическая сверка через REST fetch_balance
+    Проверки баланса перед сделкой становятся поиском в памяти.
+    """
+
+    def __init__(
+        self,
+        exchange_connector,
+        reconcile_interval_seconds: float = 60,
+        max_age_ms: int = 120000
+    ):
+        self.exchange_connector = exchange_connector
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self.max_age_ms = max_age_ms
+
+        self.balances: Dict[str, Dict[str, float]] = {}
+        self.last_update_ms: Optional[int] = None
+
+        # reservation_id -> {'currency', 'amount', 'placed', 'submitted_at', 'covered'}
+        self.reservations: Dict[str, Dict[str, Any]] = {}
+        self._reservation_ids = itertools.count(1)
+
+        self.is_running = False
+        self._watch_task = None
+        self._reconcile_task = None
+
+        self.stats = {
+            'stream_updates': 0,
+            'reconciliations': 0,
+            'reconcile_errors': 0,
+            'reservations_made': 0,
+            'reservations_rejected': 0,
+            'rest_fallbacks': 0
+        }
+
+    # 🔄 ЖИЗНЕННЫЙ ЦИКЛ
+
+    async def start(self, watch: bool = True):
+        """Первичная загрузка через REST + запуск потока и периодической сверки"""
+        if self.is_running:
+            return
+        await self.reconcile()
+        self.is_running = True
+        if watch and hasattr(self.exchange_connector.async_client, 'watch_balance'):
+            self._watch_task = asyncio.create_task(self._watch_balance())
+        if self.reconcile_interval_seconds > 0:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+        logger.info("💰 BalanceService запущен (watch_balance + сверка)")
+
+    async def stop(self):
+        self.is_running = False
+        for task in (self._watch_task, self._reconcile_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._watch_task = None
+        self._reconcile_task = None
+
+    async def _watch_balance(self):
+        while self.is_running:
+            try:
+                balance = await self.exchange_connector.async_client.watch_balance()
+                self.apply_balance_update(balance)
+                self.stats['stream_updates'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка потока баланса: {e}")
+                await asyncio.sleep(1)
+
+    async def _reconcile_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.reconcile_interval_seconds)
+            await self.reconcile()
+
+    async def reconcile(self) -> bool:
+        """Полная сверка с биржей через REST"""
+        # Ответ гарантированно учитывает только ордера, размещенные до отправки запроса
+        requested_at = now_ms()
+        try:
+            balance = await self.exchange_connector.fetch_balance()
+        except Exception as e:
+            self.stats['reconcile_errors'] += 1
+            logger.warning(f"⚠️ Сверка баланса не удалась: {e}")
+            return False
+        self.apply_balance_update(balance, as_of_ms=requested_at)
+        self.stats['reconciliations'] += 1
+        return True
+
+    def apply_balance_update(self, balance: Dict[str, Any], as_of_ms: Optional[int] = None):
+        """
+        Применяет баланс в формате ccxt ({'USDT': {'free', 'used', 'total'}, ...}).
+        Момент снимка - timestamp биржи (и не позже as_of_ms, если задан); без
+        него резервы не снимаются. Снимок новее отправки ордера уже содержит
+        его блокировку: резерв размещенного ордера снимается, а еще не
+        подтвержденного - помечается и снимается при release(placed=True).
+        """
+        updated = set()
+        for currency, values in balance.items():
+            if currency in ('info', 'free', 'used', 'total', 'timestamp', 'datetime'):
+                continue
+            if not isinstance(values, dict):
+                continue
+            updated.add(currency)
+            current = self.balances.setdefault(currency, {'free': 0.0, 'used': 0.0, 'total': 0.0})
+            for key in ('free', 'used', 'total'):
+                if values.get(key) is not None:
+                    current[key] = float(values[key])
+
+        self.last_update_ms = int(time.time() * 1000)
+
+        snapshot_ms = balance.get('timestamp')
+        if as_of_ms is not None:
+            snapshot_ms = min(snapshot_ms, as_of_ms) if snapshot_ms else as_of_ms
+        if not snapshot_ms:
+            return
+        # Снимок позже отправки: биржа уже учла ордер, локальный резерв больше не нужен.
+        # Частичное обновление другой валюты резервы не трогает
+        for reservation_id, data in list(self.reservations.items()):
+            if data['currency'] not in updated or data['submitted_at'] >= snapshot_ms:
+                continue
+            if data['placed']:
+                del self.reservations[reservation_id]
+            else:
+                data['covered'] = True  # Событие пришло раньше ответа create_order
+
+    # 📤 ЧТЕНИЕ
+
+    def is_fresh(self) -> bool:
+        if self.last_update_ms is None:
+            return False
+        return int(time.time() * 1000) - self.last_update_ms <= self.max_age_ms
+
+    def get_reserved(self, currency: str) -> float:
+        return sum(r['amount'] for r in self.reservations.values() if r['currency'] == currency)
+
+    def get_free(self, currency: str) -> float:
+        """Свободно минус локальные резервы"""
+        free = self.balances.get(currency, {}).get('free', 0.0)
+        return free - self.get_reserved(currency)
+
+    async def _ensure_fresh(self):
+        if not self.is_fresh():
+            self.stats['rest_fallbacks'] += 1
+            await self.reconcile()
+
+    async def get_available_balance(self, currency: str) -> float:
+        """Совместимо с CcxtExchangeConnector.get_available_balance"""
+        await self._ensure_fresh()
+        return self.get_free(currency)
+
+    @staticmethod
+    def required_for_order(symbol: str, side: str, amount: float, price: Optional[float]) -> Tuple[str, float]:
+        base_currency, quote_currency = _split_symbol(symbol)
+        if side.lower() == 'buy':
+            return quote_currency, amount * (price or 0)
+        return base_currency, amount
+
+    async def check_sufficient_balance(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float = None
+    ) -> Tuple[bool, str, float]:
+        """Совместимо с CcxtExchangeConnector.check_sufficient_balance, но из памяти"""
+        await self._ensure_fresh()
+        currency, required = self.required_for_order(symbol, side, amount, price)
+        available = self.get_free(currency)
+        return available >= required, currency, available
+
+    # 🔒 РЕЗЕРВЫ
+
+    def reserve(self, currency: str, amount: float) -> Optional[str]:
+        """
+        Резервирует amount, если хватает свободных средств. Возвращает id резерва.
+        Резерв берется непосредственно перед отправкой ордера: его время -
+        момент отправки, с которым сравниваются снимки баланса.
+        """
+        if amount > self.get_free(currency):
+            self.stats['reservations_rejected'] += 1
+            return None
+        reservation_id = f"res_{next(self._reservation_ids)}"
+        self.reservations[reservation_id] = {
+            'currency': currency, 'amount': amount, 'placed': False,
+            'submitted_at': now_ms(), 'covered': False
+        }
+        self.stats['reservations_made'] += 1
+        return reservation_id
+
+    async def reserve_for_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float = None
+    ) -> Tuple[Optional[str], str, float]:
+        """Проверка + резерв под ордер: (id резерва или None, валюта, доступно)"""
+        await self._ensure_fresh()
+        currency, required = self.required_for_order(symbol, side, amount, price)
+        available = self.get_free(currency)
+        return self.reserve(currency, required), currency, available
+
+    def release(self, reservation_id: Optional[str], placed: bool = False):
+        """
+        Снимает резерв. placed=True: ордер размещен, резерв держится до
+        снимка баланса этой валюты новее момента отправки (если такой снимок
+        уже пришел, резерв снимается сразу).
+        """
+        if reservation_id is None or reservation_id not in self.reservations:
+            return
+        reservation = self.reservations[reservation_id]
+        if placed and not reservation['covered']:
+            reservation['placed'] = True
+        else:
+            del self.reservations[reservation_id]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика баланса и резервов"""
+        return {
+            **self.stats,
+            'currencies': len(self.balances),
+            'active_reservations': len(self.reservations),
+            'last_update_ms': self.last_update_ms,
+            'is_fresh': self.is_fresh()
+        }
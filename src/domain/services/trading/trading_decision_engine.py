@@ -1,6 +1,6 @@
 # domain/services/trading_decision_engine.py
 from typing import Dict, Optional
-from .orderbook_analyzer import OrderBookAnalyzer, OrderBookMetrics, OrderBookSignal
+from domain.services.market_data.orderbook_analyzer import OrderBookAnalyzer, OrderBookMetrics, OrderBookSignal
 
 class TradingDecisionEngine:
     """Движок принятия торговых решений с учетом MACD + стакана"""
@@ -64,6 +64,42 @@ class TradingDecisionEngine:
             
         return result
     
+    def gate_buy_signal(
+        self,
+        orderbook_metrics: Optional[OrderBookMetrics],
+        metrics_age_ms: Optional[int],
+        max_age_ms: int,
+        confidence_threshold: float = 0.0,
+        require_orderbook_support: bool = False
+    ) -> Dict:
+        """Фильтр BUY сигнала по закешированным метрикам стакана (без запросов к бирже)
+
+        Если метрик нет или они старше max_age_ms, решение принимает MACD,
+        кроме случая require_orderbook_support=True.
+        """
+        if orderbook_metrics is None or metrics_age_ms is None or metrics_age_ms > max_age_ms:
+            stale_reason = "нет данных" if metrics_age_ms is None else f"возраст {metrics_age_ms}мс > {max_age_ms}мс"
+            return {
+                'execute': not require_orderbook_support,
+                'reason': f"⚪ СТАКАН НЕДОСТУПЕН ({stale_reason}): "
+                          + ("требуется поддержка стакана" if require_orderbook_support else "MACD решает"),
+                'confidence': 0,
+                'modifications': {},
+                'orderbook_used': False,
+                'metrics_age_ms': metrics_age_ms
+            }
+
+        result = self.should_execute_trade(True, orderbook_metrics)
+        result['orderbook_used'] = True
+        result['metrics_age_ms'] = metrics_age_ms
+        result['orderbook_signal'] = orderbook_metrics.signal.value
+
+        if result['execute'] and result['confidence'] < confidence_threshold:
+            result['execute'] = False
+            result['reason'] = f"❌ СТАКАН: Низкое доверие {result['confidence']:.1%} < {confidence_threshold:.1%}"
+
+        return result
+
     def format_orderbook_info(self, metrics: OrderBookMetrics) -> str:
         """Форматирование информации о стакане"""
         info = []
@@ -7,6 +7,9 @@ from config.config_loader import load_config
 import ccxt
 import ccxt.pro as ccxt_async
 from domain.entities.order import ExchangeInfo
+from infrastructure.connectors.rate_limiter import WeightedRateLimiter
+from infrastructure.connectors.request_coalescer import RequestCoalescer
+from infrastructure.connectors.markets_cache import MarketsCache
 
 logger = logging.getLogger(__name__)
 
@@ -29,21 +32,26 @@ class CcxtExchangeConnector:
     Поддерживает все критические операции для реального трейдинга
     """
 
-    def __init__(self, exchange_name="binance", use_sandbox=False, config_path=None):
+    def __init__(self, exchange_name="binance", use_sandbox=False, config_path=None, markets_cache=None):
         self.exchange_name = exchange_name
         self.use_sandbox = use_sandbox
         self.config_path = config_path or "config/config.json"
         self.config = None
-        self.client = None
+        self._client = None  # Синхронный клиент создается только при первом обращении
         self.async_client = None
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
+        # Rate limiting: веса эндпоинтов вместо общей паузы 100ms
+        self.rate_limiter: Optional[WeightedRateLimiter] = None
+        self._last_rate_headers = None
+
+        # Single-flight: одинаковые одновременные запросы делят один вызов
+        self.coalescer = RequestCoalescer()
 
         # Cache для exchange info
         self.exchange_info_cache = {}
         self.symbols_cache = {}
+        # 💾 Рынки на диске с TTL, общие для коннекторов процесса
+        self.markets_cache: Optional[MarketsCache] = markets_cache
 
         # Инициализация
         self._load_config()
@@ -55,6 +63,10 @@ class CcxtExchangeConnector:
             full_config = load_config()
             env_key = 'sandbox' if self.use_sandbox else 'production'
             self.config = full_config.get('binance', {}).get(env_key, {})
+            self.rate_limiter = WeightedRateLimiter.from_config(full_config.get('rate_limiter', {}))
+            self.coalescer = RequestCoalescer.from_config(full_config.get('request_coalescing', {}))
+            if self.markets_cache is None:
+                self.markets_cache = MarketsCache.from_config(full_config.get('markets_cache', {}))
 
             private_key_path = self.config.get('privateKeyPath')
             if private_key_path and Path(private_key_path).exists():
@@ -67,12 +79,12 @@ class CcxtExchangeConnector:
             logger.error(f"❌ Failed to load config: {e}")
             raise
 
-    def _init_exchange_clients(self):
-        """Инициализирует синхронный и асинхронный клиенты"""
-        try:
-            # Синхронный клиент
+    @property
+    def client(self):
+        """Синхронный ccxt клиент (ленивая инициализация: торговый путь его не использует)"""
+        if self._client is None:
             exchange_class = getattr(ccxt, self.exchange_name)
-            self.client = exchange_class({
+            self._client = exchange_class({
                 'apiKey': self.config.get('apiKey'),
                 'secret': self.config.get('secret'),
                 'enableRateLimit': True,
@@ -81,23 +93,35 @@ class CcxtExchangeConnector:
                     'defaultType': 'spot',  # spot торговля
                 }
             })
+            if self.use_sandbox and hasattr(self._client, 'set_sandbox_mode'):
+                self._client.set_sandbox_mode(True)
+        return self._client
 
-            # Асинхронный клиент
+    @property
+    def markets_namespace(self) -> str:
+        return f"{self.exchange_name}:{'sandbox' if self.use_sandbox else 'production'}"
+
+    def _init_exchange_clients(self):
+        """Инициализирует асинхронный клиент"""
+        try:
             async_exchange_class = getattr(ccxt_async, self.exchange_name)
             self.async_client = async_exchange_class({
                 'apiKey': self.config.get('apiKey'),
                 'secret': self.config.get('secret'),
-                'enableRateLimit': True,
-                'rateLimit': 100,
+                'enableRateLimit': False,  # Лимиты соблюдает WeightedRateLimiter
                 'options': {
                     'defaultType': 'spot',
+                    # load_markets = один запрос exchangeInfo (вес 20 в WeightedRateLimiter):
+                    # без фьючерсных рынков, маржинальных пар и приватного списка валют
+                    'fetchMarkets': {'types': ['spot']},
+                    'fetchMargins': False,
+                    'fetchCurrencies': False,
                 }
             })
 
             # Включаем sandbox режим
             if self.use_sandbox:
-                if hasattr(self.client, 'set_sandbox_mode'):
-                    self.client.set_sandbox_mode(True)
+                if hasattr(self.async_client, 'set_sandbox_mode'):
                     self.async_client.set_sandbox_mode(True)
                     logger.info("🧪 Sandbox mode enabled")
                 else:
@@ -109,14 +133,42 @@ class CcxtExchangeConnector:
             logger.error(f"❌ Failed to initialize exchange clients: {e}")
             raise
 
-    async def _rate_limit_wait(self):
-        """Соблюдает rate limiting"""
-        import time
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            await asyncio.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+    async def _rate_limit_wait(self, endpoint: str = 'default', weight: Optional[int] = None):
+        """Соблюдает лимиты биржи по весу запросов и числу ордеров"""
+        if self.rate_limiter is None:
+            self.rate_limiter = WeightedRateLimiter()
+
+        # Корректируем модель по заголовкам последнего ответа (если они новые)
+        headers = getattr(self.async_client, 'last_response_headers', None)
+        if headers and headers is not self._last_rate_headers:
+            self._last_rate_headers = headers
+            self.rate_limiter.update_from_headers(headers)
+
+        await self.rate_limiter.acquire(endpoint, weight)
+
+    def get_rate_limit_statistics(self) -> Dict[str, Any]:
+        """📊 Метрики ожидания лимитера и запас по весам"""
+        if self.rate_limiter is None:
+            return {}
+        return self.rate_limiter.get_statistics()
+
+    def get_coalescing_statistics(self) -> Dict[str, Any]:
+        """📊 Попадания в кеш и объединенные запросы single-flight"""
+        return self.coalescer.get_statistics()
+
+    def _order_key(self, order_id: str, symbol: str) -> Tuple[str, str]:
+        """Ключ fetch_order: id ордеров Binance уникальны только в пределах символа"""
+        return self._normalize_symbol(symbol), str(order_id)
+
+    def _invalidate_order_caches(self, order_id: Optional[str] = None, symbol: Optional[str] = None):
+        """После изменения ордеров кешированные ответы о них устарели"""
+        self.coalescer.invalidate('fetch_open_orders')
+        self.coalescer.invalidate('fetch_balance')
+        if order_id is not None:
+            if symbol is not None:
+                self.coalescer.invalidate('fetch_order', self._order_key(order_id, symbol))
+            else:
+                self.coalescer.invalidate('fetch_order')
 
     # 🚀 ОСНОВНЫЕ МЕТОДЫ ДЛЯ ТОРГОВЛИ
 
@@ -143,7 +195,7 @@ class CcxtExchangeConnector:
         Returns:
             Ответ биржи с информацией об ордере
         """
-        await self._rate_limit_wait()
+        await self._rate_limit_wait('create_order')
 
         try:
             logger.info(f"📤 Creating {side.upper()} {order_type} order: {amount} {symbol} @ {price}")
@@ -169,6 +221,7 @@ class CcxtExchangeConnector:
                 )
 
             logger.info(f"✅ Order created successfully: {result.get('id', 'N/A')}")
+            self._invalidate_order_caches()
             return result
 
         except ccxt.InsufficientFunds as e:
@@ -188,7 +241,7 @@ class CcxtExchangeConnector:
         """
         ❌ Отмена ордера на бирже
         """
-        await self._rate_limit_wait()
+        await self._rate_limit_wait('cancel_order')
 
         try:
             logger.info(f"❌ Cancelling order {order_id} for {symbol}")
@@ -196,6 +249,7 @@ class CcxtExchangeConnector:
             result = await self.async_client.cancel_order(order_id, symbol)
 
             logger.info(f"✅ Order cancelled successfully: {order_id}")
+            self._invalidate_order_caches(order_id, symbol)
             return result
 
         except ccxt.OrderNotFound as e:
@@ -209,11 +263,12 @@ class CcxtExchangeConnector:
         """
         📊 Получение информации об ордере
         """
-        await self._rate_limit_wait()
+        async def request():
+            await self._rate_limit_wait('fetch_order')
+            return await self.async_client.fetch_order(order_id, symbol)
 
         try:
-            result = await self.async_client.fetch_order(order_id, symbol)
-            return result
+            return await self.coalescer.run('fetch_order', self._order_key(order_id, symbol), request)
         except Exception as e:
             logger.error(f"❌ Error fetching order {order_id}: {e}")
             raise
@@ -222,11 +277,12 @@ class CcxtExchangeConnector:
         """
         📋 Получение всех открытых ордеров
         """
-        await self._rate_limit_wait()
+        async def request():
+            await self._rate_limit_wait('fetch_open_orders' if symbol else 'fetch_open_orders_all')
+            return await self.async_client.fetch_open_orders(symbol)
 
         try:
-            result = await self.async_client.fetch_open_orders(symbol)
-            return result
+            return await self.coalescer.run('fetch_open_orders', symbol, request)
         except Exception as e:
             logger.error(f"❌ Error fetching open orders: {e}")
             raise
@@ -235,7 +291,7 @@ class CcxtExchangeConnector:
         """
         📚 Получение истории ордеров
         """
-        await self._rate_limit_wait()
+        await self._rate_limit_wait('fetch_orders')
 
         try:
             result = await self.async_client.fetch_orders(symbol, None, limit)
@@ -250,10 +306,12 @@ class CcxtExchangeConnector:
         """
         💰 Получение баланса аккаунта
         """
-        await self._rate_limit_wait()
+        async def request():
+            await self._rate_limit_wait('fetch_balance')
+            return await self.async_client.fetch_balance()
 
         try:
-            balance = await self.async_client.fetch_balance()
+            balance = await self.coalescer.run('fetch_balance', None, request)
 
             # Логируем только основные валюты
             main_currencies = ['USDT', 'BTC', 'ETH', 'BNB']
@@ -319,11 +377,12 @@ class CcxtExchangeConnector:
         """
         📈 Получение тикера (цена, объем, изменение)
         """
-        await self._rate_limit_wait()
+        async def request():
+            await self._rate_limit_wait('fetch_ticker')
+            return await self.async_client.fetch_ticker(symbol)
 
         try:
-            ticker = await self.async_client.fetch_ticker(symbol)
-            return ticker
+            return await self.coalescer.run('fetch_ticker', symbol, request)
         except Exception as e:
             logger.error(f"❌ Error fetching ticker for {symbol}: {e}")
             raise
@@ -332,32 +391,63 @@ class CcxtExchangeConnector:
         """
         📊 Получение стакана заявок
         """
-        await self._rate_limit_wait()
+        weight = 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+
+        async def request():
+            await self._rate_limit_wait('fetch_order_book', weight)
+            return await self.async_client.fetch_order_book(symbol, limit)
 
         try:
-            orderbook = await self.async_client.fetch_order_book(symbol, limit)
-            return orderbook
+            return await self.coalescer.run('fetch_orderbook', (symbol, limit), request)
         except Exception as e:
             logger.error(f"❌ Error fetching orderbook for {symbol}: {e}")
             raise
 
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "1m",
+        limit: int = 200,
+        since: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        🕯️ Получение исторических свечей [timestamp, open, high, low, close, volume]
+        """
+        await self._rate_limit_wait('fetch_ohlcv')
+
+        try:
+            return await self.async_client.fetch_ohlcv(symbol, timeframe, since, limit)
+        except Exception as e:
+            logger.error(f"❌ Error fetching OHLCV for {symbol}: {e}")
+            raise
+
     async def fetch_exchange_info(self, symbol: str = None) -> Dict[str, Any]:
         """
         ℹ️ Получение информации о бирже и торговых парах
         """
-        await self._rate_limit_wait()
-
         if symbol:
             symbol = self._normalize_symbol(symbol)
             if symbol in self.exchange_info_cache:
                 return self.exchange_info_cache[symbol]
+            if self.markets_cache is not None:
+                market = self.markets_cache.get_market(self.markets_namespace, symbol)
+                if market is not None:
+                    self._seed_client_markets()
+                    self.exchange_info_cache[symbol] = market
+                    return market
+
+        async def request():
+            await self._rate_limit_wait('load_markets')
+            return await self.async_client.load_markets()
 
         try:
             if symbol and symbol in self.exchange_info_cache:
                 return self.exchange_info_cache[symbol]
 
-            # Для ccxt используем метод load_markets
-            markets = await self.async_client.load_markets()
+            # Для ccxt используем метод load_markets (одновременные вызовы - один запрос)
+            markets = await self.coalescer.run('load_markets', None, request)
+            if self.markets_cache is not None and self.markets_cache.get_markets(self.markets_namespace) is None:
+                self.markets_cache.store(self.markets_namespace, markets)
 
             if symbol:
                 if symbol in markets:
@@ -373,6 +463,20 @@ class CcxtExchangeConnector:
             logger.error(f"❌ Error fetching exchange info: {e}")
             raise
 
+    def _seed_client_markets(self):
+        """
+        Заполняет рынки клиента ccxt из дискового кеша: иначе watch_ticker и
+        create_order сами вызовут load_markets в обход WeightedRateLimiter
+        """
+        if self.async_client is None or getattr(self.async_client, 'markets', None):
+            return
+        markets = self.markets_cache.get_markets(self.markets_namespace)
+        if markets:
+            try:
+                self.async_client.set_markets(markets)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось заполнить рынки клиента из кеша: {e}")
+
     def _normalize_symbol(self, symbol: str) -> str:
         """Преобразует 'ETHUSDT' -> 'ETH/USDT'"""
         if '/' in symbol:
@@ -432,15 +536,21 @@ class CcxtExchangeConnector:
             logger.error(f"❌ Connection test failed: {e}")
             return False
 
+    async def fetch_server_time(self) -> int:
+        """
+        ⏰ Время сервера биржи (GET /api/v3/time) без подмены локальным временем
+        """
+        await self._rate_limit_wait('fetch_time')
+        return await self.async_client.fetch_time()
+
     async def get_server_time(self) -> int:
         """
         ⏰ Получение времени сервера биржи
         """
         try:
-            await self._rate_limit_wait()
             # Для ccxt используем fetch_time если доступен
             if hasattr(self.async_client, 'fetch_time'):
-                return await self.async_client.fetch_time()
+                return await self.fetch_server_time()
             else:
                 # Fallback к текущему времени
                 import time
@@ -497,20 +607,49 @@ class CcxtExchangeConnector:
 
     # 🆕 ДОПОЛНИТЕЛЬНЫЕ МЕТОДЫ
 
+    def supports_bulk_cancel(self) -> bool:
+        """Есть ли у биржи отмена всех ордеров по символу одним запросом"""
+        has = getattr(self.async_client, 'has', None) or {}
+        return bool(has.get('cancelAllOrders'))
+
+    async def cancel_all_orders_by_symbol(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        🚨 Отмена всех открытых ордеров символа одним запросом (DELETE openOrders)
+        """
+        await self._rate_limit_wait('cancel_all_orders')
+
+        try:
+            result = await self.async_client.cancel_all_orders(symbol)
+            self._invalidate_order_caches()
+            self.coalescer.invalidate('fetch_order')
+            return result if isinstance(result, list) else []
+        except Exception as e:
+            logger.error(f"❌ Error bulk cancelling orders for {symbol}: {e}")
+            raise
+
     async def cancel_all_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
         """
         🚨 Отмена всех открытых ордеров (экстренная функция)
+        По символу - одним bulk запросом, иначе параллельно в пределах лимитов
         """
         try:
+            if symbol and self.supports_bulk_cancel():
+                cancelled_orders = await self.cancel_all_orders_by_symbol(symbol)
+                logger.info(f"✅ Cancelled {len(cancelled_orders)} orders (bulk)")
+                return cancelled_orders
+
             open_orders = await self.fetch_open_orders(symbol)
-            cancelled_orders = []
+            results = await asyncio.gather(
+                *[self.cancel_order(order['id'], order['symbol']) for order in open_orders],
+                return_exceptions=True
+            )
 
-            for order in open_orders:
-                try:
-                    result = await self.cancel_order(order['id'], order['symbol'])
+            cancelled_orders = []
+            for order, result in zip(open_orders, results):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Failed to cancel order {order['id']}: {result}")
+                else:
                     cancelled_orders.append(result)
-                except Exception as e:
-                    logger.error(f"❌ Failed to cancel order {order['id']}: {e}")
 
             logger.info(f"✅ Cancelled {len(cancelled_orders)} orders")
             return cancelled_orders
@@ -523,7 +662,7 @@ class CcxtExchangeConnector:
         """
         📜 Получение истории сделок
         """
-        await self._rate_limit_wait()
+        await self._rate_limit_wait('fetch_my_trades')
 
         try:
             trades = await self.async_client.fetch_my_trades(symbol, None, limit)
@@ -0,0 +1,122 @@
+# infrastructure/connectors/markets_cache.py
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MarketsCache:
+    """
+    💾 Кеш рынков биржи (load_markets) на диске с TTL
+
+    - один файл на процесс, общий для всех коннекторов (shared)
+    - рынки разделены по namespace ('binance:production', 'binance:sandbox')
+    - файл читается лениво при первом обращении к символу
+    - рынки хранятся целиком (с сырым 'info'), чтобы ими можно было
+      заполнить клиент ccxt (set_markets) вместо его собственного load_markets
+    Повторный старт не скачивает все рынки Binance ради одной пары.
+    """
+
+    _shared: Dict[str, 'MarketsCache'] = {}
+
+    def __init__(self, cache_file: str = "markets_cache.json", ttl_seconds: float = 86400):
+        self.cache_file = Path(cache_file)
+        self.ttl_seconds = ttl_seconds
+        self._namespaces: Optional[Dict[str, Dict[str, Any]]] = None
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'file_loads': 0,
+            'saves': 0,
+            'load_ms': 0.0
+        }
+
+    @classmethod
+    def shared(cls, cache_file: str = "markets_cache.json", ttl_seconds: float = 86400) -> 'MarketsCache':
+        """Один экземпляр на файл: коннекторы процесса делят загруженные рынки"""
+        key = str(Path(cache_file).resolve())
+        if key not in cls._shared:
+            cls._shared[key] = cls(cache_file, ttl_seconds)
+        return cls._shared[key]
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['MarketsCache']:
+        """Создание из секции markets_cache конфигурации (None, если выключен)"""
+        config = config or {}
+        if not config.get("enabled", True):
+            return None
+        return cls.shared(
+            cache_file=config.get("cache_file", "markets_cache.json"),
+            ttl_seconds=config.get("ttl_seconds", 86400),
+        )
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._namespaces is not None:
+            return self._namespaces
+
+        started = time.perf_counter()
+        self._namespaces = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r") as f:
+                    self._namespaces = json.load(f)
+                self.stats['file_loads'] += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Кеш рынков поврежден, будет перезаписан: {e}")
+        self.stats['load_ms'] = (time.perf_counter() - started) * 1000
+        return self._namespaces
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get('saved_at', 0) <= self.ttl_seconds
+
+    def get_market(self, namespace: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """Рынок символа из кеша или None (нет, устарел)"""
+        entry = self._load().get(namespace)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        if not self._is_fresh(entry):
+            self.stats['stale'] += 1
+            return None
+        market = entry['markets'].get(symbol)
+        if market is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return market
+
+    def get_markets(self, namespace: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Все рынки namespace, если кеш свежий"""
+        entry = self._load().get(namespace)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry['markets']
+
+    def store(self, namespace: str, markets: Dict[str, Dict[str, Any]]):
+        """Сохраняет рынки и атомарно переписывает файл"""
+        self._load()[namespace] = {'saved_at': time.time(), 'markets': dict(markets)}
+
+        tmp_path = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            if self.cache_file.parent and not self.cache_file.parent.exists():
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self._namespaces, f)
+            os.replace(tmp_path, self.cache_file)
+            self.stats['saves'] += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить кеш рынков: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика кеша рынков"""
+        namespaces = self._namespaces or {}
+        return {
+            **self.stats,
+            'namespaces': {name: len(entry.get('markets', {})) for name, entry in namespaces.items()}
+        }
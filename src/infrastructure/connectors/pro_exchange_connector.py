@@ -3,9 +3,10 @@ from pathlib import Path
 from config.config_loader import load_config
 
 class CcxtProMarketDataConnector:
-    def __init__(self, exchange_name="binance", use_sandbox=False):
+    def __init__(self, exchange_name="binance", use_sandbox=False, ws_url=None):
         self.exchange_name = exchange_name
         self.use_sandbox = use_sandbox
+        self.ws_url = ws_url  # Отдельный websocket endpoint (для резервных потоков)
         self.config = None
         self._load_config()
         self.client = self._init_exchange_client()
@@ -40,4 +41,7 @@ class CcxtProMarketDataConnector:
         if self.use_sandbox:
             client.set_sandbox_mode(True)
 
+        if self.ws_url:
+            client.urls['api']['ws']['spot'] = self.ws_url
+
         return client
\ No newline at end of file
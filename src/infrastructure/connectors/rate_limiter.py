@@ -0,0 +1,202 @@
+# infrastructure/connectors/rate_limiter.py
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Ведро токенов: capacity токенов, пополняется равномерно за interval_seconds"""
+
+    def __init__(self, name: str, capacity: float, interval_seconds: float):
+        self.name = name
+        self.capacity = float(capacity)
+        self.interval_seconds = float(interval_seconds)
+        self.refill_per_second = self.capacity / self.interval_seconds
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def time_until(self, cost: float) -> float:
+        """Сколько секунд ждать, пока накопится cost токенов"""
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.refill_per_second
+
+    def sync_used(self, used: float):
+        """Коррекция по фактическому расходу, который сообщила биржа"""
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class WeightedRateLimiter:
+    """
+    🚦 Лимитер запросов по весам эндпоинтов (модель лимитов Binance spot)
+
+    - request_weight: вес запросов в минуту (x-mbx-used-weight-1m)
+    - orders_10s / orders_1d: число новых ордеров (x-mbx-order-count-10s / -1d)
+    Запросы в пределах бюджета идут параллельно, без общей паузы между вызовами.
+    Ответные заголовки used-weight корректируют модель, если биржа насчитала больше.
+    """
+
+    # endpoint -> (вес, новых ордеров)
+    ENDPOINT_COSTS: Dict[str, Tuple[int, int]] = {
+        'create_order': (1, 1),
+        'cancel_order': (1, 0),
+        'cancel_all_orders': (1, 0),
+        'fetch_order': (4, 0),
+        'fetch_open_orders': (6, 0),
+        'fetch_open_orders_all': (80, 0),
+        'fetch_orders': (20, 0),
+        'fetch_my_trades': (20, 0),
+        'fetch_balance': (20, 0),
+        'fetch_ticker': (2, 0),
+        'fetch_order_book': (5, 0),
+        'fetch_ohlcv': (2, 0),
+        'load_markets': (20, 0),
+        'fetch_time': (1, 0),
+        'default': (1, 0),
+    }
+
+    HEADER_BUCKETS = {
+        'x-mbx-used-weight-1m': 'request_weight',
+        'x-mbx-order-count-10s': 'orders_10s',
+        'x-mbx-order-count-1d': 'orders_1d',
+    }
+
+    def __init__(
+        self,
+        weight_per_minute: int = 6000,
+        orders_per_10s: int = 50,
+        orders_per_day: int = 160000,
+        safety_margin: float = 0.9,
+        endpoint_costs: Optional[Dict[str, Tuple[int, int]]] = None
+    ):
+        self.safety_margin = safety_margin
+        self.buckets: Dict[str, TokenBucket] = {
+            'request_weight': TokenBucket('request_weight', weight_per_minute * safety_margin, 60),
+            'orders_10s': TokenBucket('orders_10s', orders_per_10s * safety_margin, 10),
+            'orders_1d': TokenBucket('orders_1d', orders_per_day * safety_margin, 86400),
+        }
+        self.endpoint_costs = {**self.ENDPOINT_COSTS, **(endpoint_costs or {})}
+
+        self.endpoint_stats: Dict[str, Dict[str, float]] = {}
+        self.stats = {
+            'requests': 0,
+            'throttled_requests': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'header_corrections': 0
+        }
+        self.last_used: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'WeightedRateLimiter':
+        """Создание из секции rate_limiter конфигурации"""
+        config = config or {}
+        return cls(
+            weight_per_minute=config.get("weight_per_minute", 6000),
+            orders_per_10s=config.get("orders_per_10s", 50),
+            orders_per_day=config.get("orders_per_day", 160000),
+            safety_margin=config.get("safety_margin", 0.9),
+        )
+
+    def get_cost(self, endpoint: str, weight: Optional[int] = None) -> Dict[str, float]:
+        base_weight, orders = self.endpoint_costs.get(endpoint, self.endpoint_costs['default'])
+        cost = {'request_weight': weight if weight is not None else base_weight}
+        if orders:
+            cost['orders_10s'] = orders
+            cost['orders_1d'] = orders
+        return cost
+
+    async def acquire(self, endpoint: str = 'default', weight: Optional[int] = None) -> float:
+        """Ждет, пока во всех ведрах хватит токенов, и списывает их. Возвращает ожидание в мс"""
+        cost = self.get_cost(endpoint, weight)
+        started = time.monotonic()
+        throttled = False
+
+        while True:
+            now = time.monotonic()
+            delay = 0.0
+            for name, amount in cost.items():
+                bucket = self.buckets[name]
+                bucket.refill(now)
+                # Запрос дороже всего ведра пропускаем, как только оно полное
+                delay = max(delay, bucket.time_until(min(amount, bucket.capacity)))
+
+            if delay <= 0:
+                for name, amount in cost.items():
+                    self.buckets[name].tokens -= amount
+                break
+            throttled = True
+            await asyncio.sleep(delay)
+
+        wait_ms = (time.monotonic() - started) * 1000 if throttled else 0.0
+        self._record(endpoint, wait_ms)
+        return wait_ms
+
+    def update_from_headers(self, headers: Optional[Mapping[str, Any]]) -> bool:
+        """Синхронизирует модель с заголовками used-weight / order-count ответа биржи"""
+        if not headers:
+            return False
+
+        corrected = False
+        now = time.monotonic()
+        for key, value in headers.items():
+            bucket_name = self.HEADER_BUCKETS.get(str(key).lower())
+            if bucket_name is None:
+                continue
+            try:
+                used = int(value)
+            except (TypeError, ValueError):
+                continue
+
+            bucket = self.buckets[bucket_name]
+            bucket.refill(now)
+            self.last_used[bucket_name] = used
+            before = bucket.tokens
+            bucket.sync_used(used)
+            if bucket.tokens < before:
+                corrected = True
+
+        if corrected:
+            self.stats['header_corrections'] += 1
+        return corrected
+
+    def _record(self, endpoint: str, wait_ms: float):
+        self.stats['requests'] += 1
+        self.stats['total_wait_ms'] += wait_ms
+        self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+        if wait_ms > 0:
+            self.stats['throttled_requests'] += 1
+
+        stats = self.endpoint_stats.setdefault(endpoint, {'count': 0, 'total_wait_ms': 0.0, 'max_wait_ms': 0.0})
+        stats['count'] += 1
+        stats['total_wait_ms'] += wait_ms
+        stats['max_wait_ms'] = max(stats['max_wait_ms'], wait_ms)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Ожидания по эндпоинтам и текущий запас в ведрах"""
+        now = time.monotonic()
+        buckets = {}
+        for name, bucket in self.buckets.items():
+            bucket.refill(now)
+            buckets[name] = {
+                'capacity': bucket.capacity,
+                'available': round(bucket.tokens, 2),
+                'last_reported_used': self.last_used.get(name)
+            }
+
+        requests = max(self.stats['requests'], 1)
+        return {
+            **self.stats,
+            'avg_wait_ms': self.stats['total_wait_ms'] / requests,
+            'buckets': buckets,
+            'endpoints': self.endpoint_stats
+        }
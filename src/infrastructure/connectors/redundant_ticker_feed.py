@@ -0,0 +1,231 @@
+# infrastructure/connectors/redundant_ticker_feed.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from domain.clock import now_ms
+
+logger = logging.getLogger(__name__)
+
+
+def ticker_from_orderbook(symbol: str, orderbook: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Тикер из вершины стакана: last = середина спреда"""
+    bids, asks = orderbook.get('bids') or [], orderbook.get('asks') or []
+    if not bids or not asks:
+        return None
+    bid, ask = float(bids[0][0]), float(asks[0][0])
+    mid = (bid + ask) / 2
+    return {
+        'symbol': orderbook.get('symbol', symbol),
+        'last': mid,
+        'close': mid,
+        'bid': bid,
+        'ask': ask,
+        'bidVolume': float(bids[0][1]),
+        'askVolume': float(asks[0][1]),
+        'timestamp': orderbook.get('timestamp'),
+        'info': {'source': 'book', 'nonce': orderbook.get('nonce')}
+    }
+
+
+class RedundantTickerFeed:
+    """
+    🏁 Несколько независимых потоков тикеров с гонкой "кто первый"
+
+    Каждый источник - своя websocket-подписка (другой endpoint той же биржи или
+    вершина стакана). Обновления дедуплицируются по sequence / метке времени биржи,
+    дальше уходит первая пришедшая копия. Зависание одного соединения не
+    останавливает поток. watch_ticker() совместим с ccxt async_client.watch_ticker.
+
+    Гоняются только потоки одного вида (kinds: 'ticker' или 'book'): синтетический
+    тикер из стакана (mid, без объемов) не смешивается с настоящим 24h тикером
+    и не отбрасывает его как устаревший. Если есть потоки 'ticker', потоки
+    'book' не запускаются.
+    """
+
+    def __init__(
+        self,
+        feeds: Dict[str, Callable[[str], Awaitable[Optional[Dict[str, Any]]]]],
+        kinds: Optional[Dict[str, str]] = None,
+        dedup_window: int = 2048,
+        queue_size: int = 1000,
+        retry_delay_seconds: float = 1.0
+    ):
+        if not feeds:
+            raise ValueError("RedundantTickerFeed requires at least one feed")
+        self.feeds = feeds
+        self.kinds = {name: (kinds or {}).get(name, 'ticker') for name in feeds}
+        self.race_kind = 'ticker' if 'ticker' in self.kinds.values() else 'book'
+        self.dedup_window = dedup_window
+        self.retry_delay_seconds = retry_delay_seconds
+
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._queue_size = queue_size
+        self._tasks: List[asyncio.Task] = []
+
+        # (symbol, key) -> (имя победившего источника, perf_counter первого прихода)
+        self._seen: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._last_forwarded_ts: Dict[str, int] = {}
+
+        self.feed_stats: Dict[str, Dict[str, Any]] = {
+            name: {
+                'updates': 0,
+                'wins': 0,
+                'duplicates': 0,
+                'stale': 0,
+                'other_kind': 0,
+                'errors': 0,
+                'total_latency_ms': 0.0,
+                'max_latency_ms': 0.0,
+                'total_lag_ms': 0.0,
+                'last_update_at': None
+            }
+            for name in feeds
+        }
+        self.stats = {'forwarded': 0, 'dropped_backlog': 0}
+
+    @classmethod
+    def from_clients(cls, clients: Dict[str, Any], kinds: Optional[Dict[str, str]] = None, **kwargs) -> 'RedundantTickerFeed':
+        """
+        Источники из ccxt pro клиентов: kind 'ticker' - watch_ticker,
+        'book' - вершина watch_order_book
+        """
+        kinds = kinds or {}
+        feeds = {}
+        for name, client in clients.items():
+            if kinds.get(name, 'ticker') == 'book':
+                async def watch_book(symbol, client=client):
+                    return ticker_from_orderbook(symbol, await client.watch_order_book(symbol, 5))
+                feeds[name] = watch_book
+            else:
+                feeds[name] = client.watch_ticker
+        feed = cls(feeds, kinds, **kwargs)
+        ignored = [name for name, kind in feed.kinds.items() if kind != feed.race_kind]
+        if ignored:
+            logger.warning(f"⚠️ Потоки {', '.join(ignored)} другого вида не участвуют в гонке {feed.race_kind}")
+        return feed
+
+    # 🔄 ПОДПИСКА
+
+    async def watch_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Следующее уникальное обновление символа (первая пришедшая копия)"""
+        queue = self._queues.get(symbol)
+        if queue is None:
+            queue = self._start(symbol)
+        return await queue.get()
+
+    def _start(self, symbol: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        self._queues[symbol] = queue
+        racing = [name for name in self.feeds if self.kinds[name] == self.race_kind]
+        for name in racing:
+            self._tasks.append(asyncio.create_task(self._run_feed(name, self.feeds[name], symbol)))
+        logger.info(f"🏁 Гонка потоков {symbol}: {', '.join(racing)}")
+        return queue
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queues = {}
+
+    async def _run_feed(self, name: str, watch: Callable, symbol: str):
+        while True:
+            try:
+                ticker = await watch(symbol)
+                if ticker is not None:
+                    self.on_update(name, symbol, ticker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.feed_stats[name]['errors'] += 1
+                logger.warning(f"⚠️ Поток {name} ({symbol}): {e}")
+                await asyncio.sleep(self.retry_delay_seconds)
+
+    # 🏁 ДЕДУПЛИКАЦИЯ
+
+    @staticmethod
+    def update_key(ticker: Dict[str, Any]) -> Hashable:
+        """sequence биржи, если есть, иначе (метка времени, цены)"""
+        info = ticker.get('info') or {}
+        sequence = info.get('u') if isinstance(info, dict) else None
+        if sequence is not None:
+            return ('seq', sequence)
+        return ('ts', ticker.get('timestamp'), ticker.get('last'), ticker.get('bid'), ticker.get('ask'))
+
+    def on_update(self, name: str, symbol: str, ticker: Dict[str, Any]) -> bool:
+        """Учитывает обновление источника; True - оно ушло потребителю первым"""
+        arrived = time.perf_counter()
+        stats = self.feed_stats[name]
+        stats['updates'] += 1
+        stats['last_update_at'] = arrived
+        if self.kinds[name] != self.race_kind:
+            # Другой вид данных: свой ключ дедупликации и своя шкала времени
+            stats['other_kind'] += 1
+            return False
+
+        timestamp = ticker.get('timestamp')
+        if timestamp:
+            latency = max(0.0, now_ms() - float(timestamp))
+            stats['total_latency_ms'] += latency
+            stats['max_latency_ms'] = max(stats['max_latency_ms'], latency)
+
+        seen_key = (symbol, self.update_key(ticker))
+        first = self._seen.get(seen_key)
+        if first is not None:
+            stats['duplicates'] += 1
+            stats['total_lag_ms'] += (arrived - first[1]) * 1000
+            return False
+
+        if timestamp and timestamp < self._last_forwarded_ts.get(symbol, 0):
+            stats['stale'] += 1
+            return False
+
+        self._seen[seen_key] = (name, arrived)
+        if len(self._seen) > self.dedup_window:
+            self._seen.popitem(last=False)
+        if timestamp:
+            self._last_forwarded_ts[symbol] = timestamp
+
+        stats['wins'] += 1
+        self.stats['forwarded'] += 1
+        self._forward(symbol, {**ticker, 'feed': name})
+        return True
+
+    def _forward(self, symbol: str, ticker: Dict[str, Any]):
+        queue = self._queues.get(symbol)
+        if queue is None:
+            return
+        if queue.full():
+            # Потребитель отстает: старые тикеры ценности не имеют
+            queue.get_nowait()
+            self.stats['dropped_backlog'] += 1
+        queue.put_nowait(ticker)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Доля побед, задержка и отставание по каждому источнику"""
+        now = time.perf_counter()
+        feeds = {}
+        for name, stats in self.feed_stats.items():
+            updates = max(stats['updates'], 1)
+            forwarded = max(self.stats['forwarded'], 1)
+            feeds[name] = {
+                'updates': stats['updates'],
+                'wins': stats['wins'],
+                'win_rate': stats['wins'] / forwarded * 100,
+                'duplicates': stats['duplicates'],
+                'stale': stats['stale'],
+                'other_kind': stats['other_kind'],
+                'errors': stats['errors'],
+                'avg_latency_ms': stats['total_latency_ms'] / updates,
+                'max_latency_ms': stats['max_latency_ms'],
+                'avg_lag_when_late_ms': stats['total_lag_ms'] / max(stats['duplicates'], 1),
+                'last_update_age_ms': (now - stats['last_update_at']) * 1000 if stats['last_update_at'] else None
+            }
+        return {**self.stats, 'feeds': feeds}
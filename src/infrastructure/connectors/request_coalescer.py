@@ -0,0 +1,121 @@
+# infrastructure/connectors/request_coalescer.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCoalescer:
+    """
+    🔀 Single-flight для одинаковых запросов к бирже
+
+    - одновременные запросы с одним ключом ждут один общий вызов (одна плата по весу)
+    - результат можно держать ttl_ms миллисекунд для повторных запросов
+    - ошибки не кешируются: следующий запрос снова идет на биржу
+    Отмена одного из ожидающих не отменяет общий вызов для остальных.
+    invalidate() отцепляет и вызовы в полете: их результат получат только
+    те, кто ждал до сброса, - в кеш он не попадает и новым запросам не отдается.
+    """
+
+    def __init__(self, ttl_ms: Optional[Dict[str, int]] = None, enabled: bool = True):
+        self.ttl_ms: Dict[str, int] = dict(ttl_ms or {})
+        self.enabled = enabled
+
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._cache: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._detached: Set[asyncio.Future] = set()  # Вызовы, начатые до invalidate()
+
+        self.method_stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'RequestCoalescer':
+        """Создание из секции request_coalescing конфигурации (ключи <method>_ttl_ms)"""
+        config = config or {}
+        ttl_ms = {
+            key[:-len('_ttl_ms')]: int(value)
+            for key, value in config.items() if key.endswith('_ttl_ms')
+        }
+        return cls(ttl_ms=ttl_ms, enabled=config.get('enabled', True))
+
+    def _stats(self, method: str) -> Dict[str, int]:
+        return self.method_stats.setdefault(
+            method, {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'misses': 0, 'errors': 0}
+        )
+
+    async def run(
+        self,
+        method: str,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        ttl_ms: Optional[int] = None
+    ) -> Any:
+        """Результат factory() для (method, key): из кеша, общего вызова или нового запроса"""
+        if not self.enabled:
+            return await factory()
+
+        stats = self._stats(method)
+        stats['requests'] += 1
+        cache_key = (method, key)
+        ttl = self.ttl_ms.get(method, 0) if ttl_ms is None else ttl_ms
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            stored_at, result = cached
+            if (time.monotonic() - stored_at) * 1000 <= ttl:
+                stats['cache_hits'] += 1
+                return result
+            del self._cache[cache_key]
+
+        future = self._inflight.get(cache_key)
+        if future is not None:
+            stats['coalesced'] += 1
+        else:
+            stats['misses'] += 1
+            future = asyncio.ensure_future(factory())
+            self._inflight[cache_key] = future
+            future.add_done_callback(lambda done: self._on_done(method, cache_key, ttl, done))
+
+        return await asyncio.shield(future)
+
+    def _on_done(self, method: str, cache_key: Tuple[str, Hashable], ttl: int, future: asyncio.Future):
+        if self._inflight.get(cache_key) is future:
+            del self._inflight[cache_key]
+        if future in self._detached:
+            self._detached.discard(future)
+            return
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._stats(method)['errors'] += 1
+            return
+        if ttl > 0:
+            self._cache[cache_key] = (time.monotonic(), future.result())
+
+    def invalidate(self, method: Optional[str] = None, key: Optional[Hashable] = None):
+        """Сбрасывает кеш и отцепляет вызовы в полете: всё, метод целиком или один ключ метода"""
+        def matches(cache_key: Tuple[str, Hashable]) -> bool:
+            return method is None or (cache_key[0] == method and (key is None or cache_key[1] == key))
+
+        for cache_key in [k for k in self._cache if matches(k)]:
+            del self._cache[cache_key]
+        for cache_key in [k for k in self._inflight if matches(k)]:
+            self._detached.add(self._inflight.pop(cache_key))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Попадания в кеш, объединенные запросы и промахи по методам"""
+        totals = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'misses': 0, 'errors': 0}
+        for stats in self.method_stats.values():
+            for name in totals:
+                totals[name] += stats[name]
+
+        saved = totals['cache_hits'] + totals['coalesced']
+        return {
+            **totals,
+            'saved_requests': saved,
+            'hit_rate': (saved / totals['requests'] * 100) if totals['requests'] else 0.0,
+            'inflight': len(self._inflight),
+            'cached_entries': len(self._cache),
+            'methods': self.method_stats
+        }
@@ -0,0 +1,157 @@
+# infrastructure/connectors/server_clock.py
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Общие часы процесса живут в домене; реэкспорт для совместимости импортов
+from domain.clock import get_default_clock, now_ms, set_default_clock  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+class ServerClock:
+    """
+    ⏰ Время биржи внутри процесса без изменения системных часов
+
+    Периодически запрашивает время сервера и оценивает смещение как в NTP:
+    offset = server_time - (local_send + rtt / 2). Хранит окно последних замеров
+    и берет медиану смещения среди замеров с наименьшим RTT - на них меньше всего
+    влияет асимметрия сети. now_ms() - локальное время, исправленное на смещение.
+    Тем же смещением подписываются запросы: после каждого принятого замера
+    коннекторам из signing_connectors выставляется options['timeDifference'] ccxt.
+    """
+
+    def __init__(
+        self,
+        exchange_connector=None,
+        sample_interval_seconds: float = 60,
+        window: int = 16,
+        burst_samples: int = 5,
+        max_rtt_ms: float = 1000,
+        signing_connectors: Optional[List[Any]] = None
+    ):
+        self.exchange_connector = exchange_connector
+        self.signing_connectors = list(signing_connectors or [])
+        self.sample_interval_seconds = sample_interval_seconds
+        self.burst_samples = burst_samples
+        self.max_rtt_ms = max_rtt_ms
+
+        # (rtt_ms, offset_ms, sampled_at)
+        self.samples: Deque[Tuple[float, float, float]] = deque(maxlen=window)
+        self.offset_ms = 0.0
+        self.rtt_ms: Optional[float] = None
+
+        self.is_running = False
+        self._task = None
+
+        self.stats = {
+            'samples': 0,
+            'rejected_samples': 0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_config(cls, exchange_connector, config: Optional[Dict[str, Any]],
+                    signing_connectors: Optional[List[Any]] = None) -> 'ServerClock':
+        """Создание из секции clock_sync конфигурации"""
+        config = config or {}
+        return cls(
+            exchange_connector=exchange_connector,
+            signing_connectors=signing_connectors,
+            sample_interval_seconds=config.get("sample_interval_seconds", 60),
+            window=config.get("window", 16),
+            burst_samples=config.get("burst_samples", 5),
+            max_rtt_ms=config.get("max_rtt_ms", 1000),
+        )
+
+    # 🕒 ВРЕМЯ
+
+    def now_ms(self) -> int:
+        """Текущее время биржи в мс"""
+        return int(time.time() * 1000 + self.offset_ms)
+
+    def to_server_ms(self, local_ms: float) -> int:
+        """Локальная метка времени -> время биржи"""
+        return int(local_ms + self.offset_ms)
+
+    # 📡 ЗАМЕРЫ
+
+    def add_sample(self, local_send_ms: float, server_ms: float, rtt_ms: float) -> bool:
+        """Учитывает замер: локальное время отправки, ответ сервера и RTT"""
+        if rtt_ms < 0 or rtt_ms > self.max_rtt_ms:
+            self.stats['rejected_samples'] += 1
+            return False
+
+        offset = server_ms - (local_send_ms + rtt_ms / 2)
+        self.samples.append((rtt_ms, offset, time.time()))
+        self.stats['samples'] += 1
+
+        # Медиана смещения среди трети замеров с лучшим RTT
+        best = sorted(self.samples)[:max(1, len(self.samples) // 3)]
+        self.offset_ms = statistics.median(sample[1] for sample in best)
+        self.rtt_ms = best[0][0]
+        self._apply_time_difference()
+        return True
+
+    def _apply_time_difference(self):
+        """ccxt подписывает запросы временем milliseconds() - timeDifference"""
+        for connector in self.signing_connectors:
+            client = getattr(connector, 'async_client', None)
+            if client is not None:
+                client.options['timeDifference'] = -int(self.offset_ms)
+
+    async def sample(self) -> bool:
+        """Один замер через fetch_server_time коннектора"""
+        try:
+            local_send_ms = time.time() * 1000
+            started = time.perf_counter()
+            server_ms = await self.exchange_connector.fetch_server_time()
+            rtt_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"⚠️ Не удалось получить время сервера: {e}")
+            return False
+        return self.add_sample(local_send_ms, float(server_ms), rtt_ms)
+
+    # 🔄 ЖИЗНЕННЫЙ ЦИКЛ
+
+    async def start(self):
+        """Фоновая серия замеров при старте + периодическая подстройка (не блокирует запуск)"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._sample_loop())
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _sample_loop(self):
+        for _ in range(self.burst_samples):
+            await self.sample()
+        logger.info(f"⏰ Смещение часов биржи: {self.offset_ms:+.1f}ms (RTT {self.rtt_ms or 0:.1f}ms)")
+
+        while self.is_running and self.sample_interval_seconds > 0:
+            await asyncio.sleep(self.sample_interval_seconds)
+            await self.sample()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Смещение, RTT и разброс замеров"""
+        offsets = [sample[1] for sample in self.samples]
+        return {
+            **self.stats,
+            'offset_ms': self.offset_ms,
+            'best_rtt_ms': self.rtt_ms,
+            'uncertainty_ms': self.rtt_ms / 2 if self.rtt_ms is not None else None,
+            'offset_spread_ms': (max(offsets) - min(offsets)) if offsets else 0.0,
+            'window': len(self.samples)
+        }
@@ -0,0 +1,621 @@
+# infrastructure/connectors/simulated_exchange_connector.py
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import ccxt
+
+from domain.entities.order import ExchangeInfo
+
+logger = logging.getLogger(__name__)
+
+EPSILON = 1e-12
+QUOTE_CURRENCIES = ('USDT', 'USDC', 'BUSD', 'BTC', 'ETH', 'BNB')
+
+
+def _unified_symbol(symbol: str) -> str:
+    """'ETHUSDT' -> 'ETH/USDT' (формат символов ccxt)"""
+    if '/' in symbol:
+        return symbol.upper()
+    symbol = symbol.upper()
+    for quote in QUOTE_CURRENCIES:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return f"{symbol[:-len(quote)]}/{quote}"
+    return f"{symbol}/USDT"
+
+
+class SimulatedOrderBook:
+    """
+    📚 Стакан одного символа с приоритетом цена-время
+
+    Заявки хранятся в кучах (лучшая цена, затем порядковый номер поступления).
+    Отмененные и исполненные заявки удаляются из кучи лениво, при выходе на вершину.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids: List[Tuple[float, int, str]] = []  # (-price, seq, id)
+        self.asks: List[Tuple[float, int, str]] = []  # (price, seq, id)
+        self.resting: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, order: Dict[str, Any], seq: int):
+        self.resting[order['id']] = order
+        if order['side'] == 'buy':
+            heapq.heappush(self.bids, (-order['price'], seq, order['id']))
+        else:
+            heapq.heappush(self.asks, (order['price'], seq, order['id']))
+
+    def remove(self, order_id: str) -> Optional[Dict[str, Any]]:
+        return self.resting.pop(order_id, None)
+
+    def best(self, side: str) -> Optional[Dict[str, Any]]:
+        """Лучшая живая заявка стороны ('buy' - биды, 'sell' - аски)"""
+        heap = self.bids if side == 'buy' else self.asks
+        while heap:
+            order = self.resting.get(heap[0][2])
+            if order is not None:
+                return order
+            heapq.heappop(heap)
+        return None
+
+    def pop_best(self, side: str):
+        heapq.heappop(self.bids if side == 'buy' else self.asks)
+
+    def levels(self, side: str, limit: int) -> List[List[float]]:
+        """Агрегированные уровни [price, amount] от лучшей цены"""
+        volumes: Dict[float, float] = {}
+        for order in self.resting.values():
+            if order['side'] == side:
+                volumes[order['price']] = volumes.get(order['price'], 0.0) + order['remaining']
+        prices = sorted(volumes, reverse=(side == 'buy'))[:limit]
+        return [[price, volumes[price]] for price in prices]
+
+
+class SimulatedExchangeConnector:
+    """
+    🧪 Биржа внутри процесса для тестов и нагрузочных прогонов
+
+    Реализует методы CcxtExchangeConnector, которыми пользуются сервисы:
+    ордера, баланс, тикер, стакан, информация о символе. Ответы в формате ccxt.
+    - встречные заявки сводятся по приоритету цена-время (цена мейкера)
+    - лимитные заявки исполняются воспроизводимыми рыночными данными (feed_price / replay)
+    - средства блокируются при размещении и рассчитываются при исполнении
+    - настраиваемая задержка, джиттер и доля сетевых ошибок (ccxt.NetworkError)
+    """
+
+    def __init__(
+        self,
+        balances: Optional[Dict[str, float]] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_endpoints: Optional[Iterable[str]] = None,
+        maker_fee: float = 0.001,
+        taker_fee: float = 0.001,
+        spread_bps: float = 2.0,
+        depth_levels: int = 20,
+        level_volume: float = 10.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_endpoints = set(error_endpoints) if error_endpoints else None
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.spread_bps = spread_bps
+        self.depth_levels = depth_levels
+        self.level_volume = level_volume
+        self.random = random.Random(seed)
+
+        # Потоков user-data нет: сервисы со стримингом работают через REST-методы
+        self.async_client = None
+
+        self.balances: Dict[str, Dict[str, float]] = {}
+        for currency, amount in (balances or {}).items():
+            self.balances[currency] = {'free': float(amount), 'used': 0.0}
+
+        self.markets: Dict[str, ExchangeInfo] = {}
+        self.last_prices: Dict[str, float] = {}
+        self.candles: Dict[str, List[List[float]]] = {}
+        self.books: Dict[str, SimulatedOrderBook] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.trades: List[Dict[str, Any]] = []
+
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self._sequence = itertools.count(1)
+
+        self.stats = {
+            'requests': 0,
+            'injected_errors': 0,
+            'orders_created': 0,
+            'orders_rejected': 0,
+            'orders_canceled': 0,
+            'orders_filled': 0,
+            'trades': 0,
+            'market_ticks': 0,
+            'total_latency_ms': 0.0
+        }
+        self.endpoint_counts: Dict[str, int] = {}
+
+    # ⚙️ НАСТРОЙКА РЫНКА
+
+    def add_market(
+        self,
+        symbol: str,
+        price: float,
+        min_qty: float = 0.0001,
+        max_qty: float = 100000.0,
+        step_size: float = 0.0001,
+        tick_size: float = 0.01,
+        min_notional: float = 5.0
+    ) -> ExchangeInfo:
+        """Регистрирует торговую пару с начальной ценой"""
+        symbol = _unified_symbol(symbol)
+        info = ExchangeInfo(
+            symbol=symbol,
+            min_qty=min_qty,
+            max_qty=max_qty,
+            step_size=step_size,
+            min_price=tick_size,
+            max_price=price * 1000,
+            tick_size=tick_size,
+            min_notional=min_notional,
+            fees={'maker': self.maker_fee, 'taker': self.taker_fee}
+        )
+        self.markets[symbol] = info
+        self.books[symbol] = SimulatedOrderBook(symbol)
+        self.last_prices[symbol] = float(price)
+        return info
+
+    def _market(self, symbol: str) -> Tuple[str, ExchangeInfo]:
+        symbol = _unified_symbol(symbol)
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"Simulated exchange does not have market symbol {symbol}")
+        return symbol, self.markets[symbol]
+
+    def _balance(self, currency: str) -> Dict[str, float]:
+        return self.balances.setdefault(currency, {'free': 0.0, 'used': 0.0})
+
+    # 🌐 СЕТЬ: ЗАДЕРЖКА И ОШИБКИ
+
+    async def _network(self, endpoint: str):
+        self.stats['requests'] += 1
+        self.endpoint_counts[endpoint] = self.endpoint_counts.get(endpoint, 0) + 1
+
+        delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        delay_ms = max(0.0, delay_ms)
+        if delay_ms:
+            self.stats['total_latency_ms'] += delay_ms
+            await asyncio.sleep(delay_ms / 1000)
+
+        if self.error_rate and (self.error_endpoints is None or endpoint in self.error_endpoints):
+            if self.random.random() < self.error_rate:
+                self.stats['injected_errors'] += 1
+                raise ccxt.NetworkError(f"Simulated network error on {endpoint}")
+
+    # 📈 ВОСПРОИЗВЕДЕНИЕ РЫНКА
+
+    def feed_price(self, symbol: str, price: float, amount: Optional[float] = None,
+                   timestamp: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Рыночная сделка по price: исполняет лимитные заявки, которые она пересекает
+        (покупки с ценой >= price, продажи с ценой <= price) в порядке цена-время.
+        amount ограничивает объем, доступный нашим заявкам (None - без ограничения).
+        """
+        symbol, _ = self._market(symbol)
+        price = float(price)
+        self.last_prices[symbol] = price
+        self.stats['market_ticks'] += 1
+
+        book = self.books[symbol]
+        trades = []
+        for side in ('buy', 'sell'):
+            liquidity = amount
+            while liquidity is None or liquidity > EPSILON:
+                order = book.best(side)
+                if order is None:
+                    break
+                crosses = order['price'] >= price if side == 'buy' else order['price'] <= price
+                if not crosses:
+                    break
+                qty = order['remaining'] if liquidity is None else min(order['remaining'], liquidity)
+                trades.append(self._fill(order, qty, order['price'], 'maker', timestamp))
+                if liquidity is not None:
+                    liquidity -= qty
+                if order['status'] != 'open':
+                    book.pop_best(side)
+        return trades
+
+    def feed_candle(self, symbol: str, candle: Sequence[float]) -> List[Dict[str, Any]]:
+        """Свеча [timestamp, open, high, low, close, volume]: проходит open -> экстремумы -> close"""
+        timestamp, open_, high, low, close = candle[:5]
+        self.candles.setdefault(_unified_symbol(symbol), []).append(list(candle))
+        path = (open_, low, high, close) if close >= open_ else (open_, high, low, close)
+        trades = []
+        for price in path:
+            trades.extend(self.feed_price(symbol, price, timestamp=int(timestamp)))
+        return trades
+
+    async def replay(self, symbol: str, data: Iterable[Any], interval_ms: float = 0.0) -> int:
+        """Воспроизводит цены или свечи OHLCV; interval_ms - пауза между тиками"""
+        ticks = 0
+        for item in data:
+            if isinstance(item, (list, tuple)):
+                self.feed_candle(symbol, item)
+            else:
+                self.feed_price(symbol, item)
+            ticks += 1
+            await asyncio.sleep(interval_ms / 1000 if interval_ms else 0)
+        return ticks
+
+    # ⚖️ СОПОСТАВЛЕНИЕ И РАСЧЕТЫ
+
+    def _fill(self, order: Dict[str, Any], qty: float, price: float, liquidity: str,
+              timestamp: Optional[int] = None) -> Dict[str, Any]:
+        base, quote = order['symbol'].split('/')
+        fee_rate = self.maker_fee if liquidity == 'maker' else self.taker_fee
+        cost = qty * price
+        fee = cost * fee_rate
+
+        if order['side'] == 'buy':
+            quote_balance = self._balance(quote)
+            if order['type'] == 'limit':
+                # Заблокировано по цене заявки, разницу при улучшении цены возвращаем
+                locked = qty * order['price']
+                quote_balance['used'] -= locked
+                quote_balance['free'] += locked - cost
+            else:
+                quote_balance['free'] -= cost
+            quote_balance['free'] -= fee
+            self._balance(base)['free'] += qty
+        else:
+            base_balance = self._balance(base)
+            if order['type'] == 'limit':
+                base_balance['used'] -= qty
+            else:
+                base_balance['free'] -= qty
+            self._balance(quote)['free'] += cost - fee
+
+        now = timestamp or int(time.time() * 1000)
+        previous_cost = order['cost']
+        order['filled'] += qty
+        order['remaining'] = max(0.0, order['amount'] - order['filled'])
+        order['cost'] = previous_cost + cost
+        order['average'] = order['cost'] / order['filled']
+        order['fee']['cost'] += fee
+        order['lastTradeTimestamp'] = now
+        order['lastUpdateTimestamp'] = now
+        if order['remaining'] <= EPSILON:
+            order['remaining'] = 0.0
+            order['status'] = 'closed'
+            self.books[order['symbol']].remove(order['id'])
+            self.stats['orders_filled'] += 1
+
+        trade = {
+            'id': str(next(self._trade_ids)),
+            'order': order['id'],
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'takerOrMaker': liquidity,
+            'price': price,
+            'amount': qty,
+            'cost': cost,
+            'fee': {'cost': fee, 'currency': quote},
+            'timestamp': now
+        }
+        order['trades'].append(trade)
+        self.trades.append(trade)
+        self.stats['trades'] += 1
+        return trade
+
+    def _match(self, order: Dict[str, Any]):
+        """Сводит входящую заявку со встречными (цена мейкера, приоритет цена-время)"""
+        book = self.books[order['symbol']]
+        opposite = 'sell' if order['side'] == 'buy' else 'buy'
+        while order['remaining'] > EPSILON:
+            resting = book.best(opposite)
+            if resting is None:
+                break
+            if order['type'] == 'limit':
+                crosses = resting['price'] <= order['price'] if order['side'] == 'buy' else resting['price'] >= order['price']
+                if not crosses:
+                    break
+            qty = min(order['remaining'], resting['remaining'])
+            self._fill(resting, qty, resting['price'], 'maker')
+            self._fill(order, qty, resting['price'], 'taker')
+            self.last_prices[order['symbol']] = resting['price']
+            if resting['status'] != 'open':
+                book.pop_best(opposite)
+
+    def _validate(self, info: ExchangeInfo, side: str, order_type: str, amount: float, price: Optional[float]):
+        if side not in ('buy', 'sell'):
+            raise ccxt.InvalidOrder(f"Invalid side {side}")
+        if order_type not in ('limit', 'market'):
+            raise ccxt.InvalidOrder(f"Order type {order_type} is not supported by the simulator")
+        if amount < info.min_qty or amount > info.max_qty:
+            raise ccxt.InvalidOrder(f"Filter failure: LOT_SIZE ({amount})")
+        if order_type == 'limit':
+            if price is None or price < info.min_price or price > info.max_price:
+                raise ccxt.InvalidOrder(f"Filter failure: PRICE_FILTER ({price})")
+        notional = amount * (price if order_type == 'limit' else self.last_prices[info.symbol])
+        if notional < info.min_notional:
+            raise ccxt.InvalidOrder(f"Filter failure: NOTIONAL ({notional})")
+
+    # 📋 ОРДЕРА
+
+    async def create_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        amount: float,
+        price: Optional[float] = None,
+        params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        await self._network('create_order')
+        symbol, info = self._market(symbol)
+        side, order_type = side.lower(), order_type.lower()
+        amount = float(amount)
+        price = float(price) if price is not None else None
+
+        try:
+            self._validate(info, side, order_type, amount, price)
+        except ccxt.InvalidOrder:
+            self.stats['orders_rejected'] += 1
+            raise
+
+        base, quote = symbol.split('/')
+        if side == 'buy':
+            currency = quote
+            required = amount * (price if order_type == 'limit' else self.last_prices[symbol]) * (1 + self.taker_fee)
+            lock = amount * price if order_type == 'limit' else 0.0
+        else:
+            currency, required = base, amount
+            lock = amount if order_type == 'limit' else 0.0
+        balance = self._balance(currency)
+        if balance['free'] + EPSILON < required:
+            self.stats['orders_rejected'] += 1
+            raise ccxt.InsufficientFunds(
+                f"Account has insufficient balance for requested action: need {required} {currency}, have {balance['free']}"
+            )
+        balance['free'] -= lock
+        balance['used'] += lock
+
+        now = int(time.time() * 1000)
+        order = {
+            'id': str(next(self._order_ids)),
+            'clientOrderId': (params or {}).get('clientOrderId'),
+            'symbol': symbol,
+            'side': side,
+            'type': order_type,
+            'price': price,
+            'amount': amount,
+            'filled': 0.0,
+            'remaining': amount,
+            'cost': 0.0,
+            'average': None,
+            'status': 'open',
+            'timestamp': now,
+            'lastTradeTimestamp': None,
+            'lastUpdateTimestamp': now,
+            'fee': {'cost': 0.0, 'currency': quote},
+            'trades': []
+        }
+        self.orders[order['id']] = order
+        self.stats['orders_created'] += 1
+
+        self._match(order)
+        if order['type'] == 'market':
+            if order['remaining'] > EPSILON:
+                # Остаток рыночной заявки забирает внешняя ликвидность по последней цене
+                self._fill(order, order['remaining'], self.last_prices[symbol], 'taker')
+        elif order['status'] == 'open':
+            self.books[symbol].add(order, next(self._sequence))
+
+        return self._snapshot(order)
+
+    async def cancel_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        await self._network('cancel_order')
+        order = self.orders.get(str(order_id))
+        if order is None or order['status'] != 'open':
+            raise ccxt.OrderNotFound(f"Unknown order sent: {order_id}")
+        return self._snapshot(self._cancel(order))
+
+    def _cancel(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        base, quote = order['symbol'].split('/')
+        if order['type'] == 'limit':
+            if order['side'] == 'buy':
+                unlocked, balance = order['remaining'] * order['price'], self._balance(quote)
+            else:
+                unlocked, balance = order['remaining'], self._balance(base)
+            balance['used'] -= unlocked
+            balance['free'] += unlocked
+        self.books[order['symbol']].remove(order['id'])
+        order['status'] = 'canceled'
+        order['lastUpdateTimestamp'] = int(time.time() * 1000)
+        self.stats['orders_canceled'] += 1
+        return order
+
+    async def fetch_order(self, order_id: str, symbol: str) -> Dict[str, Any]:
+        await self._network('fetch_order')
+        order = self.orders.get(str(order_id))
+        if order is None:
+            raise ccxt.OrderNotFound(f"Order does not exist: {order_id}")
+        return self._snapshot(order)
+
+    async def fetch_open_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
+        await self._network('fetch_open_orders' if symbol else 'fetch_open_orders_all')
+        wanted = _unified_symbol(symbol) if symbol else None
+        return [
+            self._snapshot(order) for order in self.orders.values()
+            if order['status'] == 'open' and (wanted is None or order['symbol'] == wanted)
+        ]
+
+    async def fetch_order_history(self, symbol: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        await self._network('fetch_orders')
+        wanted = _unified_symbol(symbol) if symbol else None
+        orders = [o for o in self.orders.values() if wanted is None or o['symbol'] == wanted]
+        return [self._snapshot(order) for order in orders[-limit:]]
+
+    def supports_bulk_cancel(self) -> bool:
+        return True
+
+    async def cancel_all_orders_by_symbol(self, symbol: str) -> List[Dict[str, Any]]:
+        await self._network('cancel_all_orders')
+        symbol, _ = self._market(symbol)
+        open_orders = [o for o in self.orders.values() if o['status'] == 'open' and o['symbol'] == symbol]
+        return [self._snapshot(self._cancel(order)) for order in open_orders]
+
+    async def cancel_all_orders(self, symbol: str = None) -> List[Dict[str, Any]]:
+        symbols = [_unified_symbol(symbol)] if symbol else list(self.markets)
+        cancelled = []
+        for market in symbols:
+            cancelled.extend(await self.cancel_all_orders_by_symbol(market))
+        return cancelled
+
+    async def get_trade_history(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+        await self._network('fetch_my_trades')
+        symbol = _unified_symbol(symbol)
+        return [dict(trade) for trade in self.trades if trade['symbol'] == symbol][-limit:]
+
+    @staticmethod
+    def _snapshot(order: Dict[str, Any]) -> Dict[str, Any]:
+        """Копия ордера: вызывающий код не должен менять состояние биржи"""
+        return {**order, 'fee': dict(order['fee']), 'trades': list(order['trades'])}
+
+    # 💰 БАЛАНС
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        await self._network('fetch_balance')
+        balance: Dict[str, Any] = {'free': {}, 'used': {}, 'total': {}, 'timestamp': int(time.time() * 1000)}
+        for currency, values in self.balances.items():
+            total = values['free'] + values['used']
+            balance[currency] = {'free': values['free'], 'used': values['used'], 'total': total}
+            balance['free'][currency] = values['free']
+            balance['used'][currency] = values['used']
+            balance['total'][currency] = total
+        return balance
+
+    async def get_available_balance(self, currency: str) -> float:
+        await self._network('fetch_balance')
+        return self._balance(currency)['free']
+
+    async def check_sufficient_balance(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float = None
+    ) -> Tuple[bool, str, float]:
+        base, quote = _unified_symbol(symbol).split('/')
+        if side.lower() == 'buy':
+            available = await self.get_available_balance(quote)
+            return available >= amount * (price or 0), quote, available
+        available = await self.get_available_balance(base)
+        return available >= amount, base, available
+
+    # 📊 РЫНОЧНЫЕ ДАННЫЕ
+
+    def _quotes(self, symbol: str) -> Tuple[float, float]:
+        """Лучшие bid/ask: свои заявки или синтетический спред вокруг последней цены"""
+        last = self.last_prices[symbol]
+        half_spread = last * self.spread_bps / 20000
+        book = self.books[symbol]
+        best_bid, best_ask = book.best('buy'), book.best('sell')
+        bid = max(last - half_spread, best_bid['price'] if best_bid else 0.0)
+        ask = min(last + half_spread, best_ask['price'] if best_ask else float('inf'))
+        return bid, ask
+
+    async def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        await self._network('fetch_ticker')
+        symbol, _ = self._market(symbol)
+        bid, ask = self._quotes(symbol)
+        return {
+            'symbol': symbol,
+            'last': self.last_prices[symbol],
+            'close': self.last_prices[symbol],
+            'bid': bid,
+            'ask': ask,
+            'timestamp': int(time.time() * 1000)
+        }
+
+    async def fetch_orderbook(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
+        """Свои заявки поверх синтетических уровней ликвидности вокруг последней цены"""
+        await self._network('fetch_order_book')
+        symbol, info = self._market(symbol)
+        bid, ask = self._quotes(symbol)
+        book = self.books[symbol]
+
+        sides = {}
+        for side, start, step in (('buy', bid, -info.tick_size), ('sell', ask, info.tick_size)):
+            volumes = {price: amount for price, amount in book.levels(side, limit)}
+            for i in range(self.depth_levels):
+                price = round(start + i * step, 10)
+                volumes[price] = volumes.get(price, 0.0) + self.level_volume
+            prices = sorted(volumes, reverse=(side == 'buy'))[:limit]
+            sides[side] = [[price, volumes[price]] for price in prices]
+
+        return {'symbol': symbol, 'bids': sides['buy'], 'asks': sides['sell'], 'timestamp': int(time.time() * 1000)}
+
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "1m",
+        limit: int = 200,
+        since: Optional[int] = None
+    ) -> List[List[float]]:
+        await self._network('fetch_ohlcv')
+        candles = self.candles.get(_unified_symbol(symbol), [])
+        if since is not None:
+            candles = [c for c in candles if c[0] >= since]
+        return [list(c) for c in candles[-limit:]]
+
+    # ℹ️ ИНФОРМАЦИЯ О БИРЖЕ
+
+    async def fetch_exchange_info(self, symbol: str = None) -> Dict[str, Any]:
+        await self._network('load_markets')
+        if symbol:
+            return asdict(self._market(symbol)[1])
+        return {name: asdict(info) for name, info in self.markets.items()}
+
+    async def get_symbol_info(self, symbol: str) -> ExchangeInfo:
+        return self._market(symbol)[1]
+
+    async def test_connection(self) -> bool:
+        try:
+            await self.fetch_balance()
+            return True
+        except Exception:
+            return False
+
+    async def get_server_time(self) -> int:
+        await self._network('fetch_time')
+        return int(time.time() * 1000)
+
+    async def calculate_fees(self, symbol: str, amount: float, price: float, side: str) -> float:
+        return amount * price * self.taker_fee
+
+    def get_rate_limit_statistics(self) -> Dict[str, Any]:
+        return {'requests': self.stats['requests'], 'endpoints': dict(self.endpoint_counts)}
+
+    async def close(self):
+        pass
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика симулятора"""
+        requests = max(self.stats['requests'], 1)
+        return {
+            **self.stats,
+            'avg_latency_ms': self.stats['total_latency_ms'] / requests,
+            'open_orders': sum(len(book.resting) for book in self.books.values()),
+            'endpoints': dict(self.endpoint_counts)
+        }
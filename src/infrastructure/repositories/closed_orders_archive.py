@@ -0,0 +1,249 @@
+# infrastructure/repositories/closed_orders_archive.py
+import json
+import math
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+from domain.entities.order import Order
+
+# Целочисленные колонки (None -> NULL_INT)
+INT_COLUMNS = ('order_id', 'deal_id', 'created_at', 'closed_at', 'last_update', 'exchange_timestamp', 'retries')
+# Вещественные колонки (None -> NaN)
+FLOAT_COLUMNS = ('price', 'amount', 'filled_amount', 'remaining_amount', 'average_price', 'fees')
+# Повторяющиеся строки: код в словаре (0 = None)
+CODED_COLUMNS = ('side', 'order_type', 'status', 'symbol', 'fee_currency', 'time_in_force')
+# Редкие строки: словарь строка -> значение (только заполненные)
+TEXT_COLUMNS = ('client_order_id', 'error_message')
+
+NULL_INT = -2 ** 63
+
+
+class ClosedOrdersArchive:
+    """
+    🗃️ Компактный архив закрытых ордеров (struct-of-arrays)
+
+    Каждое поле - отдельный типизированный массив (array 'q'/'d'/'H'), повторяющиеся
+    строки (символ, статус, сторона...) и metadata хранятся кодами из словаря,
+    числовой exchange_id биржи - числом. Вместо ~25 атрибутов и dict на объект -
+    по 8 байт на число и 2-4 байта на код.
+    Ордер собирается обратно в Order только при чтении (get / iter_orders).
+    Удаление - пометка строки; место освобождается compact().
+    """
+
+    def __init__(self):
+        self._int = {name: array('q') for name in INT_COLUMNS}
+        self._float = {name: array('d') for name in FLOAT_COLUMNS}
+        self._coded = {name: array('H') for name in CODED_COLUMNS}
+        self._text: Dict[str, Dict[int, str]] = {name: {} for name in TEXT_COLUMNS}
+        self._exchange_id = array('q')          # числовой id биржи или NULL_INT
+        self._exchange_id_text: Dict[int, str] = {}  # row -> нечисловой id
+        self._metadata = array('I')             # код JSON metadata (0 = пусто)
+        self._alive = bytearray()
+
+        self._codes: Dict[str, int] = {}
+        self._values: List[Optional[str]] = [None]
+        self._metadata_codes: Dict[str, int] = {}
+        self._metadata_values: List[Optional[str]] = [None]
+        self._rows: Dict[int, int] = {}        # order_id -> row
+
+        self.stats = {
+            'archived': 0,
+            'rehydrated': 0,
+            'removed': 0,
+            'compactions': 0
+        }
+
+    def _code(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    # ✍️ ЗАПИСЬ
+
+    def add(self, order: Order) -> int:
+        """Переносит состояние ордера в колонки; возвращает номер строки"""
+        if order.order_id in self._rows:
+            self.remove(order.order_id)
+
+        row = len(self._alive)
+        for name in INT_COLUMNS:
+            value = getattr(order, name)
+            self._int[name].append(NULL_INT if value is None else int(value))
+        for name in FLOAT_COLUMNS:
+            value = getattr(order, name)
+            self._float[name].append(math.nan if value is None else float(value))
+        for name in CODED_COLUMNS:
+            self._coded[name].append(self._code(getattr(order, name)))
+        for name in TEXT_COLUMNS:
+            value = getattr(order, name)
+            if value is not None:
+                self._text[name][row] = value
+
+        exchange_id = order.exchange_id
+        if exchange_id is not None and exchange_id.isdigit() and str(int(exchange_id)) == exchange_id \
+                and int(exchange_id) < 2 ** 63:
+            self._exchange_id.append(int(exchange_id))
+        else:
+            self._exchange_id.append(NULL_INT)
+            if exchange_id is not None:
+                self._exchange_id_text[row] = exchange_id
+
+        metadata_code = 0
+        if order.metadata:
+            metadata = json.dumps(order.metadata, separators=(',', ':'), sort_keys=True, default=str)
+            metadata_code = self._metadata_codes.get(metadata)
+            if metadata_code is None:
+                metadata_code = len(self._metadata_values)
+                self._metadata_codes[metadata] = metadata_code
+                self._metadata_values.append(metadata)
+        self._metadata.append(metadata_code)
+        self._alive.append(1)
+
+        self._rows[order.order_id] = row
+        self.stats['archived'] += 1
+        return row
+
+    def remove(self, order_id: int) -> bool:
+        row = self._rows.pop(order_id, None)
+        if row is None:
+            return False
+        self._alive[row] = 0
+        self._exchange_id_text.pop(row, None)
+        for name in TEXT_COLUMNS:
+            self._text[name].pop(row, None)
+        self.stats['removed'] += 1
+
+        # Больше половины строк удалено - сжимаем колонки
+        if len(self._alive) > 1024 and len(self._rows) < len(self._alive) // 2:
+            self.compact()
+        return True
+
+    # 📖 ЧТЕНИЕ
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def order_ids(self) -> List[int]:
+        return list(self._rows)
+
+    def _rehydrate(self, row: int) -> Order:
+        data = self._row_dict(row)
+        self.stats['rehydrated'] += 1
+        order = Order.from_dict(data)
+        order.remaining_amount = data['remaining_amount']  # Order подставляет amount вместо 0.0
+        return order
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        """Поля строки в формате Order.to_dict (без сборки объекта)"""
+        data: Dict[str, Any] = {}
+        for name in INT_COLUMNS:
+            value = self._int[name][row]
+            data[name] = None if value == NULL_INT else value
+        for name in FLOAT_COLUMNS:
+            value = self._float[name][row]
+            data[name] = None if math.isnan(value) else value
+        for name in CODED_COLUMNS:
+            data[name] = self._values[self._coded[name][row]]
+        for name in TEXT_COLUMNS:
+            data[name] = self._text[name].get(row)
+        exchange_id = self._exchange_id[row]
+        data['exchange_id'] = self._exchange_id_text.get(row) if exchange_id == NULL_INT else str(exchange_id)
+        metadata = self._metadata_values[self._metadata[row]]
+        data['metadata'] = json.loads(metadata) if metadata else {}
+        return data
+
+    def get(self, order_id: int) -> Optional[Order]:
+        """Новый объект Order из колонок (изменения не попадают в архив без save)"""
+        row = self._rows.get(order_id)
+        return self._rehydrate(row) if row is not None else None
+
+    def index_keys(self, order_id: int) -> Optional[tuple]:
+        """(exchange_id, symbol, deal_id, status, created_at) - ключи индексов репозитория"""
+        row = self._rows.get(order_id)
+        if row is None:
+            return None
+        exchange_id = self._exchange_id[row]
+        deal_id = self._int['deal_id'][row]
+        return (
+            self._exchange_id_text.get(row) if exchange_id == NULL_INT else str(exchange_id),
+            self._values[self._coded['symbol'][row]],
+            None if deal_id == NULL_INT else deal_id,
+            self._values[self._coded['status'][row]],
+            self._int['created_at'][row]
+        )
+
+    def close_time(self, order_id: int) -> Optional[int]:
+        """closed_at (или created_at, если пуст) - ключ очереди вытеснения"""
+        row = self._rows.get(order_id)
+        if row is None:
+            return None
+        closed_at = self._int['closed_at'][row]
+        return closed_at if closed_at != NULL_INT and closed_at else self._int['created_at'][row]
+
+    def iter_orders(self) -> Iterator[Order]:
+        for row in list(self._rows.values()):
+            yield self._rehydrate(row)
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Ордера архива словарями Order.to_dict - для снимков, без объектов Order"""
+        for row in list(self._rows.values()):
+            yield self._row_dict(row)
+
+    def ids_closed_before(self, cutoff_ms: int) -> List[int]:
+        """Ордера, закрытые (или созданные, если closed_at пуст) раньше cutoff - без сборки объектов"""
+        closed_at = self._int['closed_at']
+        created_at = self._int['created_at']
+        result = []
+        for order_id, row in self._rows.items():
+            moment = closed_at[row] if closed_at[row] != NULL_INT and closed_at[row] else created_at[row]
+            if moment < cutoff_ms:
+                result.append(order_id)
+        return result
+
+    # 🗜️ ОБСЛУЖИВАНИЕ
+
+    def compact(self):
+        """Убирает удаленные строки из колонок"""
+        live_rows = sorted(self._rows.values())
+        remap = {old: new for new, old in enumerate(live_rows)}
+        for columns in (self._int, self._float, self._coded):
+            for name, column in columns.items():
+                columns[name] = array(column.typecode, (column[row] for row in live_rows))
+        self._exchange_id = array('q', (self._exchange_id[row] for row in live_rows))
+        self._metadata = array('I', (self._metadata[row] for row in live_rows))
+        for name, column in self._text.items():
+            self._text[name] = {remap[row]: value for row, value in column.items()}
+        self._exchange_id_text = {remap[row]: value for row, value in self._exchange_id_text.items()}
+        self._alive = bytearray(b'\x01' * len(live_rows))
+        self._rows = {order_id: remap[row] for order_id, row in self._rows.items()}
+        self.stats['compactions'] += 1
+
+    def memory_bytes(self) -> int:
+        """Оценка памяти колонок, словаря кодов и индекса строк"""
+        arrays = [*self._int.values(), *self._float.values(), *self._coded.values(),
+                  self._exchange_id, self._metadata]
+        total = sum(column.buffer_info()[1] * column.itemsize for column in arrays)
+        for sparse in (*self._text.values(), self._exchange_id_text):
+            total += sys.getsizeof(sparse) + sum(sys.getsizeof(v) for v in sparse.values())
+        total += sys.getsizeof(self._rows) + sys.getsizeof(self._alive)
+        total += sum(sys.getsizeof(v) for v in (*self._values, *self._metadata_values) if v is not None)
+        return total
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика архива"""
+        return {
+            **self.stats,
+            'orders': len(self._rows),
+            'rows': len(self._alive),
+            'dictionary_size': len(self._values) - 1,
+            'memory_bytes': self.memory_bytes()
+        }
@@ -1,6 +1,6 @@
 # my_trading_app/infrastructure/repositories/deals_repository.py
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 from domain.entities.deal import Deal
 
 class DealsRepository(ABC):
@@ -29,20 +29,77 @@ class InMemoryDealsRepository(DealsRepository):
     """
     Простейшая InMemory-реализация.
     Хранит Deal в словаре {deal_id: Deal}.
+    journal (OrderJournal) - необязательный журнал изменений сделок.
+
+    С orders_repo завершенные сделки хранятся как id ордеров (как в
+    SqliteDealsRepository): сделка не держит объекты Order, и архив закрытых
+    ордеров репозитория действительно освобождает память. При чтении
+    сделка собирается заново, ордера берутся из orders_repo.
     """
 
-    def __init__(self):
+    def __init__(self, journal=None, orders_repo=None):
         self._storage = {}
+        # deal_id -> (currency_pair_id, status, created_at, closed_at, buy_order_id, sell_order_id)
+        self._finished: Dict[int, Tuple] = {}
+        self.journal = journal
+        self.orders_repo = orders_repo
 
     def save(self, deal: Deal) -> None:
-        self._storage[deal.deal_id] = deal
+        if self.orders_repo is not None and not deal.is_open():
+            self._storage.pop(deal.deal_id, None)
+            self._finished[deal.deal_id] = (
+                deal.currency_pair_id, deal.status, deal.created_at, deal.closed_at,
+                deal.buy_order.order_id if deal.buy_order else None,
+                deal.sell_order.order_id if deal.sell_order else None
+            )
+        else:
+            self._finished.pop(deal.deal_id, None)
+            self._storage[deal.deal_id] = deal
+        if self.journal:
+            self.journal.record_deal(deal)
+
+    def _load_finished(self, deal_id: int) -> Optional[Deal]:
+        row = self._finished.get(deal_id)
+        if row is None:
+            return None
+        currency_pair_id, status, created_at, closed_at, buy_order_id, sell_order_id = row
+        return Deal(
+            deal_id=deal_id,
+            currency_pair_id=currency_pair_id,
+            status=status,
+            buy_order=self.orders_repo.get_by_id(buy_order_id) if buy_order_id is not None else None,
+            sell_order=self.orders_repo.get_by_id(sell_order_id) if sell_order_id is not None else None,
+            created_at=created_at,
+            closed_at=closed_at
+        )
 
     def get_by_id(self, deal_id: int) -> Optional[Deal]:
-        return self._storage.get(deal_id)
+        deal = self._storage.get(deal_id)
+        return deal if deal is not None else self._load_finished(deal_id)
 
     def get_open_deals(self) -> List[Deal]:
         return [d for d in self._storage.values() if d.is_open()]
 
     def get_all(self) -> List[Deal]:
         """Возвращает все сделки (открытые, закрытые, отмененные)"""
-        return list(self._storage.values())
+        return list(self._storage.values()) + [self._load_finished(deal_id) for deal_id in list(self._finished)]
+
+    def count(self) -> int:
+        return len(self._storage) + len(self._finished)
+
+    def iter_deal_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Все сделки словарями (как в журнале) без сборки завершенных сделок"""
+        for deal in list(self._storage.values()):
+            yield {
+                'deal_id': deal.deal_id, 'currency_pair_id': deal.currency_pair_id, 'status': deal.status,
+                'created_at': deal.created_at, 'closed_at': deal.closed_at,
+                'buy_order_id': deal.buy_order.order_id if deal.buy_order else None,
+                'sell_order_id': deal.sell_order.order_id if deal.sell_order else None,
+            }
+        for deal_id, row in list(self._finished.items()):
+            currency_pair_id, status, created_at, closed_at, buy_order_id, sell_order_id = row
+            yield {
+                'deal_id': deal_id, 'currency_pair_id': currency_pair_id, 'status': status,
+                'created_at': created_at, 'closed_at': closed_at,
+                'buy_order_id': buy_order_id, 'sell_order_id': sell_order_id,
+            }
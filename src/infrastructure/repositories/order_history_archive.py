@@ -0,0 +1,273 @@
+# infrastructure/repositories/order_history_archive.py
+import json
+import logging
+import os
+import re
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from domain.entities.order import Order
+from infrastructure.repositories.closed_orders_archive import NULL_INT
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Запись фиксированной ширины: числа как есть, строки - коды словаря (0 = None)
+RECORD_DTYPE = np.dtype([
+    ('order_id', '<i8'),
+    ('deal_id', '<i8'),
+    ('exchange_id', '<i8'),        # числовой id биржи или NULL_INT
+    ('created_at', '<i8'),
+    ('closed_at', '<i8'),
+    ('last_update', '<i8'),
+    ('price', '<f8'),
+    ('amount', '<f8'),
+    ('filled_amount', '<f8'),
+    ('remaining_amount', '<f8'),
+    ('average_price', '<f8'),
+    ('fees', '<f8'),
+    ('symbol', '<u2'),
+    ('fee_currency', '<u2'),
+    ('side', '<u2'),
+    ('order_type', '<u2'),
+    ('status', '<u2'),
+])
+
+INT_FIELDS = ('order_id', 'deal_id', 'created_at', 'closed_at', 'last_update')
+FLOAT_FIELDS = ('price', 'amount', 'filled_amount', 'remaining_amount', 'average_price', 'fees')
+CODED_FIELDS = ('symbol', 'fee_currency', 'side', 'order_type', 'status')
+
+PARTITION_RE = re.compile(r'^orders-(\d+)\.bin$')
+
+
+class OrderHistoryArchive:
+    """
+    📚 История закрытых ордеров на диске: дневные файлы записей фиксированной ширины
+
+    Файл orders-<день>.bin (день = created_at // сутки, UTC) - подряд идущие
+    записи RECORD_DTYPE, только дозапись. Строки (символ, сторона, статус...)
+    хранятся кодами из dictionary.json. Чтение - np.memmap без разбора
+    объектов: фильтры по дате/символу/стороне/статусу - векторные маски
+    NumPy, в Order собираются только найденные записи.
+    Текстовые поля (client_order_id, error_message, metadata) и нечисловые
+    exchange_id в историю не попадают.
+    """
+
+    def __init__(self, directory: str = "data/order_history"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._dictionary_path = self.directory / "dictionary.json"
+
+        self._values: List[Optional[str]] = [None]
+        if self._dictionary_path.exists():
+            self._values = [None] + json.loads(self._dictionary_path.read_text(encoding='utf-8'))
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self._values) if code}
+
+        self._days: List[int] = sorted(
+            int(match.group(1)) for match in map(PARTITION_RE.match, os.listdir(self.directory)) if match
+        )
+        self._maps: Dict[int, np.memmap] = {}
+
+        self.stats = {
+            'appended': 0,
+            'scans': 0,
+            'scanned_records': 0,
+            'matched_records': 0,
+            'truncated_bytes': 0
+        }
+        for day in self._days:
+            self._truncate_torn_tail(day)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'OrderHistoryArchive':
+        """Создание из секции orders_history конфигурации"""
+        config = config or {}
+        return cls(directory=config.get("directory", "data/order_history"))
+
+    def _partition_path(self, day: int) -> Path:
+        return self.directory / f"orders-{day}.bin"
+
+    def _truncate_torn_tail(self, day: int):
+        """Обрезает недописанную запись (падение во время записи): дозапись не сдвинет границы"""
+        path = self._partition_path(day)
+        torn = os.path.getsize(path) % RECORD_DTYPE.itemsize
+        if torn:
+            with open(path, 'r+b') as f:
+                f.truncate(os.path.getsize(path) - torn)
+            self.stats['truncated_bytes'] += torn
+            logger.warning(f"⚠️ Order history {path.name}: truncated {torn} bytes of a torn record")
+
+    def _code(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            if code > np.iinfo(np.uint16).max:
+                raise ValueError(f"Order history dictionary is full: {value}")
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    def _save_dictionary(self):
+        """Словарь пишется атомарно и до данных, которые на него ссылаются"""
+        tmp_path = self._dictionary_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self._values[1:]), encoding='utf-8')
+        os.replace(tmp_path, self._dictionary_path)
+
+    # ✍️ ЗАПИСЬ
+
+    def append(self, orders: Iterable[Order]) -> int:
+        """Дописывает ордера в дневные файлы; возвращает число записей"""
+        return self.save_rows(self.to_rows(orders))
+
+    def to_rows(self, orders: Iterable[Order]) -> np.ndarray:
+        """Записи RECORD_DTYPE из ордеров - в потоке, который их изменяет (event loop)"""
+        orders = list(orders)
+        if not orders:
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        dictionary_size = len(self._values)
+        records = np.zeros(len(orders), dtype=RECORD_DTYPE)
+        for name in INT_FIELDS:
+            records[name] = [NULL_INT if getattr(order, name) is None else getattr(order, name) for order in orders]
+        for name in FLOAT_FIELDS:
+            records[name] = [np.nan if getattr(order, name) is None else getattr(order, name) for order in orders]
+        for name in CODED_FIELDS:
+            records[name] = [self._code(getattr(order, name)) for order in orders]
+        records['exchange_id'] = [
+            int(order.exchange_id) if order.exchange_id and order.exchange_id.isdigit()
+            and int(order.exchange_id) < 2 ** 63 else NULL_INT
+            for order in orders
+        ]
+        if len(self._values) != dictionary_size:
+            self._save_dictionary()
+        return records
+
+    def save_rows(self, records: np.ndarray) -> int:
+        """Дописывает готовые записи в дневные файлы; безопасно вызывать из потока записи"""
+        if not len(records):
+            return 0
+
+        days = records['created_at'] // DAY_MS
+        for day in np.unique(days):
+            with open(self._partition_path(int(day)), 'ab') as f:
+                f.write(records[days == day].tobytes())
+            if int(day) not in self._days:
+                self._days.insert(bisect_left(self._days, int(day)), int(day))
+            self._maps.pop(int(day), None)  # Файл вырос - переотображаем при чтении
+
+        self.stats['appended'] += len(records)
+        return len(records)
+
+    def save_many(self, orders: Iterable[Order]) -> None:
+        """Интерфейс холодного уровня репозитория"""
+        self.append(orders)
+
+    # 📖 ЧТЕНИЕ
+
+    def _map(self, day: int) -> Optional[np.memmap]:
+        records = self._maps.get(day)
+        if records is None:
+            path = self._partition_path(day)
+            count = os.path.getsize(path) // RECORD_DTYPE.itemsize  # Оборванный хвост не читаем
+            if count == 0:
+                return None
+            records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+            self._maps[day] = records
+        return records
+
+    def covers(self, start_ms: int, end_ms: int) -> bool:
+        """Есть ли дневные файлы, пересекающиеся с диапазоном"""
+        return bisect_left(self._days, start_ms // DAY_MS) < bisect_right(self._days, end_ms // DAY_MS)
+
+    def scan(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+             symbol: Optional[str] = None, side: Optional[str] = None,
+             status: Optional[str] = None, latest_only: bool = True) -> np.ndarray:
+        """
+        Записи с created_at в [start_ms, end_ms], отфильтрованные векторно.
+        latest_only - по одной (последней записанной) версии каждого ордера.
+        """
+        self.stats['scans'] += 1
+        filters = {}
+        for name, value in (('symbol', symbol), ('side', side), ('status', status)):
+            if value is not None:
+                if value not in self._codes:
+                    return np.empty(0, dtype=RECORD_DTYPE)
+                filters[name] = self._codes[value]
+
+        lo = 0 if start_ms is None else bisect_left(self._days, start_ms // DAY_MS)
+        hi = len(self._days) if end_ms is None else bisect_right(self._days, end_ms // DAY_MS)
+
+        parts = []
+        for day in self._days[lo:hi]:
+            records = self._map(day)
+            if records is None:
+                continue
+            mask = np.ones(len(records), dtype=bool)
+            if start_ms is not None:
+                mask &= records['created_at'] >= start_ms
+            if end_ms is not None:
+                mask &= records['created_at'] <= end_ms
+            for name, code in filters.items():
+                mask &= records[name] == code
+            if latest_only:
+                # Ордер всегда в файле своего дня создания: актуальна последняя запись
+                _, last = np.unique(records['order_id'][::-1], return_index=True)
+                if len(last) != len(records):
+                    latest = np.zeros(len(records), dtype=bool)
+                    latest[len(records) - 1 - last] = True
+                    mask &= latest
+            self.stats['scanned_records'] += len(records)
+            parts.append(records[mask])
+
+        result = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE)
+        self.stats['matched_records'] += len(result)
+        return result
+
+    def to_orders(self, records: np.ndarray) -> List[Order]:
+        """Собирает Order из записей, новые первыми"""
+        orders = []
+        for index in np.argsort(records['created_at'], kind='stable')[::-1]:
+            record = records[index]
+            data: Dict[str, Any] = {}
+            for name in INT_FIELDS:
+                data[name] = None if record[name] == NULL_INT else int(record[name])
+            for name in FLOAT_FIELDS:
+                data[name] = None if np.isnan(record[name]) else float(record[name])
+            for name in CODED_FIELDS:
+                data[name] = self._values[record[name]]
+            data['exchange_id'] = None if record['exchange_id'] == NULL_INT else str(record['exchange_id'])
+            order = Order.from_dict(data)
+            order.remaining_amount = data['remaining_amount']  # Order подставляет amount вместо 0.0
+            orders.append(order)
+        return orders
+
+    def orders_between(self, start_ms: int, end_ms: int, **filters) -> List[Order]:
+        return self.to_orders(self.scan(start_ms, end_ms, **filters))
+
+    # 🗜️ ОБСЛУЖИВАНИЕ
+
+    def drop_partitions_before(self, day_start_ms: int) -> int:
+        """Удаляет дневные файлы целиком (ретеншн); возвращает число файлов"""
+        cutoff = bisect_left(self._days, day_start_ms // DAY_MS)
+        dropped, self._days = self._days[:cutoff], self._days[cutoff:]
+        for day in dropped:
+            self._maps.pop(day, None)
+            self._partition_path(day).unlink(missing_ok=True)
+        return len(dropped)
+
+    def close(self):
+        self._maps.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика истории"""
+        return {
+            **self.stats,
+            'partitions': len(self._days),
+            'disk_bytes': sum(os.path.getsize(self._partition_path(day)) for day in self._days)
+        }
@@ -0,0 +1,399 @@
+# infrastructure/repositories/order_journal.py
+import asyncio
+import json
+import logging
+import os
+import shutil
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+
+logger = logging.getLogger(__name__)
+
+# Заголовок записи: длина payload, crc32 payload, номер записи, тип события
+RECORD_HEADER = struct.Struct('<IIQB')
+
+# Типы событий
+ORDER_PLACED = 1
+ORDER_PARTIALLY_FILLED = 2
+ORDER_FILLED = 3
+ORDER_CANCELLED = 4
+ORDER_FAILED = 5
+ORDER_UPDATED = 6
+ORDER_DELETED = 7
+DEAL_OPENED = 10
+DEAL_CLOSED = 11
+DEAL_CANCELLED = 12
+
+ORDER_EVENTS = {
+    Order.STATUS_OPEN: ORDER_PLACED,
+    Order.STATUS_PARTIALLY_FILLED: ORDER_PARTIALLY_FILLED,
+    Order.STATUS_FILLED: ORDER_FILLED,
+    Order.STATUS_CLOSED: ORDER_FILLED,
+    Order.STATUS_CANCELED: ORDER_CANCELLED,
+    Order.STATUS_FAILED: ORDER_FAILED,
+}
+DEAL_EVENTS = {
+    Deal.STATUS_OPEN: DEAL_OPENED,
+    Deal.STATUS_CLOSED: DEAL_CLOSED,
+    Deal.STATUS_CANCELED: DEAL_CANCELLED,
+}
+DEAL_EVENT_TYPES = frozenset(DEAL_EVENTS.values())
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, separators=(',', ':'), default=str).encode()
+
+
+def _deal_to_dict(deal: Deal) -> Dict[str, Any]:
+    return {
+        'deal_id': deal.deal_id,
+        'currency_pair_id': deal.currency_pair_id,
+        'status': deal.status,
+        'created_at': deal.created_at,
+        'closed_at': deal.closed_at,
+        'buy_order_id': deal.buy_order.order_id if deal.buy_order else None,
+        'sell_order_id': deal.sell_order.order_id if deal.sell_order else None,
+    }
+
+
+class OrderJournal:
+    """
+    📒 Журнал переходов состояний ордеров и сделок (append-only)
+
+    Каждый save репозитория дописывает маленькую запись в бинарный журнал
+    (заголовок + JSON состояния); fsync - только в фоне, в отдельном потоке
+    (по интервалу или раньше, когда накопилось fsync_batch записей).
+    Периодический снимок текущих репозиториев сжимает журнал: на старте
+    читается последний снимок и хвост журнала после него, поэтому время
+    рестарта зависит от размера живого состояния, а не от всей истории.
+    Оборванная запись в конце журнала (падение во время записи) отбрасывается по crc.
+
+    Сжатие в фоне: на event loop снимаются словари состояния и журнал
+    переименовывается в journal.prev.bin (новые записи идут в новый файл);
+    кодирование, запись и fsync снимка - в потоке. prev удаляется, когда
+    снимок на диске, а до тех пор читается при восстановлении.
+    """
+
+    def __init__(
+        self,
+        journal_dir: str = "data/journal",
+        fsync_batch: int = 256,
+        fsync_interval_ms: float = 200,
+        snapshot_every_records: int = 50000
+    ):
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.journal_dir / "journal.bin"
+        self.snapshot_path = self.journal_dir / "snapshot.bin"
+        self.previous_journal_path = self.journal_dir / "journal.prev.bin"
+
+        self.fsync_batch = fsync_batch
+        self.fsync_interval_ms = fsync_interval_ms
+        self.snapshot_every_records = snapshot_every_records
+
+        self.orders_repo = None
+        self.deals_repo = None
+
+        self._file: Optional[BinaryIO] = None
+        self._seq = 0
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._replaying = False
+        self._task = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.is_running = False
+
+        self.stats = {
+            'appended': 0,
+            'bytes_appended': 0,
+            'fsyncs': 0,
+            'snapshots': 0,
+            'replayed_records': 0,
+            'snapshot_records': 0,
+            'truncated_bytes': 0,
+            'recovery_ms': 0.0,
+            'last_snapshot_ms': 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'OrderJournal':
+        """Создание из секции persistence конфигурации"""
+        config = config or {}
+        return cls(
+            journal_dir=config.get("journal_dir", "data/journal"),
+            fsync_batch=config.get("journal_fsync_batch", 256),
+            fsync_interval_ms=config.get("journal_fsync_interval_ms", 200),
+            snapshot_every_records=config.get("journal_snapshot_every_records", 50000),
+        )
+
+    # ✍️ ЗАПИСЬ (горячий путь)
+
+    def record_order(self, order: Order):
+        if self._replaying:
+            return
+        self._append(ORDER_EVENTS.get(order.status, ORDER_UPDATED), _encode(order.to_dict()))
+
+    def record_order_deleted(self, order_id: int):
+        if self._replaying:
+            return
+        self._append(ORDER_DELETED, _encode({'order_id': order_id}))
+
+    def record_deal(self, deal: Deal):
+        if self._replaying:
+            return
+        self._append(DEAL_EVENTS.get(deal.status, DEAL_OPENED), _encode(_deal_to_dict(deal)))
+
+    def _append(self, event_type: int, payload: bytes):
+        if self._file is None:
+            self._file = open(self.journal_path, 'ab')
+        self._seq += 1
+        record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self._seq, event_type) + payload
+        self._file.write(record)
+
+        self._unsynced += 1
+        self._since_snapshot += 1
+        self.stats['appended'] += 1
+        self.stats['bytes_appended'] += len(record)
+        if self._unsynced >= self.fsync_batch and self._wakeup is not None:
+            self._wakeup.set()  # fsync сделает фоновый цикл, горячий путь только дописывает
+
+    def sync(self):
+        """Сбрасывает буфер и делает fsync накопленных записей (синхронно: остановка, тесты)"""
+        if self._file is None or self._unsynced == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self.stats['fsyncs'] += 1
+
+    async def sync_async(self):
+        """flush в loop, fsync - в потоке"""
+        if self._file is None or self._unsynced == 0:
+            return
+        self._file.flush()
+        unsynced, self._unsynced = self._unsynced, 0
+        try:
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+        except Exception:
+            self._unsynced += unsynced
+            raise
+        self.stats['fsyncs'] += 1
+
+    # 📖 ЧТЕНИЕ
+
+    def _read_records(self, path: Path) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        """(seq, тип, данные); на оборванной записи останавливается и обрезает файл"""
+        if not path.exists():
+            return
+        good_offset = 0
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if not header:
+                    break
+                if len(header) < RECORD_HEADER.size:
+                    break
+                length, crc, seq, event_type = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                good_offset = f.tell()
+                yield seq, event_type, json.loads(payload)
+            size = f.seek(0, os.SEEK_END)
+
+        if size > good_offset:
+            self.stats['truncated_bytes'] += size - good_offset
+            logger.warning(f"⚠️ {path.name}: отброшено {size - good_offset} байт оборванной записи")
+            with open(path, 'r+b') as f:
+                f.truncate(good_offset)
+
+    # 🔄 ВОССТАНОВЛЕНИЕ
+
+    def recover(self, orders_repo, deals_repo=None) -> Dict[str, int]:
+        """Снимок + хвост журнала -> репозитории; затем журнал пишет в них дальше"""
+        started = time.perf_counter()
+        self.orders_repo = orders_repo
+        self.deals_repo = deals_repo
+
+        orders: Dict[int, Dict[str, Any]] = {}
+        deals: Dict[int, Dict[str, Any]] = {}
+        snapshot_seq = 0
+
+        def apply(event_type, data):
+            if event_type == ORDER_DELETED:
+                orders.pop(data['order_id'], None)
+            elif event_type in DEAL_EVENT_TYPES:
+                deals[data['deal_id']] = data
+            else:
+                orders[data['order_id']] = data
+
+        for seq, event_type, data in self._read_records(self.snapshot_path):
+            snapshot_seq = seq
+            apply(event_type, data)
+            self.stats['snapshot_records'] += 1
+
+        self._seq = snapshot_seq
+        # journal.prev.bin остается, если сжатие не успело записать снимок
+        for path in (self.previous_journal_path, self.journal_path):
+            for seq, event_type, data in self._read_records(path):
+                self._seq = max(self._seq, seq)
+                if seq <= snapshot_seq:
+                    continue  # Уже в снимке (падение между снимком и удалением журнала)
+                apply(event_type, data)
+                self.stats['replayed_records'] += 1
+                self._since_snapshot += 1
+
+        self._replaying = True
+        try:
+            for data in orders.values():
+                orders_repo.save(Order.from_dict(data))
+            if deals_repo is not None:
+                for data in deals.values():
+                    deals_repo.save(Deal(
+                        deal_id=data['deal_id'],
+                        currency_pair_id=data['currency_pair_id'],
+                        status=data['status'],
+                        buy_order=orders_repo.get_by_id(data['buy_order_id']) if data['buy_order_id'] else None,
+                        sell_order=orders_repo.get_by_id(data['sell_order_id']) if data['sell_order_id'] else None,
+                        created_at=data['created_at'],
+                        closed_at=data['closed_at']
+                    ))
+        finally:
+            self._replaying = False
+
+        self.stats['recovery_ms'] = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"📒 Восстановлено из журнала: {len(orders)} ордеров, {len(deals)} сделок "
+            f"(снимок {self.stats['snapshot_records']} + хвост {self.stats['replayed_records']} записей) "
+            f"за {self.stats['recovery_ms']:.1f}ms"
+        )
+        if self.previous_journal_path.exists():
+            self.compact()  # Незавершенное сжатие: сразу сводим все в снимок
+        return {'orders': len(orders), 'deals': len(deals)}
+
+    # 🗜️ СЖАТИЕ
+
+    def compact(self):
+        """Снимок текущего состояния репозиториев и новый пустой журнал (синхронно)"""
+        started = time.perf_counter()
+        prepared = self._begin_compaction()
+        if prepared is not None:
+            self._write_snapshot(*prepared)
+            self._finish_compaction(started)
+
+    async def compact_async(self):
+        """Сжатие в фоне: снимок словарей и ротация в loop, запись снимка в потоке"""
+        started = time.perf_counter()
+        prepared = self._begin_compaction()
+        if prepared is not None:
+            await asyncio.to_thread(self._write_snapshot, *prepared)
+            self._finish_compaction(started)
+
+    def _begin_compaction(self) -> Optional[Tuple[int, List[Tuple[int, Dict[str, Any]]]]]:
+        """В loop: словари состояния и ротация журнала - записи после снимка идут в новый файл"""
+        if self.orders_repo is None:
+            return None
+        snapshot_seq = self._seq
+
+        iter_order_dicts = getattr(self.orders_repo, 'iter_order_dicts', None)
+        order_dicts = iter_order_dicts() if iter_order_dicts else (o.to_dict() for o in self.orders_repo.get_all())
+        records = [(ORDER_EVENTS.get(data['status'], ORDER_UPDATED), data) for data in order_dicts]
+        if self.deals_repo is not None:
+            iter_deal_dicts = getattr(self.deals_repo, 'iter_deal_dicts', None)
+            deal_dicts = iter_deal_dicts() if iter_deal_dicts else map(_deal_to_dict, self.deals_repo.get_all())
+            records += [(DEAL_EVENTS.get(data['status'], DEAL_OPENED), data) for data in deal_dicts]
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.previous_journal_path.exists():
+            # Прошлое сжатие не дописало снимок: его журнал еще нужен, дописываем хвост к нему
+            if self.journal_path.exists():
+                with open(self.previous_journal_path, 'ab') as dst, open(self.journal_path, 'rb') as src:
+                    shutil.copyfileobj(src, dst)
+                self.journal_path.unlink()
+        elif self.journal_path.exists():
+            os.replace(self.journal_path, self.previous_journal_path)
+        self._file = open(self.journal_path, 'wb')
+        self._unsynced = 0  # Несинхронизированные записи теперь в prev: его fsync - в _write_snapshot
+        self._since_snapshot = 0
+        return snapshot_seq, records
+
+    def _write_snapshot(self, snapshot_seq: int, records: List[Tuple[int, Dict[str, Any]]]):
+        """Кодирование, запись и fsync снимка; затем prev больше не нужен (безопасно из потока)"""
+        if self.previous_journal_path.exists():
+            with open(self.previous_journal_path, 'rb') as f:
+                os.fsync(f.fileno())
+
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            for event_type, data in records:
+                payload = _encode(data)
+                f.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload), snapshot_seq, event_type) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self.previous_journal_path.unlink(missing_ok=True)
+
+    def _finish_compaction(self, started: float):
+        self.stats['snapshots'] += 1
+        self.stats['last_snapshot_ms'] = (time.perf_counter() - started) * 1000
+        logger.info(f"🗜️ Снимок журнала записан за {self.stats['last_snapshot_ms']:.1f}ms")
+
+    # 🔄 ЖИЗНЕННЫЙ ЦИКЛ
+
+    async def start(self):
+        """Фоновые fsync по интервалу и сжатие по числу записей"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._maintenance_loop())
+
+    async def _maintenance_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.fsync_interval_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.sync_async()
+                if self._since_snapshot >= self.snapshot_every_records:
+                    await self.compact_async()
+            except Exception as e:
+                logger.error(f"❌ Ошибка обслуживания журнала: {e}")
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._wakeup = None
+        self.close()
+
+    def close(self):
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика журнала"""
+        return {
+            **self.stats,
+            'seq': self._seq,
+            'unsynced': self._unsynced,
+            'records_since_snapshot': self._since_snapshot,
+            'journal_bytes': self.journal_path.stat().st_size if self.journal_path.exists() else 0
+        }
@@ -1,13 +1,55 @@
 # infrastructure/repositories/orders_repository.py.new - ENHANCED для реальной торговли
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from bisect import bisect_left, bisect_right, insort
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator, IO
 from datetime import datetime, timedelta
 from domain.entities.order import Order
+from domain.clock import now_ms
+import asyncio
+import gzip
+import heapq
+import io
+import itertools
 import json
 import logging
+import time
+
+try:
+    import zstandard  # Необязательно: сжатие экспорта zstd
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+
+def _detect_compression(file_path: str, compression: Optional[str]) -> Optional[str]:
+    if compression is not None:
+        return compression or None
+    if file_path.endswith('.gz'):
+        return 'gzip'
+    if file_path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def open_order_stream(file_path: str, mode: str, compression: Optional[str] = None) -> IO[str]:
+    """Текстовый поток NDJSON: без сжатия, gzip или zstd (по расширению .gz/.zst)"""
+    compression = _detect_compression(file_path, compression)
+    if compression == 'gzip':
+        return gzip.open(file_path, mode + 't', encoding='utf-8', compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        raw = open(file_path, mode + 'b')
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    if compression:
+        raise ValueError(f"Unknown compression: {compression}")
+    return open(file_path, mode, encoding='utf-8')
+
 class OrdersRepository(ABC):
     """
     🚀 РАСШИРЕННЫЙ интерфейс репозитория для ордеров с поддержкой биржевых операций
@@ -73,75 +115,160 @@ class OrdersRepository(ABC):
         """🆕 Удаление старых ордеров"""
         pass
 
+    def count(self) -> int:
+        """Число хранимых ордеров (реализации считают без загрузки объектов)"""
+        return len(self.get_all())
+
 
 class InMemoryOrdersRepository(OrdersRepository):
     """
     🚀 РАСШИРЕННАЯ InMemory реализация с поддержкой всех новых методов
     Подходит для MVP, но в production нужна БД
+
+    Индексы - словари-множества с порядком вставки (O(1) добавление/удаление)
+    и отсортированный список (created_at, order_id) для запросов по периоду
+    через bisect. Ключи, под которыми ордер проиндексирован, запоминаются:
+    ордер меняется на месте, и при повторном save старые записи снимаются
+    по ним, а не по новому состоянию объекта.
+
+    Ордера, требующие внимания, ведутся отдельно: куча (last_update, order_id)
+    открытых ордеров с exchange_id для синхронизации (записи проверяются лениво
+    при извлечении) и множество ордеров с ошибками. Мониторинг стоит
+    пропорционально числу таких ордеров, а не размеру хранилища.
+
+    journal (OrderJournal) - необязательный журнал: каждое изменение
+    дописывается в него, после рестарта состояние восстанавливается из него.
+
+    archive (ClosedOrdersArchive) - необязательный колоночный архив: закрытые
+    ордера старше archive_after_ms переносятся в него из словаря объектов
+    (проверка раз в archive_check_every сохранений). Индексы продолжают
+    ссылаться на них, методы чтения собирают Order из архива по запросу.
+
+    При достижении max_orders самые давно закрытые ордера вытесняются по
+    куче (closed_at, order_id), которая пополняется при закрытии - без
+    сортировки всего хранилища. cold_tier (например SqliteOrdersRepository) -
+    холодный уровень: вытесненные ордера сохраняются туда, а не удаляются;
+    методы чтения с include_cold=True ищут и в нем.
+    history (OrderHistoryArchive) - дневные файлы на диске: закрытые ордера
+    дописываются туда при переносе в архив (без архива - при вытеснении),
+    а get_orders_by_date_range дочитывает из них исторические диапазоны.
+    persistence_queue (WriteBehindQueue) - если задана, вытесненные ордера
+    ставятся в нее, и запись в cold_tier/history идет в фоне, а не внутри save().
     """
 
-    def __init__(self, max_orders: int = 10000):
+    def __init__(
+        self,
+        max_orders: int = 10000,
+        journal=None,
+        archive=None,
+        archive_after_ms: int = 5 * 60 * 1000,
+        archive_check_every: int = 1000,
+        cold_tier=None,
+        evict_batch: int = None,
+        history=None,
+        persistence_queue=None
+    ):
         self._storage: Dict[int, Order] = {}
-        self._exchange_id_index: Dict[str, int] = {}  # exchange_id -> order_id
-        self._symbol_index: Dict[str, List[int]] = {}  # symbol -> [order_ids]
-        self._deal_index: Dict[int, List[int]] = {}    # deal_id -> [order_ids]
-        self._status_index: Dict[str, List[int]] = {}  # status -> [order_ids]
+        self._exchange_id_index: Dict[str, int] = {}             # exchange_id -> order_id
+        self._symbol_index: Dict[str, Dict[int, None]] = {}      # symbol -> {order_id}
+        self._deal_index: Dict[int, Dict[int, None]] = {}        # deal_id -> {order_id}
+        self._status_index: Dict[str, Dict[int, None]] = {}      # status -> {order_id}
+        self._time_index: List[Tuple[int, int]] = []             # [(created_at, order_id)] по возрастанию
+        self._indexed_keys: Dict[int, Tuple] = {}                # order_id -> (exchange_id, symbol, deal_id, status, created_at)
+        self._sync_heap: List[Tuple[int, int]] = []              # [(last_update, order_id)] открытых на бирже
+        self._error_index: Dict[int, None] = {}                  # {order_id} с ошибками
+        self._live_closed: Dict[int, None] = {}                  # {order_id} закрытых, еще не в архиве
+        self._eviction_heap: List[Tuple[int, int]] = []          # [(closed_at, order_id)] кандидаты на вытеснение
         self.max_orders = max_orders
+        self.journal = journal
+        self.archive = archive
+        self.archive_after_ms = archive_after_ms
+        self.archive_check_every = archive_check_every
+        self.cold_tier = cold_tier
+        self.history = history
+        self.persistence_queue = persistence_queue
+        # Вытесняем понемногу (1% лимита), а не 10% с полной сортировкой
+        self.evict_batch = evict_batch or max(1, max_orders // 100)
 
         # Статистика
         self.stats = {
             'total_saves': 0,
             'total_queries': 0,
-            'index_rebuilds': 0
+            'index_rebuilds': 0,
+            'evicted': 0,
+            'cold_reads': 0,
+            'history_reads': 0
         }
 
+        # 🔍 Планы запросов search_orders
+        self.last_query_plan: Dict[str, Any] = {}
+        self.query_plan_stats: Dict[str, int] = {}
+
     def save(self, order: Order) -> None:
         """Сохранить ордер с обновлением индексов"""
         try:
             # Проверяем лимит
-            if len(self._storage) >= self.max_orders and order.order_id not in self._storage:
+            if self._retained_count() >= self.max_orders and order.order_id not in self._indexed_keys \
+                    and (self.archive is None or order.order_id not in self.archive):
                 self._cleanup_old_orders()
 
             # Удаляем старые индексы если ордер уже существует
-            if order.order_id in self._storage:
-                self._remove_from_indexes(self._storage[order.order_id])
+            if order.order_id in self._indexed_keys or (self.archive is not None and order.order_id in self.archive):
+                self._remove_from_indexes(order)
 
-            # Сохраняем ордер
+            # Сохраняем ордер (из архива - обратно в живые)
             self._storage[order.order_id] = order
+            if self.archive is not None and order.order_id in self.archive:
+                self.archive.remove(order.order_id)
 
             # Обновляем индексы
             self._add_to_indexes(order)
 
+            if self.journal:
+                self.journal.record_order(order)
+
             self.stats['total_saves'] += 1
+            if self.archive is not None and self.stats['total_saves'] % self.archive_check_every == 0:
+                self.archive_closed_orders()
             logger.debug(f"💾 Order {order.order_id} saved successfully")
 
         except Exception as e:
             logger.error(f"❌ Error saving order {order.order_id}: {e}")
             raise
 
-    def get_by_id(self, order_id: int) -> Optional[Order]:
+    def get_by_id(self, order_id: int, include_cold: bool = False) -> Optional[Order]:
         """Получить ордер по локальному ID"""
         self.stats['total_queries'] += 1
-        return self._storage.get(order_id)
+        order = self._get(order_id)
+        if order is None and include_cold and self.cold_tier is not None:
+            self.stats['cold_reads'] += 1
+            order = self.cold_tier.get_by_id(order_id)
+        return order
 
-    def get_by_exchange_id(self, exchange_id: str) -> Optional[Order]:
+    def get_by_exchange_id(self, exchange_id: str, include_cold: bool = False) -> Optional[Order]:
         """🆕 Получить ордер по ID биржи"""
         self.stats['total_queries'] += 1
         order_id = self._exchange_id_index.get(exchange_id)
         if order_id:
-            return self._storage.get(order_id)
+            return self._get(order_id)
+        if include_cold and self.cold_tier is not None:
+            self.stats['cold_reads'] += 1
+            return self.cold_tier.get_by_exchange_id(exchange_id)
         return None
 
-    def get_all_by_deal(self, deal_id: int) -> List[Order]:
+    def get_all_by_deal(self, deal_id: int, include_cold: bool = False) -> List[Order]:
         """Получить все ордера сделки"""
         self.stats['total_queries'] += 1
-        order_ids = self._deal_index.get(deal_id, [])
-        return [self._storage[oid] for oid in order_ids if oid in self._storage]
+        order_ids = self._deal_index.get(deal_id, ())
+        orders = [self._get(oid) for oid in order_ids]
+        if include_cold:
+            orders = self._merge_cold(orders, lambda cold: cold.get_all_by_deal(deal_id))
+        return orders
 
     def get_all(self) -> List[Order]:
         """Получить все ордера"""
         self.stats['total_queries'] += 1
-        return list(self._storage.values())
+        return list(self._iter_all())
 
     def get_open_orders(self) -> List[Order]:
         """🆕 Получить только открытые ордера"""
@@ -149,54 +276,95 @@ class InMemoryOrdersRepository(OrdersRepository):
         open_statuses = [Order.STATUS_OPEN, Order.STATUS_PARTIALLY_FILLED]
         orders = []
         for status in open_statuses:
-            order_ids = self._status_index.get(status, [])
-            orders.extend([self._storage[oid] for oid in order_ids if oid in self._storage])
+            order_ids = self._status_index.get(status, ())
+            orders.extend([self._get(oid) for oid in order_ids])
         return orders
 
-    def get_orders_by_symbol(self, symbol: str) -> List[Order]:
+    def get_orders_by_symbol(self, symbol: str, include_cold: bool = False) -> List[Order]:
         """🆕 Получить ордера по торговой паре"""
         self.stats['total_queries'] += 1
-        order_ids = self._symbol_index.get(symbol, [])
-        return [self._storage[oid] for oid in order_ids if oid in self._storage]
+        order_ids = self._symbol_index.get(symbol, ())
+        orders = [self._get(oid) for oid in order_ids]
+        if include_cold:
+            orders = self._merge_cold(orders, lambda cold: cold.get_orders_by_symbol(symbol))
+        return orders
 
-    def get_orders_by_status(self, status: str) -> List[Order]:
+    def get_orders_by_status(self, status: str, include_cold: bool = False) -> List[Order]:
         """🆕 Получить ордера по статусу"""
         self.stats['total_queries'] += 1
-        order_ids = self._status_index.get(status, [])
-        return [self._storage[oid] for oid in order_ids if oid in self._storage]
+        order_ids = self._status_index.get(status, ())
+        orders = [self._get(oid) for oid in order_ids]
+        if include_cold:
+            orders = self._merge_cold(orders, lambda cold: cold.get_orders_by_status(status))
+        return orders
 
     def get_pending_orders(self) -> List[Order]:
         """🆕 Получить ордера в ожидании размещения"""
         return self.get_orders_by_status(Order.STATUS_PENDING)
 
-    def get_orders_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Order]:
+    def get_orders_by_date_range(self, start_date: datetime, end_date: datetime,
+                                 include_cold: bool = False) -> List[Order]:
         """🆕 Получить ордера за период"""
         self.stats['total_queries'] += 1
         start_timestamp = int(start_date.timestamp() * 1000)
         end_timestamp = int(end_date.timestamp() * 1000)
 
-        orders = []
-        for order in self._storage.values():
-            if start_timestamp <= order.created_at <= end_timestamp:
-                orders.append(order)
+        # O(log n + k): границы диапазона бинарным поиском, новые первые
+        lo = bisect_left(self._time_index, (start_timestamp, float('-inf')))
+        hi = bisect_right(self._time_index, (end_timestamp, float('inf')))
+        orders = [self._get(oid) for _, oid in reversed(self._time_index[lo:hi])]
+        merged = False
+        if include_cold:
+            orders = self._merge_cold(orders, lambda cold: cold.get_orders_by_date_range(start_date, end_date))
+            merged = True
+        if self.history is not None and self.history.covers(start_timestamp, end_timestamp):
+            # Исторический диапазон: дочитываем из файлов истории, живая версия приоритетнее
+            self.stats['history_reads'] += 1
+            seen = {order.order_id for order in orders}
+            records = self.history.scan(start_timestamp, end_timestamp)
+            # Объекты собираем только для ордеров, которых нет в памяти
+            missing = [position for position, order_id in enumerate(records['order_id'].tolist())
+                       if order_id not in seen and order_id not in self._storage
+                       and (self.archive is None or order_id not in self.archive)]
+            orders += self.history.to_orders(records[missing])
+            merged = True
+        if merged:
+            orders.sort(key=lambda x: x.created_at, reverse=True)
+        return orders
 
-        return sorted(orders, key=lambda x: x.created_at, reverse=True)
+    def _merge_cold(self, orders: List[Order], cold_query) -> List[Order]:
+        """Добавляет результаты холодного уровня (горячая версия ордера приоритетнее)"""
+        if self.cold_tier is None:
+            return orders
+        self.stats['cold_reads'] += 1
+        hot_ids = {order.order_id for order in orders}
+        return orders + [order for order in cold_query(self.cold_tier)
+                         if order.order_id not in hot_ids and order.order_id not in self._indexed_keys]
 
     def bulk_update_status(self, order_ids: List[int], status: str) -> int:
         """🆕 Массовое обновление статуса"""
         updated_count = 0
 
         for order_id in order_ids:
-            if order_id in self._storage:
-                order = self._storage[order_id]
+            order = self._get(order_id)
+            if order is not None:
+                if order_id not in self._storage:
+                    # Ордер из архива снова становится живым объектом
+                    self._indexed_keys[order_id] = self.archive.index_keys(order_id)
+                    self.archive.remove(order_id)
+                    self._storage[order_id] = order
                 old_status = order.status
 
                 # Обновляем статус
                 order.status = status
                 order.last_update = int(datetime.now().timestamp() * 1000)
+                if order.is_closed() and not order.closed_at:
+                    order.closed_at = order.last_update
 
                 # Обновляем индексы
                 self._update_status_index(order, old_status, status)
+                if self.journal:
+                    self.journal.record_order(order)
                 updated_count += 1
 
         logger.info(f"📊 Bulk updated {updated_count} orders to status {status}")
@@ -214,18 +382,92 @@ class InMemoryOrdersRepository(OrdersRepository):
                (not order.closed_at and order.created_at < cutoff_timestamp and order.is_closed()):
                 to_delete.append(order_id)
 
-        deleted_count = 0
+        # Архив проверяется по колонкам, без сборки объектов
+        if self.archive is not None:
+            to_delete.extend(self.archive.ids_closed_before(cutoff_timestamp))
+
+        deleted_count = self.cold_tier.delete_old_orders(older_than_days) if self.cold_tier is not None else 0
         for order_id in to_delete:
-            order = self._storage[order_id]
-            self._remove_from_indexes(order)
-            del self._storage[order_id]
+            self._unindex(order_id)
+            if self._storage.pop(order_id, None) is None:
+                self.archive.remove(order_id)
+            if self.journal:
+                self.journal.record_order_deleted(order_id)
             deleted_count += 1
 
         logger.info(f"🗑️ Deleted {deleted_count} old orders (older than {older_than_days} days)")
         return deleted_count
 
+    # 🗃️ АРХИВ ЗАКРЫТЫХ ОРДЕРОВ
+
+    def _get(self, order_id: int) -> Optional[Order]:
+        order = self._storage.get(order_id)
+        if order is None and self.archive is not None:
+            order = self.archive.get(order_id)
+        return order
+
+    def _iter_all(self) -> Iterator[Order]:
+        yield from list(self._storage.values())
+        if self.archive is not None:
+            yield from self.archive.iter_orders()
+
+    def _export_source(self) -> Iterator[Order]:
+        """Снимок ссылок на живые ордера и id архива; сборка объектов - лениво"""
+        live = list(self._storage.values())
+        archived = self.archive.order_ids() if self.archive is not None else []
+        return itertools.chain(live, filter(None, map(self._get_archived, archived)))
+
+    def iter_order_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Все ордера словарями to_dict: архив читается из колонок, без сборки Order"""
+        for order in list(self._storage.values()):
+            yield order.to_dict()
+        if self.archive is not None:
+            yield from self.archive.iter_dicts()
+
+    def _get_archived(self, order_id: int) -> Optional[Order]:
+        return self.archive.get(order_id)
+
+    def archive_closed_orders(self, min_age_ms: int = None) -> int:
+        """Переносит закрытые ордера старше min_age_ms из объектов в колоночный архив"""
+        if self.archive is None:
+            return 0
+        cutoff = now_ms() - (self.archive_after_ms if min_age_ms is None else min_age_ms)
+        archived = 0
+        moved: List[Order] = []
+        for order_id in list(self._live_closed):
+            order = self._storage.get(order_id)
+            if order is None or not order.is_closed():
+                self._live_closed.pop(order_id, None)
+                continue
+            if (order.closed_at or order.last_update) > cutoff:
+                continue
+            self.archive.add(order)
+            del self._storage[order_id]
+            del self._live_closed[order_id]
+            del self._indexed_keys[order_id]
+            moved.append(order)
+            archived += 1
+        if moved and self.history is not None:
+            # Закрытый ордер попадает в историю при переносе в архив, а не только при вытеснении
+            self._persist(self.history, moved)
+        if archived:
+            logger.debug(f"🗃️ Archived {archived} closed orders")
+        return archived
+
     # 🔧 МЕТОДЫ УПРАВЛЕНИЯ ИНДЕКСАМИ
 
+    @staticmethod
+    def _add_posting(index: Dict[Any, Dict[int, None]], key: Any, order_id: int):
+        index.setdefault(key, {})[order_id] = None
+
+    @staticmethod
+    def _remove_posting(index: Dict[Any, Dict[int, None]], key: Any, order_id: int):
+        postings = index.get(key)
+        if postings is not None:
+            postings.pop(order_id, None)
+            if not postings:
+                del index[key]
+
     def _add_to_indexes(self, order: Order):
         """Добавляет ордер во все индексы"""
         # Exchange ID index
@@ -234,88 +476,158 @@ class InMemoryOrdersRepository(OrdersRepository):
 
         # Symbol index
         if order.symbol:
-            if order.symbol not in self._symbol_index:
-                self._symbol_index[order.symbol] = []
-            if order.order_id not in self._symbol_index[order.symbol]:
-                self._symbol_index[order.symbol].append(order.order_id)
+            self._add_posting(self._symbol_index, order.symbol, order.order_id)
 
         # Deal index
         if order.deal_id:
-            if order.deal_id not in self._deal_index:
-                self._deal_index[order.deal_id] = []
-            if order.order_id not in self._deal_index[order.deal_id]:
-                self._deal_index[order.deal_id].append(order.order_id)
+            self._add_posting(self._deal_index, order.deal_id, order.order_id)
 
         # Status index
-        if order.status not in self._status_index:
-            self._status_index[order.status] = []
-        if order.order_id not in self._status_index[order.status]:
-            self._status_index[order.status].append(order.order_id)
+        self._add_posting(self._status_index, order.status, order.order_id)
+
+        # Time index (ордера приходят по времени - вставка почти всегда в конец)
+        insort(self._time_index, (order.created_at, order.order_id))
+
+        if order.order_id in self._storage:
+            self._indexed_keys[order.order_id] = (
+                order.exchange_id, order.symbol, order.deal_id, order.status, order.created_at
+            )
+        self._track_attention(order)
+
+    def _track_attention(self, order: Order):
+        """Ошибки и кандидаты на синхронизацию"""
+        if order.error_message or order.status == Order.STATUS_FAILED:
+            self._error_index[order.order_id] = None
+        else:
+            self._error_index.pop(order.order_id, None)
+
+        if order.is_closed() and order.order_id in self._storage:
+            self._live_closed[order.order_id] = None
+        else:
+            self._live_closed.pop(order.order_id, None)
+
+        if order.is_closed():
+            heapq.heappush(self._eviction_heap, (order.closed_at or order.created_at, order.order_id))
+
+        if order.is_open() and order.exchange_id:
+            heapq.heappush(self._sync_heap, (order.last_update, order.order_id))
+            # Устаревшие записи копятся при каждом save: изредка пересобираем кучу
+            if len(self._sync_heap) > 2 * len(self._storage) + 1024:
+                self._sync_heap = [
+                    (o.last_update, o.order_id) for o in self._storage.values() if o.is_open() and o.exchange_id
+                ]
+                heapq.heapify(self._sync_heap)
 
     def _remove_from_indexes(self, order: Order):
-        """Удаляет ордер из всех индексов"""
+        """Удаляет ордер из всех индексов (по ключам, с которыми он был добавлен)"""
+        self._unindex(order.order_id)
+
+    def _unindex(self, order_id: int):
+        keys = self._indexed_keys.pop(order_id, None)
+        if keys is None and self.archive is not None:
+            # У архивных ордеров ключи индексов хранятся в колонках архива
+            keys = self.archive.index_keys(order_id)
+        if keys is None:
+            return
+        self._error_index.pop(order_id, None)
+        self._live_closed.pop(order_id, None)
+        exchange_id, symbol, deal_id, status, created_at = keys
+
         # Exchange ID index
-        if order.exchange_id and order.exchange_id in self._exchange_id_index:
-            del self._exchange_id_index[order.exchange_id]
+        if exchange_id and self._exchange_id_index.get(exchange_id) == order_id:
+            del self._exchange_id_index[exchange_id]
 
         # Symbol index
-        if order.symbol and order.symbol in self._symbol_index:
-            if order.order_id in self._symbol_index[order.symbol]:
-                self._symbol_index[order.symbol].remove(order.order_id)
-            if not self._symbol_index[order.symbol]:
-                del self._symbol_index[order.symbol]
+        if symbol:
+            self._remove_posting(self._symbol_index, symbol, order_id)
 
         # Deal index
-        if order.deal_id and order.deal_id in self._deal_index:
-            if order.order_id in self._deal_index[order.deal_id]:
-                self._deal_index[order.deal_id].remove(order.order_id)
-            if not self._deal_index[order.deal_id]:
-                del self._deal_index[order.deal_id]
+        if deal_id:
+            self._remove_posting(self._deal_index, deal_id, order_id)
 
         # Status index
-        if order.status in self._status_index:
-            if order.order_id in self._status_index[order.status]:
-                self._status_index[order.status].remove(order.order_id)
-            if not self._status_index[order.status]:
-                del self._status_index[order.status]
+        self._remove_posting(self._status_index, status, order_id)
+
+        # Time index
+        position = bisect_left(self._time_index, (created_at, order_id))
+        if position < len(self._time_index) and self._time_index[position] == (created_at, order_id):
+            del self._time_index[position]
 
     def _update_status_index(self, order: Order, old_status: str, new_status: str):
         """Обновляет индекс статусов при изменении статуса"""
-        # Удаляем из старого статуса
-        if old_status in self._status_index and order.order_id in self._status_index[old_status]:
-            self._status_index[old_status].remove(order.order_id)
-            if not self._status_index[old_status]:
-                del self._status_index[old_status]
-
-        # Добавляем в новый статус
-        if new_status not in self._status_index:
-            self._status_index[new_status] = []
-        if order.order_id not in self._status_index[new_status]:
-            self._status_index[new_status].append(order.order_id)
+        keys = self._indexed_keys.get(order.order_id)
+        if keys is not None:
+            old_status = keys[3]
+            self._indexed_keys[order.order_id] = keys[:3] + (new_status,) + keys[4:]
+
+        self._remove_posting(self._status_index, old_status, order.order_id)
+        self._add_posting(self._status_index, new_status, order.order_id)
+        self._track_attention(order)
+
+    def count(self) -> int:
+        return self._retained_count()
+
+    def _retained_count(self) -> int:
+        return len(self._storage) + (len(self.archive) if self.archive is not None else 0)
+
+    def _eviction_key(self, order_id: int) -> Optional[int]:
+        """Текущий ключ вытеснения ордера (None - не закрыт или удален)"""
+        order = self._storage.get(order_id)
+        if order is not None:
+            return (order.closed_at or order.created_at) if order.is_closed() else None
+        if self.archive is not None:
+            return self.archive.close_time(order_id)
+        return None
 
     def _cleanup_old_orders(self):
-        """Очистка старых ордеров при достижении лимита"""
-        if len(self._storage) < self.max_orders:
+        """Вытеснение самых давно закрытых ордеров при достижении лимита: O(k log n)"""
+        if self._retained_count() < self.max_orders:
             return
 
-        # Удаляем 10% самых старых закрытых ордеров
-        closed_orders = []
-        for order in self._storage.values():
-            if order.is_closed():
-                closed_orders.append((order.order_id, order.closed_at or order.created_at))
-
-        # Сортируем по времени закрытия
-        closed_orders.sort(key=lambda x: x[1])
-
-        # Удаляем самые старые
-        to_delete_count = max(1, len(closed_orders) // 10)
-        for i in range(min(to_delete_count, len(closed_orders))):
-            order_id = closed_orders[i][0]
-            order = self._storage[order_id]
-            self._remove_from_indexes(order)
-            del self._storage[order_id]
-
-        logger.info(f"🧹 Cleaned up {to_delete_count} old orders")
+        evicted: List[Order] = []
+        evicted_live: List[Order] = []  # Не прошедшие через архив: в истории их еще нет
+        while self._eviction_heap and len(evicted) < self.evict_batch:
+            closed_at, order_id = heapq.heappop(self._eviction_heap)
+            if self._eviction_key(order_id) != closed_at:
+                continue  # Запись устарела: ордер переоткрыт, пересохранен или удален
+            order = self._get(order_id)
+            self._unindex(order_id)
+            if self._storage.pop(order_id, None) is None:
+                self.archive.remove(order_id)
+            else:
+                evicted_live.append(order)
+            if self.journal:
+                self.journal.record_order_deleted(order_id)
+            evicted.append(order)
+
+        # Устаревшие записи копятся при повторных save: изредка пересобираем кучу
+        if len(self._eviction_heap) > 4 * self._retained_count() + 1024:
+            ids = itertools.chain(list(self._storage), self.archive.order_ids() if self.archive is not None else ())
+            self._eviction_heap = [(key, order_id) for order_id in ids
+                                   if (key := self._eviction_key(order_id)) is not None]
+            heapq.heapify(self._eviction_heap)
+
+        if not evicted:
+            return
+        if self.history is not None and evicted_live:
+            self._persist(self.history, evicted_live)
+        if self.cold_tier is not None:
+            self._persist(self.cold_tier, evicted)
+        self.stats['evicted'] += len(evicted)
+        logger.info(f"🧹 Evicted {len(evicted)} old orders"
+                    f"{' to cold tier' if self.cold_tier is not None or self.history is not None else ''}")
+
+    def _persist(self, target, orders: List[Order]):
+        """Запись в cold_tier/history: через persistence_queue в фоне, иначе сразу"""
+        if self.persistence_queue is not None:
+            # save() не ждет диска: запись пакетом в фоновом сбросе очереди
+            for order in orders:
+                self.persistence_queue.enqueue(target, order.order_id, order)
+        elif hasattr(target, 'save_many'):
+            target.save_many(orders)
+        else:
+            for order in orders:
+                target.save(order)
 
     def rebuild_indexes(self):
         """🔧 Перестроение всех индексов"""
@@ -326,9 +638,15 @@ class InMemoryOrdersRepository(OrdersRepository):
         self._symbol_index.clear()
         self._deal_index.clear()
         self._status_index.clear()
+        self._time_index.clear()
+        self._indexed_keys.clear()
+        self._sync_heap.clear()
+        self._error_index.clear()
+        self._live_closed.clear()
+        self._eviction_heap.clear()
 
         # Перестраиваем
-        for order in self._storage.values():
+        for order in self._iter_all():
             self._add_to_indexes(order)
 
         self.stats['index_rebuilds'] += 1
@@ -338,7 +656,7 @@ class InMemoryOrdersRepository(OrdersRepository):
 
     def get_statistics(self) -> Dict[str, Any]:
         """📊 Получение статистики репозитория"""
-        total_orders = len(self._storage)
+        total_orders = self._retained_count()
 
         # Группировка по статусам
         status_counts = {}
@@ -358,22 +676,45 @@ class InMemoryOrdersRepository(OrdersRepository):
             'symbol_distribution': symbol_counts,
             'total_deals': len(self._deal_index),
             'orders_with_exchange_id': len(self._exchange_id_index),
-            'performance_stats': self.stats.copy()
+            'orders_with_errors': len(self._error_index),
+            'sync_heap_size': len(self._sync_heap),
+            'live_orders': len(self._storage),
+            'archive': self.archive.get_statistics() if self.archive is not None else None,
+            'eviction_heap_size': len(self._eviction_heap),
+            'cold_tier': self.cold_tier.get_statistics() if self.cold_tier is not None else None,
+            'history': self.history.get_statistics() if self.history is not None else None,
+            'performance_stats': self.stats.copy(),
+            'query_plans': dict(self.query_plan_stats)
         }
 
     def export_to_json(self, file_path: str = None) -> str:
         """💾 Экспорт всех ордеров в JSON"""
+        return self._write_json(self._export_payload(), file_path)
+
+    async def export_to_json_async(self, file_path: str = None, compute_executor=None) -> str:
+        """
+        💾 Экспорт в JSON без блокировки event loop: снимок словарей берется в loop
+        (репозиторий и ордера меняет только он), json.dumps и запись - в executor
+        """
+        payload = self._export_payload()
+        if compute_executor is None:
+            return await asyncio.to_thread(self._write_json, payload, file_path)
+        return await compute_executor.run(self._write_json, payload, file_path, task_name="export_to_json")
+
+    def _export_payload(self) -> Dict[str, Any]:
         orders_data = []
-        for order in self._storage.values():
+        for order in self._iter_all():
             orders_data.append(order.to_dict())
 
-        export_data = {
+        return {
             'export_timestamp': datetime.now().isoformat(),
             'total_orders': len(orders_data),
             'orders': orders_data,
             'statistics': self.get_statistics()
         }
 
+    @staticmethod
+    def _write_json(export_data: Dict[str, Any], file_path: str = None) -> str:
         json_data = json.dumps(export_data, indent=2, default=str)
 
         if file_path:
@@ -412,6 +753,135 @@ class InMemoryOrdersRepository(OrdersRepository):
             logger.error(f"❌ Error importing orders: {e}")
             return 0
 
+    # 📦 ПОТОКОВЫЙ ЭКСПОРТ / ИМПОРТ (NDJSON)
+
+    def bulk_load(self, orders: Iterable[Order], rebuild: bool = True) -> int:
+        """Загрузка без поиндексной вставки: одно перестроение индексов в конце"""
+        count = 0
+        for order in orders:
+            self._storage[order.order_id] = order
+            if self.archive is not None:
+                self.archive.remove(order.order_id)
+            if self.journal:
+                self.journal.record_order(order)
+            count += 1
+        self.stats['total_saves'] += count
+        if rebuild:
+            self.rebuild_indexes()
+        return count
+
+    @staticmethod
+    def _throughput(action: str, count: int, file_path: str, started: float) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - started
+        result = {
+            'orders': count,
+            'file_path': file_path,
+            'elapsed_ms': elapsed * 1000,
+            'orders_per_sec': count / elapsed if elapsed > 0 else 0.0
+        }
+        logger.info(f"{action} {count} orders ({file_path}) за {result['elapsed_ms']:.0f}ms "
+                    f"({result['orders_per_sec']:.0f} ордеров/с)")
+        return result
+
+    @staticmethod
+    def _write_ndjson(records: Iterable[Dict[str, Any]], file_path: str, compression: Optional[str],
+                      chunk_size: int) -> int:
+        count = 0
+        records = iter(records)
+        with open_order_stream(file_path, 'w', compression) as f:
+            while True:
+                chunk = list(itertools.islice(records, chunk_size))
+                if not chunk:
+                    break
+                InMemoryOrdersRepository._write_ndjson_chunk(f, chunk)
+                count += len(chunk)
+        return count
+
+    @staticmethod
+    def _write_ndjson_chunk(f: IO[str], chunk: List[Dict[str, Any]]):
+        f.write(''.join(
+            json.dumps(record, separators=(',', ':'), default=str) + '\n'
+            for record in chunk
+        ))
+
+    @staticmethod
+    def iter_ndjson_chunks(file_path: str, compression: Optional[str] = None,
+                           chunk_size: int = 5000) -> Iterator[List[Order]]:
+        """Ордера из NDJSON порциями по chunk_size (файл не читается целиком)"""
+        chunk = []
+        with open_order_stream(file_path, 'r', compression) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append(Order.from_dict(json.loads(line)))
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to import order at line {line_number}: {e}")
+                    continue
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def export_ndjson(self, file_path: str, compression: Optional[str] = None,
+                      chunk_size: int = 1000) -> Dict[str, Any]:
+        """💾 Потоковый экспорт: по строке JSON на ордер, запись порциями"""
+        started = time.perf_counter()
+        records = (order.to_dict() for order in self._export_source())
+        count = self._write_ndjson(records, file_path, compression, chunk_size)
+        return self._throughput("📁 Exported", count, file_path, started)
+
+    def import_ndjson(self, file_path: str, compression: Optional[str] = None,
+                      chunk_size: int = 5000) -> Dict[str, Any]:
+        """📥 Потоковый импорт порциями с одним перестроением индексов"""
+        started = time.perf_counter()
+        count = 0
+        for chunk in self.iter_ndjson_chunks(file_path, compression, chunk_size):
+            count += self.bulk_load(chunk, rebuild=False)
+        self.rebuild_indexes()
+        return self._throughput("📥 Imported", count, file_path, started)
+
+    async def export_ndjson_async(self, file_path: str, compression: Optional[str] = None,
+                                  chunk_size: int = 1000) -> Dict[str, Any]:
+        """Экспорт без блокировки event loop: JSON и сжатие в потоке"""
+        started = time.perf_counter()
+        # Снимок to_dict (и сборка из архива) - в loop порциями по chunk_size, где ордера
+        # изменяются; поток пишет готовые словари. Следующая порция снимается, пока
+        # пишется предыдущая: в памяти не больше двух порций
+        source = self._export_source()
+        f = await asyncio.to_thread(open_order_stream, file_path, 'w', compression)
+        count = 0
+        pending = None
+        try:
+            while True:
+                chunk = [order.to_dict() for order in itertools.islice(source, chunk_size)]
+                if pending is not None:
+                    await pending
+                    pending = None
+                if not chunk:
+                    break
+                pending = asyncio.ensure_future(asyncio.to_thread(self._write_ndjson_chunk, f, chunk))
+                count += len(chunk)
+        finally:
+            if pending is not None:
+                await asyncio.wait({pending})  # Поток еще пишет в f: закрываем после него
+            await asyncio.to_thread(f.close)
+        return self._throughput("📁 Exported", count, file_path, started)
+
+    async def import_ndjson_async(self, file_path: str, compression: Optional[str] = None,
+                                  chunk_size: int = 5000) -> Dict[str, Any]:
+        """Импорт без блокировки event loop: чтение и разбор файла в потоке"""
+        started = time.perf_counter()
+        chunks = await asyncio.to_thread(lambda: list(self.iter_ndjson_chunks(file_path, compression, chunk_size)))
+        # Загрузка и перестроение индексов - в loop без await между ними:
+        # никто не увидит ордера без индексов
+        count = 0
+        for chunk in chunks:
+            count += self.bulk_load(chunk, rebuild=False)
+        self.rebuild_indexes()
+        return self._throughput("📥 Imported", count, file_path, started)
+
     # 🔍 РАСШИРЕННЫЕ ПОИСКОВЫЕ МЕТОДЫ
 
     def search_orders(
@@ -428,65 +898,124 @@ class InMemoryOrdersRepository(OrdersRepository):
         date_to: datetime = None,
         limit: int = None
     ) -> List[Order]:
-        """🔍 Комплексный поиск ордеров по множественным критериям"""
+        """
+        🔍 Комплексный поиск ордеров по множественным критериям
+
+        Планировщик берет самый селективный индекс (exchange_id, сделка, символ,
+        статус, период), проверяет остальные индексы по принадлежности к
+        их множествам, а прочие условия применяет лениво. С limit - top-k через
+        heap; при обходе по времени - ранний выход после limit совпадений.
+        План последнего запроса - в last_query_plan.
+        """
         self.stats['total_queries'] += 1
+        started = time.perf_counter()
 
-        # Начинаем со всех ордеров
-        candidates = list(self._storage.values())
+        from_timestamp = int(date_from.timestamp() * 1000) if date_from else None
+        to_timestamp = int(date_to.timestamp() * 1000) if date_to else None
 
-        # Применяем фильтры
+        # Доступные индексы: (имя, размер, order_ids)
+        access_paths = []
+        if exchange_id:
+            order_id = self._exchange_id_index.get(exchange_id)
+            access_paths.append(('exchange_id', 1 if order_id is not None else 0,
+                                 (order_id,) if order_id is not None else ()))
+        if deal_id:
+            postings = self._deal_index.get(deal_id, {})
+            access_paths.append(('deal', len(postings), postings))
         if symbol:
-            candidates = [o for o in candidates if o.symbol == symbol]
+            postings = self._symbol_index.get(symbol, {})
+            access_paths.append(('symbol', len(postings), postings))
         if status:
-            candidates = [o for o in candidates if o.status == status]
-        if deal_id:
-            candidates = [o for o in candidates if o.deal_id == deal_id]
-        if exchange_id:
-            candidates = [o for o in candidates if o.exchange_id == exchange_id]
-        if side:
-            candidates = [o for o in candidates if o.side == side]
-        if order_type:
-            candidates = [o for o in candidates if o.order_type == order_type]
-        if min_amount:
-            candidates = [o for o in candidates if o.amount >= min_amount]
-        if max_amount:
-            candidates = [o for o in candidates if o.amount <= max_amount]
-
-        # Фильтр по дате
-        if date_from:
-            from_timestamp = int(date_from.timestamp() * 1000)
-            candidates = [o for o in candidates if o.created_at >= from_timestamp]
-        if date_to:
-            to_timestamp = int(date_to.timestamp() * 1000)
-            candidates = [o for o in candidates if o.created_at <= to_timestamp]
-
-        # Сортируем по времени создания (новые первые)
-        candidates.sort(key=lambda x: x.created_at, reverse=True)
+            postings = self._status_index.get(status, {})
+            access_paths.append(('status', len(postings), postings))
+        if from_timestamp is not None or to_timestamp is not None:
+            lo = bisect_left(self._time_index, (from_timestamp, float('-inf'))) if from_timestamp is not None else 0
+            hi = (bisect_right(self._time_index, (to_timestamp, float('inf')))
+                  if to_timestamp is not None else len(self._time_index))
+            # Обход от новых к старым - уже в порядке результата
+            access_paths.append(('time_range', max(hi - lo, 0),
+                                 (self._time_index[i][1] for i in range(hi - 1, lo - 1, -1))))
+
+        if access_paths:
+            index_name, candidates, driver = min(access_paths, key=lambda path: path[1])
+            others = [path[2] for path in access_paths if path[0] not in (index_name, 'time_range')]
+        else:
+            driver = self._storage if self.archive is None else itertools.chain(list(self._storage), self.archive.order_ids())
+            index_name, candidates, others = 'full_scan', len(self._storage) + len(self.archive or ()), []
+
+        plan = {
+            'index': index_name,
+            'candidates': candidates,
+            'intersected': [path[0] for path in access_paths if path[0] != index_name],
+            'examined': 0,
+            'returned': 0,
+            'early_exit': False
+        }
 
-        # Применяем лимит
-        if limit:
-            candidates = candidates[:limit]
+        def matches() -> Iterable[Order]:
+            for order_id in driver:
+                plan['examined'] += 1
+                if any(order_id not in postings for postings in others):
+                    continue
+                order = self._get(order_id)
+                if exchange_id and order.exchange_id != exchange_id:
+                    continue
+                if side and order.side != side:
+                    continue
+                if order_type and order.order_type != order_type:
+                    continue
+                if min_amount and order.amount < min_amount:
+                    continue
+                if max_amount and order.amount > max_amount:
+                    continue
+                if from_timestamp is not None and order.created_at < from_timestamp:
+                    continue
+                if to_timestamp is not None and order.created_at > to_timestamp:
+                    continue
+                yield order
 
-        return candidates
+        # Сортируем по времени создания (новые первые)
+        if index_name == 'time_range':
+            result = []
+            for order in matches():
+                result.append(order)
+                if limit and len(result) >= limit:
+                    plan['early_exit'] = plan['examined'] < candidates
+                    break
+        elif limit:
+            result = heapq.nlargest(limit, matches(), key=lambda x: x.created_at)
+        else:
+            result = sorted(matches(), key=lambda x: x.created_at, reverse=True)
+
+        plan['returned'] = len(result)
+        plan['elapsed_ms'] = (time.perf_counter() - started) * 1000
+        self.last_query_plan = plan
+        self.query_plan_stats[index_name] = self.query_plan_stats.get(index_name, 0) + 1
+        return result
 
     def get_orders_with_errors(self) -> List[Order]:
         """⚠️ Получить ордера с ошибками"""
-        orders_with_errors = []
-        for order in self._storage.values():
-            if order.error_message or order.status == Order.STATUS_FAILED:
-                orders_with_errors.append(order)
-        return orders_with_errors
-
-    def get_orders_requiring_sync(self) -> List[Order]:
-        """🔄 Получить ордера требующие синхронизации с биржей"""
-        sync_required = []
-        current_time = int(datetime.now().timestamp() * 1000)
-
-        for order in self._storage.values():
-            # Ордера открытые более 5 минут без обновлений
-            if (order.is_open() and
-                order.exchange_id and
-                current_time - order.last_update > 5 * 60 * 1000):
-                sync_required.append(order)
-
-        return sync_required
+        return [self._get(order_id) for order_id in self._error_index]
+
+    def get_orders_requiring_sync(self, max_age_ms: int = 5 * 60 * 1000) -> List[Order]:
+        """🔄 Получить ордера требующие синхронизации с биржей (открытые без обновлений дольше max_age_ms)"""
+        cutoff = now_ms() - max_age_ms
+        due: Dict[int, Order] = {}
+
+        # Извлекаем только просроченные записи кучи: O(k log n)
+        while self._sync_heap and self._sync_heap[0][0] < cutoff:
+            last_update, order_id = heapq.heappop(self._sync_heap)
+            order = self._storage.get(order_id)
+            if order is None or not order.is_open() or not order.exchange_id:
+                continue  # Закрыт или удален: запись устарела
+            if order.last_update != last_update:
+                # Ордер обновлен на месте без save: переставляем по новому сроку
+                heapq.heappush(self._sync_heap, (order.last_update, order_id))
+                continue
+            due[order_id] = order
+
+        # Найденные ордера остаются под наблюдением до следующего обновления
+        for order_id, order in due.items():
+            heapq.heappush(self._sync_heap, (order.last_update, order_id))
+
+        return list(due.values())
@@ -0,0 +1,421 @@
+# infrastructure/repositories/sqlite_repositories.py
+import json
+import logging
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from infrastructure.repositories.deals_repository import DealsRepository
+from infrastructure.repositories.orders_repository import OrdersRepository
+
+logger = logging.getLogger(__name__)
+
+# Колонки таблицы orders в порядке Order.to_dict()
+ORDER_COLUMNS = (
+    'order_id', 'side', 'order_type', 'price', 'amount', 'status', 'created_at', 'closed_at',
+    'deal_id', 'exchange_id', 'symbol', 'filled_amount', 'remaining_amount', 'average_price',
+    'fees', 'fee_currency', 'time_in_force', 'client_order_id', 'exchange_timestamp',
+    'last_update', 'error_message', 'retries', 'metadata'
+)
+
+ORDERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY,
+    side TEXT NOT NULL,
+    order_type TEXT NOT NULL,
+    price REAL,
+    amount REAL,
+    status TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    closed_at INTEGER,
+    deal_id INTEGER,
+    exchange_id TEXT,
+    symbol TEXT,
+    filled_amount REAL,
+    remaining_amount REAL,
+    average_price REAL,
+    fees REAL,
+    fee_currency TEXT,
+    time_in_force TEXT,
+    client_order_id TEXT,
+    exchange_timestamp INTEGER,
+    last_update INTEGER,
+    error_message TEXT,
+    retries INTEGER,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_exchange_id ON orders(exchange_id);
+CREATE INDEX IF NOT EXISTS idx_orders_deal_id ON orders(deal_id);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol ON orders(symbol);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at);
+"""
+
+DEALS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deals (
+    deal_id INTEGER PRIMARY KEY,
+    currency_pair_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    closed_at INTEGER,
+    buy_order_id INTEGER,
+    sell_order_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_deals_status ON deals(status);
+"""
+
+# Постоянные тексты запросов: sqlite3 кеширует подготовленные statements по тексту
+UPSERT_ORDER_SQL = (
+    f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) VALUES ({', '.join('?' * len(ORDER_COLUMNS))}) "
+    f"ON CONFLICT(order_id) DO UPDATE SET "
+    + ', '.join(f"{column} = excluded.{column}" for column in ORDER_COLUMNS[1:])
+)
+SELECT_ORDERS_SQL = f"SELECT {', '.join(ORDER_COLUMNS)} FROM orders"
+
+UPSERT_DEAL_SQL = (
+    "INSERT INTO deals (deal_id, currency_pair_id, status, created_at, closed_at, buy_order_id, sell_order_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(deal_id) DO UPDATE SET "
+    "currency_pair_id = excluded.currency_pair_id, status = excluded.status, "
+    "created_at = excluded.created_at, closed_at = excluded.closed_at, "
+    "buy_order_id = excluded.buy_order_id, sell_order_id = excluded.sell_order_id"
+)
+SELECT_DEALS_SQL = "SELECT deal_id, currency_pair_id, status, created_at, closed_at, buy_order_id, sell_order_id FROM deals"
+
+
+class SqliteDatabase:
+    """
+    🗄️ Общее соединение SQLite для репозиториев
+
+    WAL: читатели не блокируют запись, а запись - это дописывание в журнал.
+    synchronous=NORMAL в WAL-режиме не теряет целостность при падении процесса.
+    Коммит после каждой записи, либо один на пакет внутри batch().
+    """
+
+    def __init__(self, path: str = "trading.db", synchronous: str = "NORMAL"):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+        self.lock = threading.RLock()
+        self._batch_depth = 0
+
+        self.stats = {
+            'commits': 0,
+            'statements': 0
+        }
+
+    def executescript(self, script: str):
+        with self.lock:
+            self.connection.executescript(script)
+
+    def execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        with self.lock:
+            self.stats['statements'] += 1
+            cursor = self.connection.execute(sql, tuple(params))
+            self._commit_unless_batched()
+            return cursor
+
+    def executemany(self, sql: str, rows: Iterable[Iterable]) -> int:
+        with self.lock:
+            cursor = self.connection.executemany(sql, rows)
+            self.stats['statements'] += 1
+            self._commit_unless_batched()
+            return cursor.rowcount
+
+    def query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        with self.lock:
+            return self.connection.execute(sql, tuple(params)).fetchall()
+
+    @contextmanager
+    def batch(self):
+        """Одна транзакция на все записи внутри блока"""
+        with self.lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            except Exception:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.connection.rollback()
+                raise
+            self._batch_depth -= 1
+            self._commit_unless_batched()
+
+    def _commit_unless_batched(self):
+        if self._batch_depth == 0 and self.connection.in_transaction:
+            self.connection.commit()
+            self.stats['commits'] += 1
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class SqliteOrdersRepository(OrdersRepository):
+    """
+    🗄️ Ордера в SQLite (WAL, индексы под каждый метод запроса)
+
+    Загруженные ордера держатся в identity map (слабые ссылки): пока объект
+    используется сервисами, get_by_id возвращает тот же экземпляр, как и
+    InMemory-репозиторий, поэтому изменение на месте + save работают одинаково.
+    """
+
+    def __init__(self, database: SqliteDatabase):
+        self.db = database
+        self.db.executescript(ORDERS_SCHEMA)
+        self._identity: "weakref.WeakValueDictionary[int, Order]" = weakref.WeakValueDictionary()
+
+        self.stats = {
+            'total_saves': 0,
+            'total_queries': 0,
+            'batched_saves': 0
+        }
+
+    @classmethod
+    def from_path(cls, path: str) -> 'SqliteOrdersRepository':
+        return cls(SqliteDatabase(path))
+
+    # 💾 ЗАПИСЬ
+
+    @staticmethod
+    def _to_row(order: Order) -> tuple:
+        data = order.to_dict()
+        data['metadata'] = json.dumps(data['metadata'], default=str) if data['metadata'] else None
+        return tuple(data[column] for column in ORDER_COLUMNS)
+
+    def save(self, order: Order) -> None:
+        """Сохранить ордер (upsert)"""
+        self.db.execute(UPSERT_ORDER_SQL, self._to_row(order))
+        self._identity[order.order_id] = order
+        self.stats['total_saves'] += 1
+
+    def save_many(self, orders: Iterable[Order]) -> int:
+        """Пакетный upsert одной транзакцией"""
+        return self.save_rows(self.to_rows(orders))
+
+    def to_rows(self, orders: Iterable[Order]) -> List[tuple]:
+        """Снимок ордеров в строки таблицы - в потоке, который их изменяет (event loop)"""
+        rows = []
+        for order in orders:
+            rows.append(self._to_row(order))
+            self._identity[order.order_id] = order
+        return rows
+
+    def save_rows(self, rows: List[tuple]) -> int:
+        """Upsert готовых строк одной транзакцией; безопасно вызывать из потока записи"""
+        with self.db.batch():
+            self.db.executemany(UPSERT_ORDER_SQL, rows)
+        self.stats['total_saves'] += len(rows)
+        self.stats['batched_saves'] += len(rows)
+        return len(rows)
+
+    # 🔍 ЧТЕНИЕ
+
+    def _from_row(self, row: tuple) -> Order:
+        order_id = row[0]
+        order = self._identity.get(order_id)
+        if order is not None:
+            return order
+        data = dict(zip(ORDER_COLUMNS, row))
+        data['metadata'] = json.loads(data['metadata']) if data['metadata'] else {}
+        order = Order.from_dict(data)
+        self._identity[order_id] = order
+        return order
+
+    def _select(self, where: str = "", params: Iterable = ()) -> List[Order]:
+        self.stats['total_queries'] += 1
+        return [self._from_row(row) for row in self.db.query(f"{SELECT_ORDERS_SQL} {where}", params)]
+
+    def get_by_id(self, order_id: int) -> Optional[Order]:
+        orders = self._select("WHERE order_id = ?", (order_id,))
+        return orders[0] if orders else None
+
+    def get_by_exchange_id(self, exchange_id: str) -> Optional[Order]:
+        orders = self._select("WHERE exchange_id = ? LIMIT 1", (exchange_id,))
+        return orders[0] if orders else None
+
+    def get_all_by_deal(self, deal_id: int) -> List[Order]:
+        return self._select("WHERE deal_id = ? ORDER BY rowid", (deal_id,))
+
+    def get_all(self) -> List[Order]:
+        return self._select("ORDER BY rowid")
+
+    def get_open_orders(self) -> List[Order]:
+        return self._select("WHERE status IN (?, ?) ORDER BY rowid",
+                            (Order.STATUS_OPEN, Order.STATUS_PARTIALLY_FILLED))
+
+    def get_orders_by_symbol(self, symbol: str) -> List[Order]:
+        return self._select("WHERE symbol = ? ORDER BY rowid", (symbol,))
+
+    def get_orders_by_status(self, status: str) -> List[Order]:
+        return self._select("WHERE status = ? ORDER BY rowid", (status,))
+
+    def get_pending_orders(self) -> List[Order]:
+        return self.get_orders_by_status(Order.STATUS_PENDING)
+
+    def get_orders_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Order]:
+        start_timestamp = int(start_date.timestamp() * 1000)
+        end_timestamp = int(end_date.timestamp() * 1000)
+        return self._select("WHERE created_at BETWEEN ? AND ? ORDER BY created_at DESC",
+                            (start_timestamp, end_timestamp))
+
+    # 🔧 МАССОВЫЕ ОПЕРАЦИИ
+
+    def bulk_update_status(self, order_ids: List[int], status: str) -> int:
+        """Массовое обновление статуса одной транзакцией"""
+        updated_count = 0
+        now = int(datetime.now().timestamp() * 1000)
+        with self.db.batch():
+            for order in [o for o in map(self.get_by_id, order_ids) if o is not None]:
+                order.status = status
+                order.last_update = now
+                if order.is_closed() and not order.closed_at:
+                    order.closed_at = order.last_update
+                self.db.execute(UPSERT_ORDER_SQL, self._to_row(order))
+                updated_count += 1
+
+        logger.info(f"📊 Bulk updated {updated_count} orders to status {status}")
+        return updated_count
+
+    def delete_old_orders(self, older_than_days: int) -> int:
+        """Удаление закрытых ордеров старше N дней"""
+        cutoff_date = datetime.now() - timedelta(days=older_than_days)
+        cutoff_timestamp = int(cutoff_date.timestamp() * 1000)
+        closed = (Order.STATUS_CLOSED, Order.STATUS_FILLED, Order.STATUS_CANCELED)
+
+        with self.db.batch():
+            # Загруженные ордера могли измениться на месте без save: сначала
+            # записываем identity map, чтобы условие видело то же, что InMemory
+            loaded = list(self._identity.values())
+            if loaded:
+                self.db.executemany(UPSERT_ORDER_SQL, (self._to_row(order) for order in loaded))
+            rows = self.db.query(
+                "SELECT order_id FROM orders WHERE closed_at < ? "
+                "OR (closed_at IS NULL AND created_at < ? AND status IN (?, ?, ?))",
+                (cutoff_timestamp, cutoff_timestamp, *closed)
+            )
+            self.db.executemany("DELETE FROM orders WHERE order_id = ?", rows)
+        for (order_id,) in rows:
+            self._identity.pop(order_id, None)
+
+        logger.info(f"🗑️ Deleted {len(rows)} old orders (older than {older_than_days} days)")
+        return len(rows)
+
+    # 📊 СТАТИСТИКА
+
+    def count(self) -> int:
+        return self.db.query("SELECT COUNT(*) FROM orders")[0][0]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Получение статистики репозитория"""
+        total_orders = self.count()
+        return {
+            'total_orders': total_orders,
+            'status_distribution': dict(self.db.query("SELECT status, COUNT(*) FROM orders GROUP BY status")),
+            'symbol_distribution': dict(self.db.query(
+                "SELECT symbol, COUNT(*) FROM orders WHERE symbol IS NOT NULL GROUP BY symbol")),
+            'total_deals': self.db.query("SELECT COUNT(DISTINCT deal_id) FROM orders WHERE deal_id IS NOT NULL")[0][0],
+            'orders_with_exchange_id': self.db.query(
+                "SELECT COUNT(*) FROM orders WHERE exchange_id IS NOT NULL")[0][0],
+            'loaded_orders': len(self._identity),
+            'performance_stats': {**self.stats, **self.db.stats}
+        }
+
+
+class SqliteDealsRepository(DealsRepository):
+    """
+    🗄️ Сделки в SQLite
+
+    Хранятся id ордеров сделки; при чтении ордера подставляются из
+    orders_repo (тот же identity map, что и у сервисов).
+    """
+
+    def __init__(self, database: SqliteDatabase, orders_repo: Optional[OrdersRepository] = None):
+        self.db = database
+        self.orders_repo = orders_repo
+        self.db.executescript(DEALS_SCHEMA)
+        self._identity: "weakref.WeakValueDictionary[int, Deal]" = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def _to_row(deal: Deal) -> tuple:
+        return (
+            deal.deal_id, deal.currency_pair_id, deal.status, deal.created_at, deal.closed_at,
+            deal.buy_order.order_id if deal.buy_order else None,
+            deal.sell_order.order_id if deal.sell_order else None
+        )
+
+    def save(self, deal: Deal) -> None:
+        self.db.execute(UPSERT_DEAL_SQL, self._to_row(deal))
+        self._identity[deal.deal_id] = deal
+
+    def save_many(self, deals: Iterable[Deal]) -> int:
+        return self.save_rows(self.to_rows(deals))
+
+    def to_rows(self, deals: Iterable[Deal]) -> List[tuple]:
+        rows = []
+        for deal in deals:
+            rows.append(self._to_row(deal))
+            self._identity[deal.deal_id] = deal
+        return rows
+
+    def save_rows(self, rows: List[tuple]) -> int:
+        with self.db.batch():
+            self.db.executemany(UPSERT_DEAL_SQL, rows)
+        return len(rows)
+
+    def _from_row(self, row: tuple) -> Deal:
+        deal_id, currency_pair_id, status, created_at, closed_at, buy_order_id, sell_order_id = row
+        deal = self._identity.get(deal_id)
+        if deal is not None:
+            return deal
+
+        def load_order(order_id):
+            if order_id is None or self.orders_repo is None:
+                return None
+            return self.orders_repo.get_by_id(order_id)
+
+        deal = Deal(
+            deal_id=deal_id,
+            currency_pair_id=currency_pair_id,
+            status=status,
+            buy_order=load_order(buy_order_id),
+            sell_order=load_order(sell_order_id),
+            created_at=created_at,
+            closed_at=closed_at
+        )
+        self._identity[deal_id] = deal
+        return deal
+
+    def _select(self, where: str = "", params: Iterable = ()) -> List[Deal]:
+        return [self._from_row(row) for row in self.db.query(f"{SELECT_DEALS_SQL} {where}", params)]
+
+    def get_by_id(self, deal_id: int) -> Optional[Deal]:
+        deals = self._select("WHERE deal_id = ?", (deal_id,))
+        return deals[0] if deals else None
+
+    def get_open_deals(self) -> List[Deal]:
+        return self._select("WHERE status = ? ORDER BY rowid", (Deal.STATUS_OPEN,))
+
+    def get_all(self) -> List[Deal]:
+        return self._select("ORDER BY rowid")
+
+
+def create_sqlite_repositories(path: str, synchronous: str = "NORMAL"):
+    """Репозитории ордеров и сделок поверх одной базы"""
+    started = time.perf_counter()
+    database = SqliteDatabase(path, synchronous=synchronous)
+    orders_repo = SqliteOrdersRepository(database)
+    deals_repo = SqliteDealsRepository(database, orders_repo)
+    logger.info(f"🗄️ SQLite {path} открыта за {(time.perf_counter() - started) * 1000:.1f}ms")
+    return orders_repo, deals_repo
@@ -0,0 +1,319 @@
+# infrastructure/repositories/write_behind.py
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from infrastructure.repositories.deals_repository import DealsRepository, InMemoryDealsRepository
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository, OrdersRepository
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    ⏳ Отложенная запись в долговременный репозиторий
+
+    save() на торговом пути только кладет сущность в словарь ожидающих
+    (повторные save одного id схлопываются в одну запись). Фоновая задача
+    раз в max_latency_ms сбрасывает накопленное пакетами. Сущности
+    сериализуются в строки (to_rows) на event loop, где они изменяются;
+    в отдельный поток уходит только запись готовых строк (save_rows),
+    поэтому поток не читает живые объекты. Репозиторий без to_rows
+    пишется через save_many/save в вызывающем потоке.
+    Очередь ограничена: при max_pending сброс выполняется сразу.
+    """
+
+    def __init__(self, max_latency_ms: float = 100, max_pending: int = 10000, batch_size: int = 500):
+        self.max_latency_ms = max_latency_ms
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        # (id репозитория, id сущности) -> (репозиторий, сущность)
+        self._pending: Dict[Tuple[int, Any], Tuple[Any, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task = None
+        self.is_running = False
+
+        self.stats = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'flushed': 0,
+            'flushes': 0,
+            'backpressure_flushes': 0,
+            'errors': 0,
+            'max_flush_ms': 0.0,
+            'oldest_pending_ms': 0.0
+        }
+        self._oldest_pending_at: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'WriteBehindQueue':
+        """Создание из секции persistence конфигурации"""
+        config = config or {}
+        return cls(
+            max_latency_ms=config.get("write_behind_max_latency_ms", 100),
+            max_pending=config.get("write_behind_max_pending", 10000),
+            batch_size=config.get("write_behind_batch_size", 500),
+        )
+
+    # ✍️ ПОСТАНОВКА В ОЧЕРЕДЬ
+
+    def enqueue(self, backend, entity_id: Any, entity: Any):
+        with self._pending_lock:
+            key = (id(backend), entity_id)
+            if key in self._pending:
+                self.stats['coalesced'] += 1
+            elif not self._pending:
+                self._oldest_pending_at = time.perf_counter()
+            self._pending[key] = (backend, entity)
+            self.stats['enqueued'] += 1
+            full = len(self._pending) >= self.max_pending
+
+        if full:
+            self.stats['backpressure_flushes'] += 1
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # 💾 СБРОС
+
+    def flush(self) -> int:
+        """Синхронно записывает все ожидающие сущности; возвращает их число"""
+        with self._flush_lock:
+            return self._write(self._take_batch())
+
+    async def flush_async(self) -> int:
+        """Строки собираются на event loop, в потоке выполняется только запись"""
+        # Блокировку снимает поток записи: синхронный flush() не обгонит
+        # уже собранный пакет и не перезапишет новые строки старыми
+        self._flush_lock.acquire()
+        try:
+            prepared = self._take_batch()
+        except BaseException:
+            self._flush_lock.release()
+            raise
+        if not prepared:
+            self._flush_lock.release()
+            return 0
+        return await asyncio.shield(asyncio.to_thread(self._write_and_release, prepared))
+
+    def _write_and_release(self, prepared: List[Tuple[Any, List[Any], Optional[List[Any]]]]) -> int:
+        try:
+            return self._write(prepared)
+        finally:
+            self._flush_lock.release()
+
+    def _take_batch(self) -> List[Tuple[Any, List[Any], Optional[List[Any]]]]:
+        """Забирает ожидающие сущности и сериализует их в строки в вызывающем потоке"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+            oldest = self._oldest_pending_at
+            self._oldest_pending_at = None
+        if not batch:
+            return []
+
+        if oldest is not None:
+            waited_ms = (time.perf_counter() - oldest) * 1000
+            self.stats['oldest_pending_ms'] = max(self.stats['oldest_pending_ms'], waited_ms)
+
+        by_backend: Dict[int, Tuple[Any, List[Any]]] = {}
+        for (backend_id, _), (backend, entity) in batch.items():
+            by_backend.setdefault(backend_id, (backend, []))[1].append(entity)
+
+        prepared = []
+        for backend, entities in by_backend.values():
+            for i in range(0, len(entities), self.batch_size):
+                chunk = entities[i:i + self.batch_size]
+                try:
+                    rows = backend.to_rows(chunk) if hasattr(backend, 'to_rows') else None
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"❌ Ошибка сериализации для отложенной записи ({len(chunk)} шт.): {e}")
+                    self._requeue(backend, chunk)
+                    continue
+                prepared.append((backend, chunk, rows))
+        return prepared
+
+    def _write(self, prepared: List[Tuple[Any, List[Any], Optional[List[Any]]]]) -> int:
+        """Пишет собранные пакеты; неудачные возвращаются в очередь"""
+        if not prepared:
+            return 0
+
+        started = time.perf_counter()
+        written = 0
+        for backend, chunk, rows in prepared:
+            try:
+                if rows is not None:
+                    backend.save_rows(rows)
+                elif hasattr(backend, 'save_many'):
+                    backend.save_many(chunk)
+                else:
+                    for entity in chunk:
+                        backend.save(entity)
+                written += len(chunk)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Ошибка отложенной записи ({len(chunk)} шт.): {e}")
+                self._requeue(backend, chunk)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats['flushed'] += written
+        self.stats['flushes'] += 1
+        self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed_ms)
+        return written
+
+    def _requeue(self, backend, entities: List[Any]):
+        """Возвращает несохраненное в очередь, если за это время не пришла новая версия"""
+        with self._pending_lock:
+            for entity in entities:
+                key = (id(backend), _entity_id(entity))
+                self._pending.setdefault(key, (backend, entity))
+            if self._pending and self._oldest_pending_at is None:
+                self._oldest_pending_at = time.perf_counter()
+
+    # 🔄 ЖИЗНЕННЫЙ ЦИКЛ
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.max_latency_ms / 1000)
+            if self._pending:
+                await self.flush_async()
+
+    async def stop(self):
+        """Останавливает фоновый сброс и синхронно дописывает остаток"""
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        flushed = self.flush()
+        logger.info(f"💾 Отложенная запись: при остановке сброшено {flushed}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """📊 Статистика очереди"""
+        return {**self.stats, 'pending': self.pending}
+
+
+def _entity_id(entity: Any) -> Any:
+    return entity.order_id if isinstance(entity, Order) else entity.deal_id
+
+
+class WriteBehindOrdersRepository(OrdersRepository):
+    """
+    ⏳ Ордера: чтение из памяти, запись в backend через WriteBehindQueue
+    """
+
+    def __init__(self, backend: OrdersRepository, queue: WriteBehindQueue,
+                 memory: Optional[InMemoryOrdersRepository] = None):
+        self.backend = backend
+        self.queue = queue
+        self.memory = memory or InMemoryOrdersRepository(max_orders=50000)
+
+    def load(self) -> int:
+        """Загружает сохраненные ордера в память (без постановки в очередь)"""
+        orders = self.backend.get_all()
+        for order in orders:
+            self.memory.save(order)
+        return len(orders)
+
+    def save(self, order: Order) -> None:
+        self.memory.save(order)
+        self.queue.enqueue(self.backend, order.order_id, order)
+
+    def get_by_id(self, order_id: int) -> Optional[Order]:
+        return self.memory.get_by_id(order_id)
+
+    def get_by_exchange_id(self, exchange_id: str) -> Optional[Order]:
+        return self.memory.get_by_exchange_id(exchange_id)
+
+    def get_all_by_deal(self, deal_id: int) -> List[Order]:
+        return self.memory.get_all_by_deal(deal_id)
+
+    def get_all(self) -> List[Order]:
+        return self.memory.get_all()
+
+    def get_open_orders(self) -> List[Order]:
+        return self.memory.get_open_orders()
+
+    def get_orders_by_symbol(self, symbol: str) -> List[Order]:
+        return self.memory.get_orders_by_symbol(symbol)
+
+    def get_orders_by_status(self, status: str) -> List[Order]:
+        return self.memory.get_orders_by_status(status)
+
+    def get_pending_orders(self) -> List[Order]:
+        return self.memory.get_pending_orders()
+
+    def get_orders_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Order]:
+        return self.memory.get_orders_by_date_range(start_date, end_date)
+
+    def bulk_update_status(self, order_ids: List[int], status: str) -> int:
+        updated = self.memory.bulk_update_status(order_ids, status)
+        for order_id in order_ids:
+            order = self.memory.get_by_id(order_id)
+            if order is not None:
+                self.queue.enqueue(self.backend, order_id, order)
+        return updated
+
+    def delete_old_orders(self, older_than_days: int) -> int:
+        # Обслуживание, не торговый путь: сначала дописываем очередь
+        self.queue.flush()
+        self.backend.delete_old_orders(older_than_days)
+        return self.memory.delete_old_orders(older_than_days)
+
+    def search_orders(self, **criteria) -> List[Order]:
+        return self.memory.search_orders(**criteria)
+
+    def count(self) -> int:
+        return self.memory.count()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {**self.memory.get_statistics(), 'write_behind': self.queue.get_statistics()}
+
+
+class WriteBehindDealsRepository(DealsRepository):
+    """
+    ⏳ Сделки: чтение из памяти, запись в backend через WriteBehindQueue
+    """
+
+    def __init__(self, backend: DealsRepository, queue: WriteBehindQueue,
+                 memory: Optional[InMemoryDealsRepository] = None):
+        self.backend = backend
+        self.queue = queue
+        self.memory = memory or InMemoryDealsRepository()
+
+    def load(self) -> int:
+        deals = self.backend.get_all()
+        for deal in deals:
+            self.memory.save(deal)
+        return len(deals)
+
+    def save(self, deal: Deal) -> None:
+        self.memory.save(deal)
+        self.queue.enqueue(self.backend, deal.deal_id, deal)
+
+    def get_by_id(self, deal_id: int) -> Optional[Deal]:
+        return self.memory.get_by_id(deal_id)
+
+    def get_open_deals(self) -> List[Deal]:
+        return self.memory.get_open_deals()
+
+    def get_all(self) -> List[Deal]:
+        return self.memory.get_all()
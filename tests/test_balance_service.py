@@ -0,0 +1,121 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.clock import now_ms
+from domain.services.trading.balance_service import BalanceService
+from domain.services.orders.order_service import OrderService
+from domain.factories.order_factory import OrderFactory
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+
+def make_connector(usdt=100.0):
+    connector = MagicMock()
+    connector.fetch_balance = AsyncMock(return_value={'USDT': {'free': usdt, 'used': 0.0, 'total': usdt}})
+    return connector
+
+
+@pytest.mark.asyncio
+async def test_checks_are_in_memory_after_first_sync():
+    connector = make_connector()
+    service = BalanceService(connector, reconcile_interval_seconds=0)
+
+    assert await service.check_sufficient_balance('ETHUSDT', 'buy', 0.02, 2000) == (True, 'USDT', 100.0)
+    assert await service.check_sufficient_balance('ETH/USDT', 'sell', 1.0) == (False, 'ETH', 0.0)
+    assert await service.get_available_balance('USDT') == 100.0
+    assert connector.fetch_balance.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_reservations_prevent_double_spend_until_exchange_update():
+    service = BalanceService(make_connector(), reconcile_interval_seconds=0)
+    await service.reconcile()
+
+    first, _, _ = await service.reserve_for_order('ETHUSDT', 'buy', 0.03, 2000)   # 60 USDT
+    second, _, available = await service.reserve_for_order('ETHUSDT', 'buy', 0.03, 2000)
+    assert first is not None and second is None
+    assert available == pytest.approx(40.0)
+
+    service.release(first, placed=True)
+    assert service.get_free('USDT') == pytest.approx(40.0)
+
+    # Поток баланса прислал блокировку ордера - локальный резерв снимается
+    service.apply_balance_update({'USDT': {'free': 40.0, 'used': 60.0, 'total': 100.0}, 'timestamp': now_ms() + 1})
+    assert service.get_free('USDT') == pytest.approx(40.0)
+    assert service.get_statistics()['active_reservations'] == 0
+
+
+@pytest.mark.asyncio
+async def test_order_service_releases_reservation_on_failure():
+    connector = make_connector()
+    connector.create_order = AsyncMock(side_effect=Exception("rejected"))
+    balance = BalanceService(connector, reconcile_interval_seconds=0)
+    await balance.reconcile()
+
+    service = OrderService(InMemoryOrdersRepository(), OrderFactory(), connector, balance_service=balance)
+    service.retry_delay = 0
+    results = await asyncio.gather(*[
+        service.create_and_place_buy_order('ETHUSDT', 0.01, 2000.0, deal_id=1) for _ in range(3)
+    ])
+
+    assert not any(r.success for r in results)
+    assert balance.reservations == {}
+    assert balance.get_free('USDT') == 100.0
+
+
+@pytest.mark.asyncio
+async def test_placed_reservation_survives_older_or_unrelated_snapshots():
+    connector = make_connector()
+    service = BalanceService(connector, reconcile_interval_seconds=0)
+    await service.reconcile()
+
+    reservation, _, _ = await service.reserve_for_order('ETHUSDT', 'buy', 0.03, 2000)   # 60 USDT
+    service.release(reservation, placed=True)
+    submitted_at = service.reservations[reservation]['submitted_at']
+
+    # Частичное обновление другой валюты
+    service.apply_balance_update({'ETH': {'free': 1.0, 'used': 0.0, 'total': 1.0}, 'timestamp': submitted_at + 10})
+    # Обновление без метки времени и снимок, сделанный до размещения
+    service.apply_balance_update({'USDT': {'free': 100.0, 'used': 0.0, 'total': 100.0}})
+    service.apply_balance_update({'USDT': {'free': 100.0, 'used': 0.0, 'total': 100.0}, 'timestamp': submitted_at - 1})
+    assert service.get_free('USDT') == pytest.approx(40.0)
+
+    # REST-сверка, запрос которой ушел до отправки ордера, резерв не снимает
+    async def slow_fetch():
+        await asyncio.sleep(0.01)
+        return {'USDT': {'free': 100.0, 'used': 0.0, 'total': 100.0}}
+    connector.fetch_balance = AsyncMock(side_effect=slow_fetch)
+    reconcile = asyncio.ensure_future(service.reconcile())
+    await asyncio.sleep(0.002)
+    second, _, _ = await service.reserve_for_order('ETHUSDT', 'buy', 0.01, 2000)   # 20 USDT
+    service.release(second, placed=True)
+    await reconcile
+    assert second in service.reservations
+
+    # Следующая сверка уже учитывает оба ордера
+    await asyncio.sleep(0.002)
+    connector.fetch_balance = AsyncMock(return_value={'USDT': {'free': 20.0, 'used': 80.0, 'total': 100.0}})
+    await service.reconcile()
+    assert service.reservations == {} and service.get_free('USDT') == pytest.approx(20.0)
+
+
+@pytest.mark.asyncio
+async def test_lock_event_before_release_is_not_subtracted_twice():
+    service = BalanceService(make_connector(), reconcile_interval_seconds=0)
+    await service.reconcile()
+
+    reservation, _, _ = await service.reserve_for_order('ETHUSDT', 'buy', 0.03, 2000)   # 60 USDT
+    submitted_at = service.reservations[reservation]['submitted_at']
+
+    # watch_balance показал блокировку раньше, чем create_order вернул ответ
+    service.apply_balance_update({'USDT': {'free': 40.0, 'used': 60.0, 'total': 100.0},
+                                  'timestamp': submitted_at + 5})
+    service.release(reservation, placed=True)
+
+    assert service.reservations == {}
+    assert service.get_free('USDT') == pytest.approx(40.0)
+    assert (await service.reserve_for_order('ETHUSDT', 'buy', 0.01, 2000))[0] is not None   # 20 из 40 USDT
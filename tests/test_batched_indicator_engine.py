@@ -0,0 +1,87 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.services.indicators.batched_indicator_engine import BatchedIndicatorEngine
+from domain.services.indicators.cached_indicator_service import CachedIndicatorService
+from domain.services.market_data.ticker_service import TickerService
+from infrastructure.repositories.tickers_repository import InMemoryTickerRepository
+
+
+def make_prices(seed, length):
+    rng = np.random.default_rng(seed)
+    return list(100 + np.cumsum(rng.normal(0, 0.5, length)))
+
+
+@pytest.mark.parametrize("length", [60, 130])
+def test_batched_results_match_talib(length):
+    engine = BatchedIndicatorEngine(window=100, initial_capacity=2)
+    histories = {f"PAIR{i}/USDT": make_prices(i, length) for i in range(5)}
+    services = {}
+    for symbol, prices in histories.items():
+        services[symbol] = CachedIndicatorService()
+        engine.register(symbol, services[symbol])
+        for price in prices:
+            engine.push(symbol, price)
+
+    medium = engine.compute_medium()
+    heavy = engine.compute_heavy()
+
+    for symbol, prices in histories.items():
+        reference = CachedIndicatorService()
+        expected_medium = reference.update_medium_indicators(prices)
+        expected_heavy = reference.update_heavy_indicators(prices)
+
+        assert medium[symbol] == pytest.approx(expected_medium, abs=1e-6)
+        assert heavy[symbol] == pytest.approx(expected_heavy, abs=1e-6)
+        assert services[symbol].medium_cache == medium[symbol]
+        assert services[symbol].heavy_cache == heavy[symbol]
+
+    assert engine.get_statistics()['symbols'] == 5
+
+
+@pytest.mark.asyncio
+async def test_ticker_service_uses_shared_engine():
+    engine = BatchedIndicatorEngine()
+    services = [TickerService(InMemoryTickerRepository(), batched_engine=engine, symbol=s)
+                for s in ("AAA/USDT", "BBB/USDT")]
+
+    for i, price in enumerate(make_prices(7, 60)):
+        for service in services:
+            await service.process_ticker({'symbol': service.symbol, 'close': price + i % 3, 'timestamp': i})
+
+    for service in services:
+        assert service.cached_indicators.medium_cache
+        assert service.cached_indicators.heavy_cache
+        assert service.repository.tickers[-1].signals['bb_middle'] > 0
+    assert engine.stats['heavy_batches'] >= 1
+
+    with pytest.raises(ValueError):
+        TickerService(InMemoryTickerRepository(), batched_engine=engine)
+
+
+@pytest.mark.asyncio
+async def test_refresh_due_runs_through_compute_executor():
+    from application.utils.compute_executor import ComputeExecutor
+
+    executor = ComputeExecutor(mode=ComputeExecutor.MODE_THREAD)
+    offloaded_engine, inline_engine = BatchedIndicatorEngine(), BatchedIndicatorEngine()
+    offloaded = TickerService(InMemoryTickerRepository(), compute_executor=executor,
+                              batched_engine=offloaded_engine, symbol="AAA/USDT")
+    inline = TickerService(InMemoryTickerRepository(), batched_engine=inline_engine, symbol="AAA/USDT")
+    try:
+        for i, price in enumerate(make_prices(11, 60)):
+            for service in (offloaded, inline):
+                await service.process_ticker({'symbol': service.symbol, 'close': price, 'timestamp': i})
+    finally:
+        executor.shutdown()
+
+    assert offloaded.cached_indicators.medium_cache == inline.cached_indicators.medium_cache
+    assert offloaded.cached_indicators.heavy_cache == inline.cached_indicators.heavy_cache
+    tasks = executor.get_statistics()['tasks']
+    assert tasks['batched_medium_indicators']['count'] >= 1
+    assert tasks['batched_heavy_indicators']['count'] >= 1
+    assert offloaded_engine.stats['heavy_batches'] == inline_engine.stats['heavy_batches']
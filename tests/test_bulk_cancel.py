@@ -0,0 +1,85 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.order import Order
+from domain.services.orders.order_service import OrderService
+from domain.factories.order_factory import OrderFactory
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+
+def make_orders(repo, count, symbol="ETHUSDT", start=1):
+    orders = []
+    for i in range(start, start + count):
+        order = Order(order_id=i, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT, price=100.0,
+                      amount=1.0, status=Order.STATUS_OPEN, exchange_id=f"ex-{i}", symbol=symbol)
+        repo.save(order)
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_by_symbol_single_request():
+    repo = InMemoryOrdersRepository()
+    make_orders(repo, 5)
+    connector = MagicMock()
+    connector.supports_bulk_cancel.return_value = True
+    connector.cancel_all_orders_by_symbol = AsyncMock(return_value=[{'id': f"ex-{i}"} for i in range(1, 6)])
+    connector.cancel_order = AsyncMock()
+    service = OrderService(repo, OrderFactory(), connector)
+
+    assert await service.emergency_cancel_all_orders() == 5
+    connector.cancel_all_orders_by_symbol.assert_awaited_once_with("ETHUSDT")
+    connector.cancel_order.assert_not_called()
+    assert all(order.status == Order.STATUS_CANCELED and order.closed_at for order in repo.get_all())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cancels_with_deadline_and_per_order_results():
+    repo = InMemoryOrdersRepository()
+    orders = make_orders(repo, 4)
+
+    async def cancel_order(exchange_id, symbol):
+        if exchange_id == "ex-3":
+            raise Exception("unknown order")
+        if exchange_id == "ex-4":
+            await asyncio.sleep(5)
+        await asyncio.sleep(0.01)
+        return {'id': exchange_id}
+
+    connector = MagicMock()
+    connector.supports_bulk_cancel.return_value = False
+    connector.cancel_order = cancel_order
+    service = OrderService(repo, OrderFactory(), connector)
+
+    report = await service.cancel_orders_bulk(orders, deadline_seconds=0.2)
+
+    assert report['cancelled'] == 2
+    assert report['results'][3].startswith("error")
+    assert report['results'][4] == "timeout"
+    assert report['duration_ms'] < 1000
+    assert repo.get_by_id(4).status == Order.STATUS_OPEN
+    assert repo.get_by_id(1).status == Order.STATUS_CANCELED
+
+
+@pytest.mark.asyncio
+async def test_partial_order_list_is_cancelled_per_order():
+    repo = InMemoryOrdersRepository()
+    orders = make_orders(repo, 3)
+    connector = MagicMock()
+    connector.supports_bulk_cancel.return_value = True
+    connector.cancel_all_orders_by_symbol = AsyncMock()
+    connector.cancel_order = AsyncMock(side_effect=lambda exchange_id, symbol: {'id': exchange_id})
+    service = OrderService(repo, OrderFactory(), connector)
+
+    report = await service.cancel_orders_bulk(orders[:2])
+
+    # Bulk cancel снял бы и третий ордер символа
+    connector.cancel_all_orders_by_symbol.assert_not_called()
+    assert connector.cancel_order.await_count == 2
+    assert report['cancelled'] == 2
+    assert repo.get_by_id(3).status == Order.STATUS_OPEN
@@ -0,0 +1,127 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.order import Order
+from infrastructure.repositories.closed_orders_archive import ClosedOrdersArchive
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+
+def make_order(order_id, status=Order.STATUS_FILLED, created_at=None):
+    order = Order(
+        order_id=order_id,
+        side=Order.SIDE_SELL,
+        order_type=Order.TYPE_LIMIT,
+        price=2000.5,
+        amount=0.25,
+        status=status,
+        symbol="ETHUSDT",
+        deal_id=order_id // 2 + 1,
+        exchange_id=str(9000000000 + order_id),
+        filled_amount=0.25,
+        remaining_amount=0.0,
+        created_at=created_at,
+        metadata={'strategy': 'grid'}
+    )
+    if order.is_closed():
+        order.closed_at = order.created_at + 1000
+    return order
+
+
+def test_archive_roundtrip_is_exact():
+    archive = ClosedOrdersArchive()
+    order = make_order(1)
+    order.exchange_id = "abc-1"
+    order.error_message = "Canceled: timeout"
+    archive.add(order)
+    archive.add(make_order(2))
+
+    restored = archive.get(1)
+    assert restored is not order
+    assert restored.to_dict() == order.to_dict()
+    assert archive.get(2).exchange_id == "9000000002"
+    assert archive.index_keys(2) == ("9000000002", "ETHUSDT", 2, Order.STATUS_FILLED, archive.get(2).created_at)
+
+
+def test_archive_compacts_removed_rows():
+    archive = ClosedOrdersArchive()
+    for i in range(3000):
+        archive.add(make_order(i + 1))
+    for i in range(2000):
+        archive.remove(i + 1)
+    assert archive.stats['compactions'] == 1
+    assert len(archive) == 1000
+    assert archive.get(2500).order_id == 2500
+
+
+def test_repository_queries_span_live_and_archived_orders():
+    base = datetime(2024, 1, 1)
+    repo = InMemoryOrdersRepository(archive=ClosedOrdersArchive(), archive_after_ms=0)
+    for i in range(10):
+        created_at = int((base + timedelta(minutes=i)).timestamp() * 1000)
+        repo.save(make_order(i + 1, status=Order.STATUS_FILLED if i < 8 else Order.STATUS_OPEN,
+                             created_at=created_at))
+
+    assert repo.archive_closed_orders() == 8
+    stats = repo.get_statistics()
+    assert stats['total_orders'] == 10 and stats['live_orders'] == 2
+
+    assert repo.get_by_id(3).to_dict() == make_order(3, created_at=repo.get_by_id(3).created_at).to_dict()
+    assert repo.get_by_exchange_id("9000000004").order_id == 4
+    assert len(repo.get_orders_by_status(Order.STATUS_FILLED)) == 8
+    assert [o.order_id for o in repo.get_all_by_deal(2)] == [2, 3]
+    found = repo.get_orders_by_date_range(base + timedelta(minutes=6), base + timedelta(minutes=9))
+    assert [o.order_id for o in found] == [10, 9, 8, 7]
+    assert [o.order_id for o in repo.search_orders(side=Order.SIDE_SELL, limit=3)] == [10, 9, 8]
+
+    # Изменение архивного ордера возвращает его в живые объекты
+    order = repo.get_by_id(5)
+    order.status = Order.STATUS_CANCELED
+    repo.save(order)
+    assert repo.get_by_id(5) is order
+    assert len(repo.get_orders_by_status(Order.STATUS_FILLED)) == 7
+
+    repo.bulk_update_status([6], Order.STATUS_CLOSED)
+    assert repo.get_orders_by_status(Order.STATUS_CLOSED)[0].order_id == 6
+
+    # Удаление старых проверяет колонки архива
+    assert repo.delete_old_orders(0) == 8
+    assert [o.order_id for o in repo.get_all()] == [9, 10]
+    repo.rebuild_indexes()
+    assert repo.get_orders_by_symbol("ETHUSDT") == repo.get_all()
+
+
+def test_finished_deals_hold_order_ids_so_archive_frees_objects():
+    import gc
+    import weakref
+    from unittest.mock import MagicMock
+    from domain.entities.deal import Deal
+    from domain.services.orders.order_service import OrderService
+    from infrastructure.repositories.deals_repository import InMemoryDealsRepository
+
+    repo = InMemoryOrdersRepository(archive=ClosedOrdersArchive(), archive_after_ms=0)
+    deals_repo = InMemoryDealsRepository(orders_repo=repo)
+    buy, sell = make_order(2, created_at=1_700_000_000_000), make_order(3, created_at=1_700_000_000_000)
+    deal = Deal(deal_id=2, currency_pair_id="ETHUSDT", buy_order=buy, sell_order=sell)
+    repo.save(buy)
+    repo.save(sell)
+    deal.close()
+    deals_repo.save(deal)
+    assert repo.archive_closed_orders() == 2
+
+    buy_ref = weakref.ref(buy)
+    del buy, sell, deal
+    gc.collect()
+    assert buy_ref() is None  # Ни сделка, ни репозиторий не держат объект
+
+    restored = deals_repo.get_by_id(2)
+    assert restored.is_closed() and restored.buy_order.order_id == 2 and restored.sell_order.order_id == 3
+    assert deals_repo.get_open_deals() == [] and len(deals_repo.get_all()) == 1
+
+    # Статистика считает по индексам, без сборки архивных ордеров
+    service = OrderService(repo, MagicMock(), exchange_connector=MagicMock())
+    rehydrated = repo.archive.stats['rehydrated']
+    assert service.get_statistics()['total_orders'] == 2
+    assert repo.archive.stats['rehydrated'] == rehydrated
@@ -0,0 +1,75 @@
+import sys
+import os
+import asyncio
+import threading
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from application.utils.compute_executor import ComputeExecutor, EventLoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_runs_off_loop_and_records_timing():
+    executor = ComputeExecutor(mode=ComputeExecutor.MODE_THREAD, max_workers=1)
+    loop_thread = threading.get_ident()
+
+    thread_id = await executor.run(threading.get_ident, task_name="whoami")
+    future = executor.submit(sum, [1, 2, 3], task_name="sum")
+
+    assert thread_id != loop_thread
+    assert await future == 6
+
+    stats = executor.get_statistics()
+    assert stats['tasks']['whoami']['count'] == 1
+    assert stats['tasks']['sum']['avg_run_ms'] >= 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_inline_mode_and_errors():
+    executor = ComputeExecutor(mode=ComputeExecutor.MODE_INLINE)
+    assert await executor.run(threading.get_ident) == threading.get_ident()
+
+    with pytest.raises(ZeroDivisionError):
+        await executor.run(lambda: 1 / 0, task_name="broken")
+    assert executor.get_statistics()['tasks']['broken']['errors'] == 1
+
+    with pytest.raises(ValueError):
+        ComputeExecutor(mode="gpu")
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_collects_samples():
+    monitor = EventLoopLagMonitor(interval_ms=5)
+    await monitor.start_monitoring()
+    await asyncio.sleep(0.05)
+    await monitor.stop_monitoring()
+
+    stats = monitor.get_statistics()
+    assert stats['samples'] > 0
+    assert stats['max_lag_ms'] >= stats['p99_lag_ms'] >= 0
+
+
+@pytest.mark.asyncio
+async def test_orders_json_export_is_serialized_in_executor(tmp_path):
+    import json
+    from domain.entities.order import Order
+    from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+    repo = InMemoryOrdersRepository()
+    order = Order(order_id=1, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT, price=100.0, amount=1.0,
+                  status=Order.STATUS_OPEN, symbol="BTCUSDT")
+    repo.save(order)
+    executor = ComputeExecutor(mode=ComputeExecutor.MODE_THREAD, max_workers=1)
+
+    export = repo.export_to_json_async(str(tmp_path / "orders.json"), executor)
+    task = asyncio.ensure_future(export)
+    await asyncio.sleep(0)
+    order.status = Order.STATUS_FILLED  # Снимок уже взят в loop
+    await task
+
+    data = json.loads((tmp_path / "orders.json").read_text())
+    assert data['orders'][0]['status'] == Order.STATUS_OPEN
+    assert executor.get_statistics()['tasks']['export_to_json']['count'] == 1
+    executor.shutdown()
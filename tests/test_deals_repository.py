@@ -1,9 +1,11 @@
 import sys
 import os
+import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from infrastructure.repositories.deals_repository import InMemoryDealsRepository
+from infrastructure.repositories.sqlite_repositories import create_sqlite_repositories
 from domain.entities.deal import Deal
 
 
@@ -11,8 +13,18 @@ def make_deal(deal_id, status=Deal.STATUS_OPEN):
     return Deal(deal_id=deal_id, currency_pair_id='BTCUSDT', status=status)
 
 
-def test_save_and_get_open():
-    repo = InMemoryDealsRepository()
+@pytest.fixture(params=["memory", "sqlite"])
+def any_repo(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryDealsRepository()
+    else:
+        orders_repo, deals_repo = create_sqlite_repositories(str(tmp_path / "trading.db"))
+        yield deals_repo
+        orders_repo.db.close()
+
+
+def test_save_and_get_open(any_repo):
+    repo = any_repo
     d1 = make_deal(1)
     d2 = make_deal(2, status=Deal.STATUS_CLOSED)
     repo.save(d1)
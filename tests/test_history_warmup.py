@@ -0,0 +1,62 @@
+import sys
+import os
+import json
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.services.market_data.history_warmup_service import HistoryWarmupService
+from domain.services.market_data.ticker_service import TickerService
+from infrastructure.repositories.tickers_repository import InMemoryTickerRepository
+
+
+def make_candles(count=120):
+    return [[1_700_000_000_000 + i * 60_000, 100 + i * 0.1, 101 + i * 0.1, 99 + i * 0.1, 100 + i * 0.1, 5.0]
+            for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_from_exchange_makes_signals_ready(tmp_path):
+    connector = MagicMock()
+    connector.fetch_ohlcv = AsyncMock(return_value=make_candles())
+    cache_file = tmp_path / "ohlcv.json"
+    service = HistoryWarmupService(connector, limit=120, cache_file=str(cache_file))
+    ticker_service = TickerService(InMemoryTickerRepository())
+
+    metrics = await service.warm_up(ticker_service, "ETH/USDT")
+
+    assert metrics['source'] == "exchange"
+    assert metrics['candles'] == 120
+    assert metrics['signal_ready']
+    assert metrics['duration_ms'] >= 0
+    assert ticker_service.cached_indicators.heavy_cache['sma_99'] > 0
+    assert 'macd' in ticker_service.repository.tickers[-1].signals
+    assert json.loads(cache_file.read_text())['symbol'] == "ETH/USDT"
+
+
+@pytest.mark.asyncio
+async def test_warm_up_prefers_fresh_cache_file(tmp_path):
+    cache_file = tmp_path / "ohlcv.json"
+    cache_file.write_text(json.dumps({
+        'symbol': "ETH/USDT", 'timeframe': "1m", 'saved_at': time.time(), 'candles': make_candles(60)
+    }))
+    connector = MagicMock()
+    connector.fetch_ohlcv = AsyncMock(return_value=make_candles())
+    service = HistoryWarmupService(connector, cache_file=str(cache_file))
+
+    metrics = await service.warm_up(TickerService(InMemoryTickerRepository()), "ETH/USDT")
+
+    assert metrics['source'] == "cache"
+    assert metrics['candles'] == 60
+    connector.fetch_ohlcv.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_is_not_fatal():
+    connector = MagicMock()
+    connector.fetch_ohlcv = AsyncMock(side_effect=Exception("network down"))
+    metrics = await HistoryWarmupService(connector).warm_up(TickerService(InMemoryTickerRepository()), "ETH/USDT")
+    assert metrics['candles'] == 0
+    assert not metrics['signal_ready']
@@ -0,0 +1,54 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.services.indicators.indicator_checkpoint_service import IndicatorCheckpointService
+from domain.services.market_data.ticker_service import TickerService
+from infrastructure.repositories.tickers_repository import InMemoryTickerRepository
+
+
+async def make_warm_service(count=120):
+    service = TickerService(InMemoryTickerRepository(), symbol="ETH/USDT")
+    for i in range(count):
+        await service.process_ticker({'symbol': "ETH/USDT", 'close': 100 + (i % 7) * 0.3, 'timestamp': i})
+    return service
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_roundtrip_restores_indicator_state(tmp_path):
+    original = await make_warm_service()
+    checkpoint = IndicatorCheckpointService(str(tmp_path / "state.bin"))
+    assert checkpoint.save(original)
+
+    restored = TickerService(InMemoryTickerRepository(), symbol="ETH/USDT")
+    assert checkpoint.restore(restored, "ETH/USDT") == len(original.price_history_cache)
+
+    assert restored.price_history_cache == original.price_history_cache
+    assert restored.cached_indicators.export_state() == original.cached_indicators.export_state()
+    assert len(restored.repository.tickers) == 120
+    assert restored.repository.tickers[-1].signals['macd'] == original.cached_indicators.heavy_cache['macd']
+
+    # После восстановления инкрементальные SMA продолжают считаться так же
+    await original.process_ticker({'close': 101.0})
+    await restored.process_ticker({'close': 101.0})
+    assert restored.cached_indicators.fast_cache['sma_25'] == original.cached_indicators.fast_cache['sma_25']
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_validation_rejects_mismatch(tmp_path):
+    path = tmp_path / "state.bin"
+    checkpoint = IndicatorCheckpointService(str(path))
+    checkpoint.save(await make_warm_service(60))
+
+    assert checkpoint.load("BTC/USDT") is None
+
+    stale = IndicatorCheckpointService(str(path), max_gap_seconds=-1)
+    assert stale.load("ETH/USDT") is None
+
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    assert checkpoint.load("ETH/USDT") is None
+    assert checkpoint.stats['rejected'] == 2
@@ -0,0 +1,56 @@
+import sys
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.services.market_data.market_data_cache_service import MarketDataCacheService
+from domain.services.orders.buy_order_monitor import BuyOrderMonitor
+from domain.entities.order import Order
+
+
+@pytest.mark.asyncio
+async def test_fresh_ticker_served_from_cache_stale_goes_to_rest():
+    connector = MagicMock()
+    connector.fetch_ticker = AsyncMock(return_value={'symbol': 'ETH/USDT', 'last': 2000.0})
+    cache = MarketDataCacheService(connector, default_max_age_ms=1000)
+
+    cache.update_ticker('ETH/USDT', {'symbol': 'ETH/USDT', 'last': 1999.0})
+    assert (await cache.fetch_ticker('ETHUSDT'))['last'] == 1999.0
+    connector.fetch_ticker.assert_not_called()
+
+    cache.ticker_timestamps['ETHUSDT'] -= 5000
+    assert await cache.get_last_price('ETHUSDT') == 2000.0
+    connector.fetch_ticker.assert_awaited_once_with('ETHUSDT')
+
+    stats = cache.get_statistics()
+    assert stats['cache_hits'] == 1
+    assert stats['rest_fallbacks'] == 1
+
+
+@pytest.mark.asyncio
+async def test_orderbook_snapshot_and_no_fallback():
+    cache = MarketDataCacheService()
+    book = {'bids': [[99.0, 1.0, 0]], 'asks': [[101.0, 2.0, 0]]}
+    cache.update_orderbook('ETH/USDT', book)
+    book['bids'][0][0] = 50.0  # ccxt меняет стакан на месте - снимок не должен измениться
+
+    assert (await cache.fetch_orderbook('ETH/USDT'))['bids'] == [[99.0, 1.0]]
+    with pytest.raises(LookupError):
+        await cache.fetch_ticker('BTC/USDT')
+
+
+@pytest.mark.asyncio
+async def test_buy_order_monitor_uses_cached_price():
+    connector = MagicMock()
+    connector.fetch_ticker = AsyncMock(return_value={'last': 1.0})
+    cache = MarketDataCacheService(connector)
+    cache.update_ticker('ETHUSDT', {'last': 110.0})
+    monitor = BuyOrderMonitor(MagicMock(), connector, market_data_cache=cache)
+
+    order = Order(order_id=1, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT,
+                  price=100.0, amount=1.0, symbol='ETHUSDT')
+
+    assert await monitor._is_order_stale(order)
+    connector.fetch_ticker.assert_not_called()
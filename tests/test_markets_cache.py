@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from infrastructure.connectors.markets_cache import MarketsCache
+from infrastructure.connectors.exchange_connector import CcxtExchangeConnector
+
+MARKETS = {
+    'ETH/USDT': {
+        'id': 'ETHUSDT', 'symbol': 'ETH/USDT', 'base': 'ETH', 'quote': 'USDT',
+        'baseId': 'ETH', 'quoteId': 'USDT', 'type': 'spot', 'spot': True, 'active': True,
+        'precision': {'amount': 0.0001, 'price': 0.01},
+        'limits': {'amount': {'min': 0.0001, 'max': 9000.0}, 'price': {'min': 0.01, 'max': 1000000.0},
+                   'cost': {'min': 5.0}},
+        'info': {'filters': ['large raw payload']}
+    }
+}
+
+
+def make_connector(cache, use_sandbox=False):
+    connector = CcxtExchangeConnector(use_sandbox=use_sandbox, markets_cache=cache)
+    client = MagicMock()
+    client.last_response_headers = None
+    client.load_markets = AsyncMock(return_value=MARKETS)
+    connector.async_client = client
+    return connector
+
+
+def test_store_and_ttl(tmp_path):
+    cache = MarketsCache(str(tmp_path / "markets.json"), ttl_seconds=60)
+    cache.store('binance:production', MARKETS)
+
+    reloaded = MarketsCache(str(tmp_path / "markets.json"), ttl_seconds=60)
+    market = reloaded.get_market('binance:production', 'ETH/USDT')
+    assert market['limits']['cost']['min'] == 5.0
+    assert market['info'] == {'filters': ['large raw payload']}  # Нужен ccxt для set_markets
+    assert reloaded.get_market('binance:sandbox', 'ETH/USDT') is None
+
+    reloaded._namespaces['binance:production']['saved_at'] = time.time() - 120
+    assert reloaded.get_market('binance:production', 'ETH/USDT') is None
+    assert reloaded.stats['stale'] == 1
+
+
+def test_shared_instance_per_file(tmp_path):
+    path = str(tmp_path / "markets.json")
+    assert MarketsCache.shared(path) is MarketsCache.shared(path)
+
+
+@pytest.mark.asyncio
+async def test_second_connector_starts_from_disk_cache(tmp_path):
+    path = str(tmp_path / "markets.json")
+    first = make_connector(MarketsCache(path))
+    assert first._client is None  # Синхронный клиент не создается при старте
+
+    info = await first.get_symbol_info("ETHUSDT")
+    assert info.min_notional == 5.0
+    first.async_client.load_markets.assert_awaited_once()
+
+    # Новый процесс: рынок символа читается из файла без load_markets
+    second = make_connector(MarketsCache(path))
+    info = await second.get_symbol_info("ETHUSDT")
+    assert info.step_size == 0.0001
+    second.async_client.load_markets.assert_not_called()
+    assert second.markets_cache.stats['hits'] == 1
+
+    # Sandbox - отдельный namespace
+    sandbox = make_connector(MarketsCache(path), use_sandbox=True)
+    await sandbox.get_symbol_info("ETHUSDT")
+    sandbox.async_client.load_markets.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_hit_seeds_ccxt_client_markets(tmp_path):
+    path = str(tmp_path / "markets.json")
+    await make_connector(MarketsCache(path)).get_symbol_info("ETHUSDT")
+
+    connector = CcxtExchangeConnector(markets_cache=MarketsCache(path))
+    client = connector.async_client
+    client.fetch_markets = AsyncMock(side_effect=AssertionError("load_markets must not hit the exchange"))
+    try:
+        await connector.get_symbol_info("ETHUSDT")
+        # watch_ticker/create_order вызывают load_markets: рынки уже в клиенте
+        markets = await client.load_markets()
+        assert markets['ETH/USDT']['id'] == 'ETHUSDT'
+        assert client.market('ETH/USDT')['info'] == {'filters': ['large raw payload']}
+        client.fetch_markets.assert_not_called()
+    finally:
+        await client.close()
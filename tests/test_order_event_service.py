@@ -0,0 +1,79 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.order import Order
+from domain.services.orders.order_event_service import OrderEventService
+from domain.services.orders.order_service import OrderService
+from domain.factories.order_factory import OrderFactory
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+
+def make_service():
+    repo = InMemoryOrdersRepository()
+    order_service = OrderService(repo, OrderFactory())
+    order = Order(order_id=1, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT, price=100.0,
+                  amount=2.0, status=Order.STATUS_OPEN, exchange_id="ex-1", symbol="ETHUSDT")
+    repo.save(order)
+    return OrderEventService(order_service, MagicMock(), reconcile_interval_seconds=0), repo, order
+
+
+def test_order_updates_applied_in_order_and_stale_ignored():
+    events, repo, order = make_service()
+    filled = []
+    events.add_listener(lambda o: filled.append(o.status))
+
+    now = int(time.time() * 1000)
+    events.apply_order_update({'id': 'ex-1', 'status': 'open', 'filled': 1.0, 'remaining': 1.0,
+                               'average': 100.0, 'fee': None, 'timestamp': now})
+    assert repo.get_by_exchange_id('ex-1').status == Order.STATUS_PARTIALLY_FILLED
+
+    events.apply_order_update({'id': 'ex-1', 'status': 'closed', 'filled': 2.0, 'remaining': 0.0,
+                               'average': 100.0, 'timestamp': now})
+    events.apply_order_update({'id': 'ex-1', 'status': 'open', 'filled': 1.0, 'timestamp': now})
+    events.apply_order_update({'id': 'unknown', 'status': 'closed'})
+
+    assert order.is_filled()
+    assert filled == [Order.STATUS_PARTIALLY_FILLED, Order.STATUS_FILLED]
+    stats = events.get_statistics()
+    assert stats['fills_detected'] == 1
+    assert stats['stale_events'] == 1
+    assert stats['unknown_orders'] == 1
+    assert [o.order_id for o in events.drain_updated_orders()] == [1]
+
+
+def test_trades_complete_fill_without_order_report():
+    events, _, order = make_service()
+    events.apply_trade({'id': 't1', 'order': 'ex-1', 'amount': 0.5, 'price': 99.0, 'fee': {'cost': 0.01}})
+    events.apply_trade({'id': 't1', 'order': 'ex-1', 'amount': 0.5, 'price': 99.0})  # дубликат
+    assert order.status == Order.STATUS_PARTIALLY_FILLED
+
+    events.apply_trade({'id': 't2', 'order': 'ex-1', 'amount': 1.5, 'price': 101.0, 'fee': {'cost': 0.03}})
+    assert order.is_filled()
+    assert order.average_price == pytest.approx(100.5)
+    assert order.fees == pytest.approx(0.04)
+
+
+@pytest.mark.asyncio
+async def test_stream_tasks_consume_watch_orders():
+    events, _, order = make_service()
+    client = MagicMock(spec=['watch_orders'])
+    updates = [[{'id': 'ex-1', 'status': 'closed', 'filled': 2.0, 'remaining': 0.0}]]
+
+    async def watch_orders(symbol):
+        if updates:
+            return updates.pop()
+        await asyncio.sleep(10)
+
+    client.watch_orders = watch_orders
+    events.exchange_connector.async_client = client
+
+    await events.start()
+    await asyncio.sleep(0.01)
+    await events.stop()
+    assert order.is_filled()
@@ -0,0 +1,107 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.order import Order
+from infrastructure.repositories.order_history_archive import OrderHistoryArchive, RECORD_DTYPE
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+BASE = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def make_order(order_id, hours, symbol="BTCUSDT", side=Order.SIDE_BUY, status=Order.STATUS_FILLED):
+    created_at = int((BASE + timedelta(hours=hours)).timestamp() * 1000)
+    return Order(order_id=order_id, side=side, order_type=Order.TYPE_LIMIT, price=100.0 + order_id,
+                 amount=1.0, status=status, symbol=symbol, exchange_id=str(5000 + order_id),
+                 filled_amount=1.0, remaining_amount=0.0, created_at=created_at, closed_at=created_at + 60000)
+
+
+def ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def test_daily_partitions_and_vectorized_scans(tmp_path):
+    history = OrderHistoryArchive(str(tmp_path))
+    orders = [make_order(i + 1, hours=i * 6, symbol="ETHUSDT" if i % 3 == 0 else "BTCUSDT",
+                         side=Order.SIDE_SELL if i % 2 else Order.SIDE_BUY) for i in range(12)]
+    assert history.append(orders) == 12
+    assert history.get_statistics()['partitions'] == 3
+    assert history.get_statistics()['disk_bytes'] == 12 * RECORD_DTYPE.itemsize
+
+    day2 = history.scan(ms(BASE + timedelta(days=1)), ms(BASE + timedelta(days=2)) - 1)
+    assert sorted(day2['order_id'].tolist()) == [5, 6, 7, 8]
+    eth_sells = history.scan(symbol="ETHUSDT", side=Order.SIDE_SELL)
+    assert eth_sells['order_id'].tolist() == [4, 10]
+    assert len(history.scan(symbol="DOGEUSDT")) == 0
+
+    restored = history.orders_between(ms(BASE), ms(BASE + timedelta(hours=6)))
+    assert [o.to_dict() for o in restored] == [orders[1].to_dict(), orders[0].to_dict()]
+
+    # Новый процесс читает те же файлы и словарь; последняя версия ордера побеждает
+    orders[0].status = Order.STATUS_CANCELED
+    history.append([orders[0]])
+    reopened = OrderHistoryArchive(str(tmp_path))
+    assert reopened.scan(status=Order.STATUS_FILLED)['order_id'].tolist().count(1) == 0
+    assert len(reopened.scan(latest_only=False)) == 13
+    assert reopened.orders_between(ms(BASE), ms(BASE))[0].status == Order.STATUS_CANCELED
+
+    assert reopened.drop_partitions_before(ms(BASE + timedelta(days=1))) == 1
+    assert len(reopened.scan()) == 8
+
+
+def test_torn_tail_record_is_ignored(tmp_path):
+    history = OrderHistoryArchive(str(tmp_path))
+    history.append([make_order(1, hours=1), make_order(2, hours=2)])
+    path = history._partition_path(ms(BASE) // 86400000)
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 5)
+    assert OrderHistoryArchive(str(tmp_path)).scan()['order_id'].tolist() == [1]
+
+
+def test_date_range_falls_through_to_history_for_evicted_orders(tmp_path):
+    history = OrderHistoryArchive(str(tmp_path))
+    repo = InMemoryOrdersRepository(max_orders=10, evict_batch=4, history=history)
+    for i in range(10):
+        repo.save(make_order(i + 1, hours=i))
+    repo.save(make_order(11, hours=30, status=Order.STATUS_OPEN))
+
+    assert repo.get_by_id(1) is None and history.stats['appended'] == 4
+    found = repo.get_orders_by_date_range(BASE, BASE + timedelta(hours=5))
+    assert [o.order_id for o in found] == [6, 5, 4, 3, 2, 1]
+    assert repo.stats['history_reads'] == 1
+
+    # Диапазон без файлов истории обходится без чтения диска
+    repo.get_orders_by_date_range(BASE + timedelta(days=5), BASE + timedelta(days=6))
+    assert repo.stats['history_reads'] == 1
+
+
+def test_torn_tail_is_truncated_before_new_appends(tmp_path):
+    history = OrderHistoryArchive(str(tmp_path))
+    history.append([make_order(1, hours=1), make_order(2, hours=2)])
+    path = history._partition_path(ms(BASE) // 86400000)
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * 7)  # Падение посреди записи
+
+    reopened = OrderHistoryArchive(str(tmp_path))
+    assert reopened.stats['truncated_bytes'] == 7
+    reopened.append([make_order(3, hours=3)])
+    assert os.path.getsize(path) == 3 * RECORD_DTYPE.itemsize
+    assert sorted(reopened.scan()['order_id'].tolist()) == [1, 2, 3]
+    assert reopened.orders_between(ms(BASE), ms(BASE + timedelta(hours=3)))[0].price == 103.0
+
+
+def test_closed_orders_reach_history_when_archived(tmp_path):
+    from infrastructure.repositories.closed_orders_archive import ClosedOrdersArchive
+
+    history = OrderHistoryArchive(str(tmp_path))
+    repo = InMemoryOrdersRepository(max_orders=100, archive=ClosedOrdersArchive(), history=history)
+    for i in range(3):
+        repo.save(make_order(i + 1, hours=i))
+    repo.save(make_order(4, hours=3, status=Order.STATUS_OPEN))
+
+    # Лимит не достигнут, вытеснения нет: закрытые уходят в историю при архивации
+    assert repo.archive_closed_orders(min_age_ms=0) == 3
+    assert repo.stats['evicted'] == 0
+    assert sorted(history.scan()['order_id'].tolist()) == [1, 2, 3]
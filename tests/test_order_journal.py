@@ -0,0 +1,160 @@
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from infrastructure.repositories.closed_orders_archive import ClosedOrdersArchive
+from infrastructure.repositories.deals_repository import InMemoryDealsRepository
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+from infrastructure.repositories.order_journal import OrderJournal
+
+
+def make_order(order_id, status=Order.STATUS_OPEN, deal_id=None):
+    return Order(order_id=order_id, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT,
+                 price=100.0, amount=1.0, status=status, symbol="BTCUSDT", deal_id=deal_id)
+
+
+def open_repos(journal_dir, **kwargs):
+    journal = OrderJournal(str(journal_dir), **kwargs)
+    orders_repo = InMemoryOrdersRepository(journal=journal)
+    deals_repo = InMemoryDealsRepository(journal=journal)
+    journal.recover(orders_repo, deals_repo)
+    return journal, orders_repo, deals_repo
+
+
+def test_state_is_rebuilt_from_journal(tmp_path):
+    journal, orders_repo, deals_repo = open_repos(tmp_path)
+    buy = make_order(1, deal_id=5)
+    orders_repo.save(buy)
+    deals_repo.save(Deal(deal_id=5, currency_pair_id='BTCUSDT', buy_order=buy))
+    buy.filled_amount = 0.5
+    buy.status = Order.STATUS_PARTIALLY_FILLED
+    orders_repo.save(buy)
+    orders_repo.save(make_order(2))
+    orders_repo.bulk_update_status([2], Order.STATUS_CANCELED)
+    journal.close()
+
+    journal, orders_repo, deals_repo = open_repos(tmp_path)
+    restored = orders_repo.get_by_id(1)
+    assert restored.status == Order.STATUS_PARTIALLY_FILLED and restored.filled_amount == 0.5
+    assert orders_repo.get_by_id(2).status == Order.STATUS_CANCELED
+    assert deals_repo.get_by_id(5).buy_order is restored
+    assert journal.stats['replayed_records'] == 5
+    assert journal.stats['appended'] == 0  # Восстановление не пишет в журнал
+
+
+def test_snapshot_compacts_journal_and_bounds_restart(tmp_path):
+    journal, orders_repo, deals_repo = open_repos(tmp_path)
+    order = make_order(1)
+    for i in range(500):
+        order.filled_amount = i / 1000
+        orders_repo.save(order)
+    orders_repo.save(make_order(2, status=Order.STATUS_CLOSED))
+    orders_repo.delete_old_orders(-1)
+    journal.compact()
+    orders_repo.save(make_order(3))
+    journal.close()
+
+    journal, orders_repo, _ = open_repos(tmp_path)
+    assert journal.stats['snapshot_records'] == 1
+    assert journal.stats['replayed_records'] == 1
+    assert [o.order_id for o in orders_repo.get_all()] == [1, 3]
+    assert orders_repo.get_by_id(1).filled_amount == 0.499
+
+    # Новые записи продолжают нумерацию после снимка
+    orders_repo.save(make_order(4))
+    journal.close()
+    journal, orders_repo, _ = open_repos(tmp_path)
+    assert len(orders_repo.get_all()) == 3
+
+
+def test_torn_tail_record_is_dropped(tmp_path):
+    journal, orders_repo, _ = open_repos(tmp_path)
+    orders_repo.save(make_order(1))
+    orders_repo.save(make_order(2))
+    journal.close()
+
+    with open(journal.journal_path, 'r+b') as f:
+        f.truncate(os.path.getsize(journal.journal_path) - 7)
+
+    journal, orders_repo, _ = open_repos(tmp_path)
+    assert [o.order_id for o in orders_repo.get_all()] == [1]
+    assert journal.stats['truncated_bytes'] > 0
+
+    orders_repo.save(make_order(3))
+    journal.close()
+    _, orders_repo, _ = open_repos(tmp_path)
+    assert [o.order_id for o in orders_repo.get_all()] == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_background_fsync_and_compaction(tmp_path):
+    journal, orders_repo, _ = open_repos(tmp_path, fsync_batch=1000, fsync_interval_ms=10,
+                                         snapshot_every_records=3)
+    await journal.start()
+    for i in range(3):
+        orders_repo.save(make_order(i + 1))
+    assert journal.stats['fsyncs'] == 0  # Горячий путь только дописывает
+
+    await asyncio.sleep(0.05)
+    await journal.stop()
+    assert journal.stats['fsyncs'] >= 1 and journal.stats['snapshots'] == 1
+    assert journal.get_statistics()['journal_bytes'] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_batch_wakes_background_fsync(tmp_path):
+    journal, orders_repo, _ = open_repos(tmp_path, fsync_batch=2, fsync_interval_ms=60000)
+    for i in range(5):
+        orders_repo.save(make_order(i + 1))
+    assert journal.stats['fsyncs'] == 0  # Без фонового цикла save никогда не делает fsync
+
+    await journal.start()
+    orders_repo.save(make_order(6))
+    assert journal.stats['fsyncs'] == 0
+    await asyncio.sleep(0.05)  # Интервал - минута: разбудила полная пачка
+    assert journal.stats['fsyncs'] == 1
+    await journal.stop()
+
+
+@pytest.mark.asyncio
+async def test_background_compaction_keeps_concurrent_saves_and_archive(tmp_path):
+    journal = OrderJournal(str(tmp_path))
+    archive = ClosedOrdersArchive()
+    orders_repo = InMemoryOrdersRepository(journal=journal, archive=archive, archive_after_ms=0)
+    journal.recover(orders_repo)
+    for i in range(10):
+        orders_repo.save(make_order(i + 1, status=Order.STATUS_FILLED))
+    orders_repo.archive_closed_orders()
+    rehydrated = archive.stats['rehydrated']
+
+    task = asyncio.create_task(journal.compact_async())
+    await asyncio.sleep(0)  # Словари сняты, журнал переключен, снимок пишется в потоке
+    orders_repo.save(make_order(11))
+    await task
+    assert archive.stats['rehydrated'] == rehydrated  # Архив не поднимался в Order
+    assert not journal.previous_journal_path.exists()
+    journal.close()
+
+    journal = OrderJournal(str(tmp_path))
+    orders_repo = InMemoryOrdersRepository(journal=journal)
+    journal.recover(orders_repo)
+    assert journal.stats['snapshot_records'] == 10 and journal.stats['replayed_records'] == 1
+    assert len(orders_repo.get_all()) == 11
+
+
+def test_unfinished_compaction_is_replayed_from_previous_journal(tmp_path):
+    journal, orders_repo, _ = open_repos(tmp_path)
+    orders_repo.save(make_order(1))
+    prepared = journal._begin_compaction()  # Падение до записи снимка
+    orders_repo.save(make_order(2))
+    journal.close()
+    assert prepared is not None and journal.previous_journal_path.exists()
+
+    journal, orders_repo, _ = open_repos(tmp_path)
+    assert [o.order_id for o in orders_repo.get_all()] == [1, 2]
+    assert not journal.previous_journal_path.exists() and journal.stats['snapshots'] == 1
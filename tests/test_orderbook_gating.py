@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.services.market_data.orderbook_analyzer import OrderBookAnalyzer, OrderBookMetrics, OrderBookSignal
+from domain.services.market_data.orderbook_service import OrderBookService
+from domain.services.trading.trading_decision_engine import TradingDecisionEngine
+
+
+def make_metrics(signal=OrderBookSignal.STRONG_BUY, confidence=0.9, slippage_buy=0.6):
+    return OrderBookMetrics(
+        bid_ask_spread=0.05, bid_volume=100, ask_volume=50, volume_imbalance=33.0,
+        liquidity_depth=40, support_level=99.5, resistance_level=100.8,
+        slippage_buy=slippage_buy, slippage_sell=0.05, big_walls=[],
+        signal=signal, confidence=confidence
+    )
+
+
+def test_fresh_metrics_respect_max_age():
+    service = OrderBookService(OrderBookAnalyzer({}))
+    assert service.get_metrics_age_ms() is None
+    assert service.get_fresh_metrics(1000) is None
+
+    service.latest_metrics = make_metrics()
+    service.latest_metrics_timestamp = int(time.time() * 1000)
+    assert service.get_fresh_metrics(1000) is service.latest_metrics
+
+    service.latest_metrics_timestamp -= 5000
+    assert service.get_fresh_metrics(1000) is None
+
+
+def test_gate_buy_signal_with_fresh_metrics_adds_modifications():
+    engine = TradingDecisionEngine(OrderBookAnalyzer({}))
+    gate = engine.gate_buy_signal(make_metrics(), metrics_age_ms=100, max_age_ms=2000)
+    assert gate['execute']
+    assert gate['orderbook_used']
+    assert gate['modifications']['entry_price_hint'] == 99.5
+    assert gate['modifications']['reduce_position_size'] == 0.7
+
+
+def test_gate_buy_signal_stale_or_rejected():
+    engine = TradingDecisionEngine(OrderBookAnalyzer({}))
+
+    stale = engine.gate_buy_signal(make_metrics(), metrics_age_ms=5000, max_age_ms=2000)
+    assert stale['execute'] and not stale['orderbook_used']
+
+    strict = engine.gate_buy_signal(None, None, max_age_ms=2000, require_orderbook_support=True)
+    assert not strict['execute']
+
+    rejected = engine.gate_buy_signal(make_metrics(OrderBookSignal.REJECT), 100, 2000)
+    assert not rejected['execute']
+
+    low_confidence = engine.gate_buy_signal(make_metrics(confidence=0.5), 100, 2000, confidence_threshold=0.6)
+    assert not low_confidence['execute']
@@ -1,12 +1,14 @@
 import sys
 import os
 import time
+import pytest
 from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from domain.entities.order import Order
 from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+from infrastructure.repositories.sqlite_repositories import SqliteOrdersRepository
 
 
 def make_order(order_id, status=Order.STATUS_OPEN, symbol="BTCUSDT"):
@@ -21,8 +23,19 @@ def make_order(order_id, status=Order.STATUS_OPEN, symbol="BTCUSDT"):
     )
 
 
-def test_save_and_get():
-    repo = InMemoryOrdersRepository()
+@pytest.fixture(params=["memory", "sqlite"])
+def any_repo(request, tmp_path):
+    """Базовые сценарии репозитория проходят на обоих бэкендах"""
+    if request.param == "memory":
+        yield InMemoryOrdersRepository()
+    else:
+        repo = SqliteOrdersRepository.from_path(str(tmp_path / "orders.db"))
+        yield repo
+        repo.db.close()
+
+
+def test_save_and_get(any_repo):
+    repo = any_repo
     order = make_order(1)
     repo.save(order)
     assert repo.get_by_id(1) == order
@@ -30,8 +43,8 @@ def test_save_and_get():
     assert repo.get_open_orders() == [order]
 
 
-def test_bulk_update_and_delete_old():
-    repo = InMemoryOrdersRepository()
+def test_bulk_update_and_delete_old(any_repo):
+    repo = any_repo
     o1 = make_order(1, status=Order.STATUS_OPEN)
     o2 = make_order(2, status=Order.STATUS_OPEN)
     repo.save(o1)
@@ -45,4 +58,295 @@ def test_bulk_update_and_delete_old():
     o2.closed_at = old_ts
     deleted = repo.delete_old_orders(1)
     assert deleted == 2
-    assert repo.get_all() == []
\ No newline at end of file
+    assert repo.get_all() == []
+
+
+def test_in_place_status_change_moves_order_between_indexes():
+    repo = InMemoryOrdersRepository()
+    order = make_order(1)
+    repo.save(order)
+
+    # Сервисы меняют ордер на месте и сохраняют повторно
+    order.status = Order.STATUS_FILLED
+    repo.save(order)
+    assert repo.get_open_orders() == []
+    assert repo.get_orders_by_status(Order.STATUS_FILLED) == [order]
+
+    order.status = Order.STATUS_OPEN
+    repo.bulk_update_status([1], Order.STATUS_CANCELED)
+    assert repo.get_orders_by_status(Order.STATUS_FILLED) == []
+    assert repo.get_orders_by_status(Order.STATUS_CANCELED) == [order]
+
+
+def test_date_range_uses_time_index():
+    repo = InMemoryOrdersRepository()
+    base = datetime(2024, 1, 1)
+    for i in range(10):
+        order = make_order(i + 1)
+        order.created_at = int((base + timedelta(hours=i)).timestamp() * 1000)
+        repo.save(order)
+
+    found = repo.get_orders_by_date_range(base + timedelta(hours=2), base + timedelta(hours=5))
+    assert [o.order_id for o in found] == [6, 5, 4, 3]
+
+    repo.delete_old_orders(0)  # Открытые ордера не удаляются
+    repo.bulk_update_status([4], Order.STATUS_CLOSED)
+    repo.get_by_id(4).closed_at = 1
+    assert repo.delete_old_orders(0) == 1
+    found = repo.get_orders_by_date_range(base + timedelta(hours=2), base + timedelta(hours=5))
+    assert [o.order_id for o in found] == [6, 5, 3]
+
+
+def test_status_saves_and_range_queries_at_50k_orders():
+    repo = InMemoryOrdersRepository(max_orders=50000)
+    base = int(datetime(2024, 1, 1).timestamp() * 1000)
+    for i in range(50000):
+        order = make_order(i + 1, status=Order.STATUS_CLOSED)
+        order.created_at = base + i * 1000
+        repo.save(order)
+
+    started = time.perf_counter()
+    for i in range(2000):
+        order = repo.get_by_id(i + 1)
+        order.status = Order.STATUS_FILLED
+        repo.save(order)
+        repo.get_orders_by_date_range(datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 1, 1))
+    elapsed = time.perf_counter() - started
+
+    assert len(repo.get_orders_by_status(Order.STATUS_FILLED)) == 2000
+    assert len(repo.get_orders_by_date_range(datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 1, 1))) == 61
+    # Со списками и полным сканом это занимало секунды
+    assert elapsed < 1.0
+
+
+def test_search_orders_picks_most_selective_index():
+    repo = InMemoryOrdersRepository()
+    base = datetime(2024, 1, 1)
+    for i in range(100):
+        order = make_order(i + 1, status=Order.STATUS_CLOSED if i % 2 else Order.STATUS_OPEN,
+                           symbol="BTCUSDT" if i < 90 else "ETHUSDT")
+        order.deal_id = i // 10 + 1
+        order.created_at = int((base + timedelta(minutes=i)).timestamp() * 1000)
+        repo.save(order)
+
+    found = repo.search_orders(symbol="BTCUSDT", status=Order.STATUS_OPEN, deal_id=3)
+    assert [o.order_id for o in found] == [29, 27, 25, 23, 21]
+    plan = repo.last_query_plan
+    assert plan['index'] == 'deal' and plan['candidates'] == 10 and plan['examined'] == 10
+    assert set(plan['intersected']) == {'symbol', 'status'}
+
+    found = repo.search_orders(symbol="ETHUSDT", limit=3)
+    assert [o.order_id for o in found] == [100, 99, 98]
+    assert repo.last_query_plan['index'] == 'symbol'
+
+    found = repo.search_orders(date_from=base + timedelta(minutes=10), date_to=base + timedelta(minutes=50),
+                               status=Order.STATUS_CLOSED, limit=2)
+    assert [o.order_id for o in found] == [50, 48]
+    plan = repo.last_query_plan
+    assert plan['index'] == 'time_range' and plan['early_exit'] and plan['examined'] == 4
+
+    assert repo.search_orders(exchange_id="missing") == []
+    assert repo.search_orders(side=Order.SIDE_SELL) == []
+    assert repo.last_query_plan['index'] == 'full_scan'
+    assert repo.get_statistics()['query_plans']['full_scan'] == 1
+
+
+def test_ndjson_gzip_roundtrip_with_single_index_rebuild(tmp_path):
+    repo = InMemoryOrdersRepository(max_orders=50000)
+    for i in range(5000):
+        order = make_order(i + 1, status=Order.STATUS_CLOSED if i % 3 else Order.STATUS_OPEN)
+        order.metadata = {'n': i}
+        repo.save(order)
+
+    path = str(tmp_path / "orders.ndjson.gz")
+    exported = repo.export_ndjson(path, chunk_size=700)
+    assert exported['orders'] == 5000 and exported['orders_per_sec'] > 0
+
+    restored = InMemoryOrdersRepository(max_orders=50000)
+    imported = restored.import_ndjson(path, chunk_size=1000)
+    assert imported['orders'] == 5000
+    assert restored.stats['index_rebuilds'] == 1
+    assert len(restored.get_open_orders()) == len(repo.get_open_orders())
+    assert restored.get_by_id(4999).metadata == {'n': 4998}
+
+
+@pytest.mark.asyncio
+async def test_ndjson_async_export_import(tmp_path):
+    repo = InMemoryOrdersRepository()
+    for i in range(100):
+        repo.save(make_order(i + 1))
+    path = str(tmp_path / "orders.ndjson")
+    await repo.export_ndjson_async(path)
+
+    with open(path, "a") as f:
+        f.write("{not json}\n")
+
+    restored = InMemoryOrdersRepository()
+    result = await restored.import_ndjson_async(path, chunk_size=30)
+    assert result['orders'] == 100
+    assert restored.stats['index_rebuilds'] == 1
+    assert restored.get_orders_by_symbol("BTCUSDT")[0].order_id == 1
+
+
+@pytest.mark.asyncio
+async def test_ndjson_async_export_hands_thread_bounded_chunks(tmp_path, monkeypatch):
+    repo = InMemoryOrdersRepository()
+    for i in range(100):
+        repo.save(make_order(i + 1))
+    chunk_sizes = []
+    write_chunk = InMemoryOrdersRepository._write_ndjson_chunk
+
+    def record_chunk(f, chunk):
+        chunk_sizes.append(len(chunk))
+        write_chunk(f, chunk)
+
+    monkeypatch.setattr(InMemoryOrdersRepository, '_write_ndjson_chunk', staticmethod(record_chunk))
+    async_path = str(tmp_path / "async.ndjson")
+    result = await repo.export_ndjson_async(async_path, chunk_size=30)
+    assert result['orders'] == 100
+    assert chunk_sizes == [30, 30, 30, 10]  # Словари снимаются порциями, а не все сразу
+
+    sync_path = str(tmp_path / "sync.ndjson")
+    repo.export_ndjson(sync_path, chunk_size=30)
+    with open(async_path) as a, open(sync_path) as b:
+        assert a.read() == b.read()
+
+
+def test_ndjson_zstd_roundtrip(tmp_path):
+    pytest.importorskip("zstandard")
+    repo = InMemoryOrdersRepository()
+    for i in range(50):
+        repo.save(make_order(i + 1))
+    path = str(tmp_path / "orders.ndjson.zst")
+    assert repo.export_ndjson(path)['orders'] == 50
+
+    restored = InMemoryOrdersRepository()
+    assert restored.import_ndjson(path)['orders'] == 50
+    assert restored.get_by_id(50).to_dict() == repo.get_by_id(50).to_dict()
+
+
+def test_ndjson_zstd_without_package_raises(tmp_path, monkeypatch):
+    import infrastructure.repositories.orders_repository as orders_module
+    monkeypatch.setattr(orders_module, "zstandard", None)
+    with pytest.raises(ValueError):
+        InMemoryOrdersRepository().export_ndjson(str(tmp_path / "orders.ndjson.zst"))
+
+
+def test_sync_heap_returns_only_stale_open_orders():
+    repo = InMemoryOrdersRepository()
+    now = int(time.time() * 1000)
+    for i in range(1000):
+        order = make_order(i + 1)
+        order.mark_as_placed(f"ex-{i}")
+        order.last_update = now - (10 * 60 * 1000 if i < 3 else 1000)
+        repo.save(order)
+
+    due = repo.get_orders_requiring_sync()
+    assert sorted(o.order_id for o in due) == [1, 2, 3]
+    assert len(repo.get_orders_requiring_sync()) == 3  # Остаются до обновления
+
+    # Обновление на месте, закрытие и save снимают ордера с наблюдения
+    repo.get_by_id(1).last_update = now
+    order = repo.get_by_id(2)
+    order.cancel()
+    repo.save(order)
+    assert [o.order_id for o in repo.get_orders_requiring_sync()] == [3]
+
+
+def test_error_set_follows_failed_saves():
+    repo = InMemoryOrdersRepository()
+    order = make_order(1, status=Order.STATUS_PENDING)
+    repo.save(order)
+    repo.save(make_order(2))
+    assert repo.get_orders_with_errors() == []
+
+    order.mark_as_failed("insufficient balance")
+    repo.save(order)
+    assert repo.get_orders_with_errors() == [order]
+    assert repo.get_statistics()['orders_with_errors'] == 1
+
+    repo.bulk_update_status([1], Order.STATUS_CLOSED)
+    order.error_message = None
+    repo.save(order)
+    assert repo.get_orders_with_errors() == []
+
+
+def test_limit_evicts_oldest_closed_orders_in_small_batches():
+    repo = InMemoryOrdersRepository(max_orders=100, evict_batch=5)
+    for i in range(100):
+        order = make_order(i + 1, status=Order.STATUS_FILLED if i % 2 else Order.STATUS_OPEN)
+        order.closed_at = 1_000_000 - i if order.is_closed() else None
+        repo.save(order)
+
+    # Ордер 2 переоткрыт: устаревшая запись кучи пропускается
+    reopened = repo.get_by_id(2)
+    reopened.status = Order.STATUS_OPEN
+    repo.save(reopened)
+
+    repo.save(make_order(101))
+    assert repo.stats['evicted'] == 5
+    # Вытеснены самые давно закрытые (наименьший closed_at), открытые не тронуты
+    assert [o for o in (100, 98, 96, 94, 92) if repo.get_by_id(o)] == []
+    assert repo.get_by_id(90) is not None
+    assert len(repo.get_open_orders()) == 52
+    assert len(repo.get_orders_by_status(Order.STATUS_FILLED)) == 44
+
+
+def test_evicted_orders_move_to_cold_tier(tmp_path):
+    from infrastructure.repositories.closed_orders_archive import ClosedOrdersArchive
+    from infrastructure.repositories.sqlite_repositories import SqliteOrdersRepository
+
+    cold = SqliteOrdersRepository.from_path(str(tmp_path / "cold.db"))
+    repo = InMemoryOrdersRepository(max_orders=10, evict_batch=3, cold_tier=cold,
+                                    archive=ClosedOrdersArchive(), archive_after_ms=0)
+    base = datetime(2024, 1, 1)
+    for i in range(10):
+        order = make_order(i + 1, status=Order.STATUS_FILLED)
+        order.created_at = int((base + timedelta(minutes=i)).timestamp() * 1000)
+        order.closed_at = order.created_at + 1000
+        order.deal_id = 7
+        repo.save(order)
+    repo.archive_closed_orders()
+
+    repo.save(make_order(11))
+    assert repo.get_statistics()['total_orders'] == 8
+    assert repo.get_by_id(1) is None
+    assert repo.get_by_id(1, include_cold=True).status == Order.STATUS_FILLED
+
+    assert len(repo.get_all_by_deal(7)) == 7
+    assert len(repo.get_all_by_deal(7, include_cold=True)) == 10
+    assert len(repo.get_orders_by_symbol("BTCUSDT", include_cold=True)) == 11
+    found = repo.get_orders_by_date_range(base, base + timedelta(minutes=4), include_cold=True)
+    assert [o.order_id for o in found] == [5, 4, 3, 2, 1]
+
+    # Вернувшийся в горячий уровень ордер не дублируется
+    revived = repo.get_by_id(2, include_cold=True)
+    repo.save(revived)
+    assert [o.order_id for o in repo.get_all_by_deal(7, include_cold=True)].count(2) == 1
+    cold.db.close()
+
+
+def test_eviction_writes_go_through_persistence_queue(tmp_path):
+    from infrastructure.repositories.order_history_archive import OrderHistoryArchive
+    from infrastructure.repositories.sqlite_repositories import SqliteOrdersRepository
+    from infrastructure.repositories.write_behind import WriteBehindQueue
+
+    cold = SqliteOrdersRepository.from_path(str(tmp_path / "cold.db"))
+    history = OrderHistoryArchive(str(tmp_path / "history"))
+    queue = WriteBehindQueue()
+    repo = InMemoryOrdersRepository(max_orders=5, evict_batch=2, cold_tier=cold,
+                                    history=history, persistence_queue=queue)
+    for i in range(5):
+        order = make_order(i + 1, status=Order.STATUS_FILLED)
+        order.closed_at = order.created_at + i
+        repo.save(order)
+    repo.save(make_order(6))
+
+    # save() не писал на диск: вытесненные ордера ждут фонового сброса
+    assert repo.stats['evicted'] == 2 and queue.pending == 4
+    assert cold.count() == 0 and history.stats['appended'] == 0
+
+    assert queue.flush() == 4
+    assert sorted(o.order_id for o in cold.get_all()) == [1, 2]
+    assert sorted(history.scan()['order_id'].tolist()) == [1, 2]
+    cold.db.close()
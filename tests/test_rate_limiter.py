@@ -0,0 +1,80 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from infrastructure.connectors.rate_limiter import WeightedRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_requests_within_budget_run_concurrently():
+    limiter = WeightedRateLimiter(weight_per_minute=6000, safety_margin=1.0)
+
+    started = time.monotonic()
+    waits = await asyncio.gather(*[limiter.acquire('cancel_order') for _ in range(40)])
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.05
+    assert max(waits) < 5
+    stats = limiter.get_statistics()
+    assert stats['endpoints']['cancel_order']['count'] == 40
+    assert stats['throttled_requests'] == 0
+
+
+@pytest.mark.asyncio
+async def test_order_count_budget_throttles():
+    # 2 ордера на 10 секунд -> третий ордер ждет пополнения ведра
+    limiter = WeightedRateLimiter(orders_per_10s=2, safety_margin=1.0)
+    limiter.buckets['orders_10s'].refill_per_second = 20  # ускоряем пополнение для теста
+
+    await limiter.acquire('create_order')
+    await limiter.acquire('create_order')
+    wait_ms = await limiter.acquire('create_order')
+
+    assert wait_ms > 0
+    assert limiter.stats['throttled_requests'] == 1
+
+
+def test_used_weight_headers_correct_the_model():
+    limiter = WeightedRateLimiter(weight_per_minute=1200, safety_margin=1.0)
+
+    assert limiter.update_from_headers({'X-MBX-USED-WEIGHT-1M': '1100', 'Content-Type': 'json'})
+    assert limiter.buckets['request_weight'].tokens == pytest.approx(100, abs=1)
+    assert limiter.get_statistics()['buckets']['request_weight']['last_reported_used'] == 1100
+
+    # Меньший расход, чем насчитали мы, не дает лишних токенов
+    assert not limiter.update_from_headers({'x-mbx-used-weight-1m': '10'})
+    assert limiter.get_cost('fetch_order_book', 25) == {'request_weight': 25}
+    assert limiter.get_cost('create_order')['orders_10s'] == 1
+
+
+@pytest.mark.asyncio
+async def test_load_markets_is_single_request_charged_by_limiter(monkeypatch):
+    from infrastructure.connectors.exchange_connector import CcxtExchangeConnector
+
+    def load_config(self):
+        self.config = {}
+        self.rate_limiter = WeightedRateLimiter(weight_per_minute=6000, safety_margin=1.0)
+
+    monkeypatch.setattr(CcxtExchangeConnector, '_load_config', load_config)
+    connector = CcxtExchangeConnector()
+    connector.markets_cache = None
+
+    urls = []
+
+    async def fetch(url, method='GET', headers=None, body=None):
+        urls.append(url)
+        return {'timezone': 'UTC', 'serverTime': 0, 'symbols': []}
+
+    connector.async_client.fetch = fetch
+    try:
+        await connector.fetch_exchange_info()
+    finally:
+        await connector.close()
+
+    # Клиент без встроенного лимитера: все запросы load_markets должны быть учтены весом 20
+    assert len(urls) == 1 and 'exchangeInfo' in urls[0]
+    assert connector.rate_limiter.get_statistics()['endpoints']['load_markets']['count'] == 1
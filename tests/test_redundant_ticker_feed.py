@@ -0,0 +1,128 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from infrastructure.connectors.redundant_ticker_feed import RedundantTickerFeed, ticker_from_orderbook
+
+
+def tick(ts, last, seq=None):
+    return {'symbol': 'ETH/USDT', 'timestamp': ts, 'last': last, 'bid': last - 1, 'ask': last + 1,
+            'info': {'u': seq} if seq is not None else {}}
+
+
+def test_first_arrival_wins_and_duplicates_are_dropped():
+    feed = RedundantTickerFeed({'a': AsyncMock(), 'b': AsyncMock()})
+
+    assert feed.on_update('a', 'ETH/USDT', tick(1000, 2000.0, seq=1))
+    assert not feed.on_update('b', 'ETH/USDT', tick(1000, 2000.0, seq=1))
+    assert feed.on_update('b', 'ETH/USDT', tick(1001, 2001.0, seq=2))
+    assert not feed.on_update('a', 'ETH/USDT', tick(1001, 2001.0, seq=2))
+
+    # Устаревшее обновление (старше уже отправленного) не уходит дальше
+    assert not feed.on_update('a', 'ETH/USDT', tick(999, 1999.0, seq=0))
+
+    stats = feed.get_statistics()
+    assert stats['forwarded'] == 2
+    assert stats['feeds']['a']['win_rate'] == 50.0
+    assert stats['feeds']['b']['duplicates'] == 1
+    assert stats['feeds']['a']['stale'] == 1
+
+
+def test_dedup_window_is_bounded():
+    feed = RedundantTickerFeed({'a': AsyncMock()}, dedup_window=3)
+    for i in range(10):
+        feed.on_update('a', 'ETH/USDT', tick(1000 + i, 2000.0 + i))
+    assert len(feed._seen) == 3
+
+
+@pytest.mark.asyncio
+async def test_stalled_feed_does_not_block_stream():
+    async def stalled(symbol):
+        await asyncio.sleep(3600)
+
+    counter = iter(range(1, 1000))
+
+    async def live(symbol):
+        await asyncio.sleep(0.001)
+        i = next(counter)
+        return tick(1000 + i, 2000.0 + i, seq=i)
+
+    feed = RedundantTickerFeed({'stalled': stalled, 'live': live})
+    try:
+        first = await asyncio.wait_for(feed.watch_ticker('ETH/USDT'), timeout=1)
+        second = await asyncio.wait_for(feed.watch_ticker('ETH/USDT'), timeout=1)
+    finally:
+        await feed.stop()
+
+    assert first['feed'] == 'live' and second['last'] > first['last']
+    assert feed.get_statistics()['feeds']['stalled']['updates'] == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_feed_is_retried():
+    failing = AsyncMock(side_effect=Exception("connection reset"))
+
+    async def ok(symbol):
+        await asyncio.sleep(0.001)
+        return tick(1000, 2000.0)
+
+    feed = RedundantTickerFeed({'failing': failing, 'ok': ok}, retry_delay_seconds=0)
+    try:
+        ticker = await asyncio.wait_for(feed.watch_ticker('ETH/USDT'), timeout=1)
+    finally:
+        await feed.stop()
+
+    assert ticker['feed'] == 'ok'
+    assert feed.feed_stats['failing']['errors'] >= 1
+
+
+@pytest.mark.asyncio
+async def test_from_clients_derives_ticker_from_book():
+    client = MagicMock()
+    client.watch_order_book = AsyncMock(return_value={
+        'symbol': 'ETH/USDT', 'timestamp': 1000, 'bids': [[1999.0, 2.0]], 'asks': [[2001.0, 1.0]]
+    })
+    feed = RedundantTickerFeed.from_clients({'book': client}, {'book': 'book'})
+
+    ticker = await feed.feeds['book']('ETH/USDT')
+    assert ticker['last'] == 2000.0 and ticker['bid'] == 1999.0 and ticker['askVolume'] == 1.0
+    client.watch_order_book.assert_awaited_once_with('ETH/USDT', 5)
+    assert ticker_from_orderbook('ETH/USDT', {'bids': [], 'asks': []}) is None
+
+
+@pytest.mark.asyncio
+async def test_book_feed_does_not_race_real_tickers():
+    book_client = MagicMock()
+    book_client.watch_order_book = AsyncMock(return_value={
+        'symbol': 'ETH/USDT', 'timestamp': 5000, 'bids': [[1999.0, 2.0]], 'asks': [[2001.0, 1.0]]
+    })
+    counter = iter(range(1, 1000))
+
+    async def watch_ticker(symbol):
+        await asyncio.sleep(0.001)
+        i = next(counter)
+        return tick(1000 + i, 2000.0 + i, seq=i)
+
+    ticker_client = MagicMock()
+    ticker_client.watch_ticker = watch_ticker
+    feed = RedundantTickerFeed.from_clients({'primary': ticker_client, 'book_top': book_client},
+                                            {'book_top': 'book'})
+
+    # Тик стакана с более поздней меткой не уходит и не делает тикер "устаревшим"
+    book_tick = ticker_from_orderbook('ETH/USDT', await feed.feeds['book_top']('ETH/USDT'))
+    assert not feed.on_update('book_top', 'ETH/USDT', book_tick)
+    assert feed.on_update('primary', 'ETH/USDT', tick(1000, 2000.0, seq=100))
+
+    try:
+        received = [await asyncio.wait_for(feed.watch_ticker('ETH/USDT'), timeout=1) for _ in range(3)]
+    finally:
+        await feed.stop()
+
+    assert {t['feed'] for t in received} == {'primary'}
+    stats = feed.get_statistics()['feeds']
+    assert stats['book_top']['other_kind'] == 1 and stats['primary']['stale'] == 0
+    book_client.watch_order_book.assert_awaited_once()  # Поток стакана не запускался
@@ -0,0 +1,138 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from infrastructure.connectors.request_coalescer import RequestCoalescer
+from infrastructure.connectors.exchange_connector import CcxtExchangeConnector
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'last': 100.0}
+
+    results = await asyncio.gather(*[coalescer.run('fetch_ticker', 'ETHUSDT', fetch) for _ in range(10)])
+
+    assert len(calls) == 1
+    assert all(result == {'last': 100.0} for result in results)
+    stats = coalescer.get_statistics()
+    assert stats['misses'] == 1 and stats['coalesced'] == 9
+    assert stats['inflight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_and_errors_are_not_cached():
+    coalescer = RequestCoalescer(ttl_ms={'fetch_ticker': 1000})
+    fetch = AsyncMock(side_effect=[Exception("timeout"), {'last': 1.0}, {'last': 2.0}])
+
+    with pytest.raises(Exception):
+        await coalescer.run('fetch_ticker', 'ETHUSDT', fetch)
+    assert await coalescer.run('fetch_ticker', 'ETHUSDT', fetch) == {'last': 1.0}
+    assert await coalescer.run('fetch_ticker', 'ETHUSDT', fetch) == {'last': 1.0}
+
+    coalescer.invalidate('fetch_ticker', 'ETHUSDT')
+    assert await coalescer.run('fetch_ticker', 'ETHUSDT', fetch) == {'last': 2.0}
+    methods = coalescer.get_statistics()['methods']['fetch_ticker']
+    assert methods == {'requests': 4, 'cache_hits': 1, 'coalesced': 0, 'misses': 3, 'errors': 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    coalescer = RequestCoalescer()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return 42
+
+    first = asyncio.create_task(coalescer.run('fetch_order', '1', fetch))
+    second = asyncio.create_task(coalescer.run('fetch_order', '1', fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 42
+
+
+@pytest.mark.asyncio
+async def test_connector_coalesces_tickers_and_invalidates_after_cancel():
+    connector = CcxtExchangeConnector()
+    connector.coalescer = RequestCoalescer(ttl_ms={'fetch_order': 10000})
+
+    async def fetch_ticker(symbol):
+        await asyncio.sleep(0.01)
+        return {'symbol': symbol, 'last': 10.0}
+
+    client = MagicMock()
+    client.last_response_headers = None
+    client.fetch_ticker = AsyncMock(side_effect=fetch_ticker)
+    client.fetch_order = AsyncMock(side_effect=[{'id': '7', 'status': 'open'}, {'id': '7', 'status': 'canceled'}])
+    client.cancel_order = AsyncMock(return_value={'id': '7'})
+    connector.async_client = client
+
+    await asyncio.gather(*[connector.fetch_ticker("ETH/USDT") for _ in range(5)])
+    assert client.fetch_ticker.await_count == 1
+    assert connector.get_rate_limit_statistics()['endpoints']['fetch_ticker']['count'] == 1
+
+    assert (await connector.fetch_order('7', "ETH/USDT"))['status'] == 'open'
+    assert (await connector.fetch_order('7', "ETH/USDT"))['status'] == 'open'
+    await connector.cancel_order('7', "ETH/USDT")
+    assert (await connector.fetch_order('7', "ETH/USDT"))['status'] == 'canceled'
+    assert connector.get_coalescing_statistics()['saved_requests'] == 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_order_is_keyed_by_symbol_and_id():
+    connector = CcxtExchangeConnector()
+    connector.coalescer = RequestCoalescer(ttl_ms={'fetch_order': 10000})
+
+    async def fetch_order(order_id, symbol):
+        await asyncio.sleep(0.01)
+        return {'id': order_id, 'symbol': symbol}
+
+    client = MagicMock()
+    client.last_response_headers = None
+    client.fetch_order = AsyncMock(side_effect=fetch_order)
+    client.cancel_order = AsyncMock(return_value={'id': '7'})
+    connector.async_client = client
+
+    # Одинаковый id у ордеров разных символов: ни общего вызова, ни общего кеша
+    eth, btc = await asyncio.gather(connector.fetch_order('7', "ETH/USDT"), connector.fetch_order('7', "BTC/USDT"))
+    assert eth['symbol'] == "ETH/USDT" and btc['symbol'] == "BTC/USDT"
+    assert (await connector.fetch_order('7', "BTCUSDT"))['symbol'] == "BTC/USDT"
+    assert client.fetch_order.await_count == 2
+
+    # Отмена ордера одного символа сбрасывает только его кеш
+    await connector.cancel_order('7', "ETH/USDT")
+    await connector.fetch_order('7', "BTC/USDT")
+    await connector.fetch_order('7', "ETH/USDT")
+    assert client.fetch_order.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_invalidate_detaches_inflight_call():
+    coalescer = RequestCoalescer(ttl_ms={'fetch_balance': 10000})
+    results = iter([{'USDT': 100.0}, {'USDT': 40.0}])
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return next(results)
+
+    before = asyncio.create_task(coalescer.run('fetch_balance', None, fetch))
+    await asyncio.sleep(0)
+    coalescer.invalidate('fetch_balance')  # create_order изменил баланс, пока запрос в полете
+
+    # Запрос после изменения не присоединяется к старому вызову
+    after = await coalescer.run('fetch_balance', None, fetch)
+    assert await before == {'USDT': 100.0}
+    assert after == {'USDT': 40.0}
+    # И старый ответ не перезаписывает кеш
+    assert await coalescer.run('fetch_balance', None, fetch) == {'USDT': 40.0}
+    assert coalescer.get_statistics()['methods']['fetch_balance']['misses'] == 2
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from infrastructure.connectors import server_clock
+from infrastructure.connectors.server_clock import ServerClock, now_ms, set_default_clock
+
+
+def test_offset_from_lowest_rtt_samples():
+    clock = ServerClock(window=6)
+    # Истинное смещение +500ms; у медленных замеров асимметрия сети искажает оценку
+    clock.add_sample(local_send_ms=1000, server_ms=1510, rtt_ms=20)
+    clock.add_sample(local_send_ms=2000, server_ms=2505, rtt_ms=10)
+    clock.add_sample(local_send_ms=3000, server_ms=3900, rtt_ms=400)
+    clock.add_sample(local_send_ms=4000, server_ms=4850, rtt_ms=300)
+    assert not clock.add_sample(local_send_ms=5000, server_ms=9000, rtt_ms=5000)
+
+    assert clock.offset_ms == pytest.approx(500.0)
+    assert clock.rtt_ms == 10
+    stats = clock.get_statistics()
+    assert stats['rejected_samples'] == 1 and stats['window'] == 4
+
+
+@pytest.mark.asyncio
+async def test_sample_uses_connector_server_time_without_fallback():
+    connector = MagicMock()
+    connector.fetch_server_time = AsyncMock(return_value=int(time.time() * 1000) - 2000)
+    clock = ServerClock(connector)
+
+    assert await clock.sample()
+    assert clock.offset_ms == pytest.approx(-2000, abs=50)
+
+    connector.fetch_server_time = AsyncMock(side_effect=Exception("timeout"))
+    assert not await clock.sample()
+    assert clock.stats['errors'] == 1
+    assert clock.offset_ms == pytest.approx(-2000, abs=50)
+
+
+def test_default_clock_corrects_order_timestamps():
+    clock = ServerClock()
+    clock.add_sample(local_send_ms=time.time() * 1000, server_ms=time.time() * 1000 + 60000, rtt_ms=0)
+    set_default_clock(clock)
+    try:
+        order = Order(order_id=1, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT, price=1.0, amount=1.0)
+        assert order.created_at - time.time() * 1000 == pytest.approx(60000, abs=100)
+        assert now_ms() - order.created_at < 100
+        # Сделка на тех же часах, что и ордера
+        deal = Deal(deal_id=1, currency_pair_id='BTCUSDT', buy_order=order)
+        deal.close()
+        assert deal.created_at - time.time() * 1000 == pytest.approx(60000, abs=100)
+        assert deal.closed_at >= order.created_at
+    finally:
+        set_default_clock(None)
+
+    assert server_clock.get_default_clock() is None
+    assert abs(now_ms() - time.time() * 1000) < 100
+
+
+@pytest.mark.asyncio
+async def test_accepted_sample_sets_ccxt_time_difference():
+    signing = MagicMock()
+    signing.async_client.options = {}
+    connector = MagicMock()
+    connector.fetch_server_time = AsyncMock(return_value=int(time.time() * 1000) + 3000)
+    clock = ServerClock(connector, signing_connectors=[signing], max_rtt_ms=1000)
+
+    assert await clock.sample()
+    # ccxt: timestamp = milliseconds() - timeDifference -> часы биржи
+    assert signing.async_client.options['timeDifference'] == pytest.approx(-3000, abs=50)
+
+    assert not clock.add_sample(local_send_ms=0, server_ms=0, rtt_ms=5000)
+    assert signing.async_client.options['timeDifference'] == -int(clock.offset_ms)
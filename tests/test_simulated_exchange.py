@@ -0,0 +1,128 @@
+import sys
+import os
+import itertools
+import time
+import ccxt
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.currency_pair import CurrencyPair
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from domain.factories.deal_factory import DealFactory
+from domain.factories.order_factory import OrderFactory
+from domain.services.deals.deal_service import DealService
+from domain.services.orders.order_execution_service import OrderExecutionService
+from domain.services.orders.order_service import OrderService
+from infrastructure.connectors.simulated_exchange_connector import SimulatedExchangeConnector
+from infrastructure.repositories.deals_repository import InMemoryDealsRepository
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+
+
+def make_exchange(**kwargs):
+    exchange = SimulatedExchangeConnector(balances={'USDT': 100000.0, 'ETH': 100.0}, seed=1, **kwargs)
+    exchange.add_market("ETHUSDT", price=2000.0)
+    return exchange
+
+
+class CountingDealFactory(DealFactory):
+    _ids = itertools.count(1)
+
+    def create_new_deal(self, currency_pair: CurrencyPair, status: str = Deal.STATUS_OPEN) -> Deal:
+        buy_order = self.order_factory.create_buy_order(symbol=currency_pair.symbol, amount=0.0, price=0.0)
+        sell_order = self.order_factory.create_sell_order(symbol=currency_pair.symbol, amount=0.0, price=0.0)
+        return Deal(deal_id=next(self._ids), currency_pair_id=currency_pair.symbol, status=status,
+                    buy_order=buy_order, sell_order=sell_order)
+
+
+@pytest.mark.asyncio
+async def test_price_time_priority_on_replayed_trades():
+    exchange = make_exchange()
+    first = await exchange.create_order("ETHUSDT", "buy", "limit", 1.0, 1990.0)
+    second = await exchange.create_order("ETHUSDT", "buy", "limit", 1.0, 1990.0)
+    better = await exchange.create_order("ETHUSDT", "buy", "limit", 1.0, 1995.0)
+
+    trades = exchange.feed_price("ETHUSDT", 1989.0, amount=1.5)
+
+    assert [t['order'] for t in trades] == [better['id'], first['id']]
+    assert (await exchange.fetch_order(better['id'], "ETHUSDT"))['status'] == 'closed'
+    partial = await exchange.fetch_order(first['id'], "ETHUSDT")
+    assert partial['status'] == 'open' and partial['filled'] == pytest.approx(0.5)
+    assert (await exchange.fetch_order(second['id'], "ETHUSDT"))['filled'] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_crossing_orders_match_at_maker_price_and_settle_balances():
+    exchange = make_exchange(maker_fee=0.0, taker_fee=0.0)
+    await exchange.create_order("ETHUSDT", "sell", "limit", 2.0, 2001.0)
+    taker = await exchange.create_order("ETHUSDT", "buy", "limit", 1.0, 2010.0)
+
+    assert taker['status'] == 'closed'
+    assert taker['average'] == 2001.0
+    balance = await exchange.fetch_balance()
+    # Покупка заблокировала 2010, списано 2001 - разница вернулась в free
+    assert balance['USDT']['used'] == 0.0
+    assert balance['USDT']['total'] == pytest.approx(100000.0)
+    assert balance['ETH']['used'] == pytest.approx(1.0)
+    assert balance['ETH']['total'] == pytest.approx(100.0)
+
+    book = await exchange.fetch_orderbook("ETHUSDT", 5)
+    assert book['asks'][0][0] == 2001.0  # оставшаяся заявка мейкера - лучший аск
+    assert book['bids'][0][0] < book['asks'][0][0]
+
+
+@pytest.mark.asyncio
+async def test_cancel_releases_funds_and_unknown_orders_raise():
+    exchange = make_exchange()
+    order = await exchange.create_order("ETHUSDT", "buy", "limit", 1.0, 1900.0)
+    assert (await exchange.fetch_balance())['USDT']['used'] == pytest.approx(1900.0)
+
+    await exchange.cancel_order(order['id'], "ETHUSDT")
+    assert (await exchange.fetch_balance())['USDT']['free'] == pytest.approx(100000.0)
+    with pytest.raises(ccxt.OrderNotFound):
+        await exchange.cancel_order(order['id'], "ETHUSDT")
+    with pytest.raises(ccxt.InsufficientFunds):
+        await exchange.create_order("ETHUSDT", "sell", "limit", 1000.0, 2100.0)
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_exhaust_order_service_retries():
+    exchange = make_exchange(error_rate=1.0, error_endpoints=['create_order'])
+    service = OrderService(InMemoryOrdersRepository(), OrderFactory(), exchange)
+    service.retry_delay = 0
+
+    result = await service.create_and_place_buy_order("ETHUSDT", 0.01, 1990.0, deal_id=1)
+
+    assert not result.success
+    assert result.order.status == Order.STATUS_FAILED
+    assert exchange.stats['injected_errors'] == service.max_retries
+
+
+@pytest.mark.asyncio
+async def test_order_execution_service_load_against_simulator():
+    exchange = make_exchange()
+    orders_repo = InMemoryOrdersRepository()
+    order_factory = OrderFactory()
+    order_service = OrderService(orders_repo, order_factory, exchange)
+    deal_service = DealService(InMemoryDealsRepository(), order_service, CountingDealFactory(order_factory))
+    executor = OrderExecutionService(order_service, deal_service, exchange)
+
+    pair = CurrencyPair('ETH', 'USDT', deal_quota=50.0)
+    started = time.perf_counter()
+    for _ in range(250):
+        report = await executor.execute_trading_strategy(pair, (1990.0, 0.01, 2010.0, 0.01, {}))
+        assert report.success
+    elapsed = time.perf_counter() - started
+
+    assert exchange.stats['orders_created'] == 500
+    assert 500 / elapsed * 60 > 1000  # ордеров в минуту
+
+    await exchange.replay("ETHUSDT", [[0, 2000.0, 2015.0, 1985.0, 2012.0, 100.0]])
+    report = await executor.monitor_active_orders()
+
+    assert report['filled_orders'] == 500
+    assert not order_service.get_open_orders()
+    balance = await exchange.fetch_balance()
+    assert balance['ETH']['used'] == pytest.approx(0.0)
+    assert balance['USDT']['used'] == pytest.approx(0.0, abs=1e-6)
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from infrastructure.repositories.sqlite_repositories import create_sqlite_repositories
+
+
+def make_order(order_id, status=Order.STATUS_OPEN, symbol="BTCUSDT", deal_id=None):
+    return Order(
+        order_id=order_id,
+        side=Order.SIDE_BUY,
+        order_type=Order.TYPE_LIMIT,
+        price=100.0,
+        amount=1.0,
+        status=status,
+        symbol=symbol,
+        deal_id=deal_id,
+        metadata={'strategy': 'grid'}
+    )
+
+
+@pytest.fixture
+def repos(tmp_path):
+    orders_repo, deals_repo = create_sqlite_repositories(str(tmp_path / "trading.db"))
+    yield orders_repo, deals_repo
+    orders_repo.db.close()
+
+
+def test_save_and_get(repos):
+    repo, _ = repos
+    order = make_order(1)
+    repo.save(order)
+    assert repo.get_by_id(1) is order
+    assert repo.get_orders_by_symbol("BTCUSDT") == [order]
+    assert repo.get_open_orders() == [order]
+
+    order.mark_as_placed("ex-1")
+    repo.save(order)
+    assert repo.get_by_exchange_id("ex-1") is order
+    assert repo.get_open_orders() == [order]
+
+
+def test_bulk_update_and_delete_old(repos):
+    repo, _ = repos
+    o1 = make_order(1, status=Order.STATUS_OPEN)
+    o2 = make_order(2, status=Order.STATUS_OPEN)
+    repo.save(o1)
+    repo.save(o2)
+    repo.bulk_update_status([1, 2], Order.STATUS_CLOSED)
+    assert o1.status == Order.STATUS_CLOSED
+    assert repo.get_orders_by_status(Order.STATUS_CLOSED) == [o1, o2]
+
+    old_ts = int((datetime.now() - timedelta(days=2)).timestamp() * 1000)
+    o1.closed_at = old_ts
+    o2.closed_at = old_ts
+    assert repo.delete_old_orders(1) == 2
+    assert repo.get_all() == []
+
+
+def test_state_survives_reopen(tmp_path):
+    path = str(tmp_path / "trading.db")
+    orders_repo, deals_repo = create_sqlite_repositories(path)
+    buy = make_order(1, deal_id=7)
+    buy.created_at = int(datetime(2024, 1, 1).timestamp() * 1000)
+    orders_repo.save(buy)
+    deals_repo.save(Deal(deal_id=7, currency_pair_id='BTCUSDT', buy_order=buy))
+    deals_repo.save(Deal(deal_id=8, currency_pair_id='BTCUSDT', status=Deal.STATUS_CLOSED))
+    orders_repo.db.close()
+
+    # Новый процесс после падения
+    orders_repo, deals_repo = create_sqlite_repositories(path)
+    [deal] = deals_repo.get_open_deals()
+    assert deal.deal_id == 7 and deal.buy_order.metadata == {'strategy': 'grid'}
+    assert deal.buy_order is orders_repo.get_by_id(1)
+    assert orders_repo.get_all_by_deal(7) == [deal.buy_order]
+    assert orders_repo.get_orders_by_date_range(datetime(2023, 12, 31), datetime(2024, 1, 2)) == [deal.buy_order]
+    assert len(deals_repo.get_all()) == 2
+    assert orders_repo.get_statistics()['status_distribution'] == {Order.STATUS_OPEN: 1}
+    orders_repo.db.close()
+
+
+def test_batch_save_is_faster_than_single_saves(repos):
+    sqlite_repo, _ = repos
+    orders = [make_order(i + 1, symbol="BTCUSDT" if i % 2 else "ETHUSDT") for i in range(5000)]
+
+    started = time.perf_counter()
+    sqlite_repo.save_many(orders)
+    sqlite_batch_save = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for order in orders[:500]:
+        sqlite_repo.save(order)
+    sqlite_single_save = (time.perf_counter() - started) / 500 * len(orders)
+
+    assert len(sqlite_repo.get_orders_by_symbol("ETHUSDT")) == 2500
+    assert sqlite_batch_save < sqlite_single_save
+    assert sqlite_repo.get_statistics()['total_orders'] == 5000
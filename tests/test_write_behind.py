@@ -0,0 +1,137 @@
+import sys
+import os
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from domain.entities.deal import Deal
+from domain.entities.order import Order
+from domain.services.orders.order_execution_service import OrderExecutionService
+from infrastructure.repositories.orders_repository import InMemoryOrdersRepository
+from infrastructure.repositories.sqlite_repositories import create_sqlite_repositories
+from infrastructure.repositories.write_behind import (
+    WriteBehindQueue, WriteBehindOrdersRepository, WriteBehindDealsRepository
+)
+
+
+def make_order(order_id, status=Order.STATUS_OPEN):
+    return Order(order_id=order_id, side=Order.SIDE_BUY, order_type=Order.TYPE_LIMIT,
+                 price=100.0, amount=1.0, status=status, symbol="BTCUSDT")
+
+
+def test_saves_are_coalesced_and_flushed_in_batches():
+    backend = MagicMock(spec=['save', 'save_many'])
+    queue = WriteBehindQueue(batch_size=2)
+    repo = WriteBehindOrdersRepository(backend, queue, memory=InMemoryOrdersRepository())
+
+    order = make_order(1)
+    for status in (Order.STATUS_OPEN, Order.STATUS_PARTIALLY_FILLED, Order.STATUS_FILLED):
+        order.status = status
+        repo.save(order)
+    repo.save(make_order(2))
+    repo.save(make_order(3))
+
+    # Чтение из памяти, на диск ничего не ушло
+    assert repo.get_orders_by_status(Order.STATUS_FILLED) == [order]
+    backend.save_many.assert_not_called()
+
+    assert queue.flush() == 3
+    assert backend.save_many.call_count == 2
+    assert queue.stats['coalesced'] == 2 and queue.pending == 0
+
+
+def test_bounded_queue_flushes_inline_and_failed_batches_are_retried():
+    backend = MagicMock(spec=['save', 'save_many'])
+    backend.save_many.side_effect = [Exception("disk full"), None]
+    queue = WriteBehindQueue(max_pending=2)
+    repo = WriteBehindOrdersRepository(backend, queue)
+
+    repo.save(make_order(1))
+    repo.save(make_order(2))  # Достигнут лимит очереди
+    assert queue.stats['backpressure_flushes'] == 1
+    assert queue.stats['errors'] == 1 and queue.pending == 2
+
+    assert queue.flush() == 2
+    assert queue.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_background_flush_to_sqlite_and_reload(tmp_path):
+    path = str(tmp_path / "trading.db")
+    orders_backend, deals_backend = create_sqlite_repositories(path)
+    queue = WriteBehindQueue(max_latency_ms=10)
+    orders_repo = WriteBehindOrdersRepository(orders_backend, queue)
+    deals_repo = WriteBehindDealsRepository(deals_backend, queue)
+    await queue.start()
+
+    buy = make_order(1)
+    orders_repo.save(buy)
+    deals_repo.save(Deal(deal_id=1, currency_pair_id='BTCUSDT', buy_order=buy))
+    await asyncio.sleep(0.1)
+    assert queue.stats['flushed'] == 2
+
+    buy.status = Order.STATUS_FILLED
+    orders_repo.save(buy)
+    await queue.stop()  # Остаток дописывается при остановке
+    orders_backend.db.close()
+
+    orders_backend, deals_backend = create_sqlite_repositories(path)
+    orders_repo = WriteBehindOrdersRepository(orders_backend, WriteBehindQueue())
+    deals_repo = WriteBehindDealsRepository(deals_backend, orders_repo.queue)
+    assert orders_repo.load() == 1 and deals_repo.load() == 1
+    assert orders_repo.get_by_id(1).status == Order.STATUS_FILLED
+    assert deals_repo.get_open_deals()[0].buy_order is orders_repo.get_by_id(1)
+    orders_backend.db.close()
+
+
+@pytest.mark.asyncio
+async def test_emergency_stop_flushes_pending_writes():
+    queue = WriteBehindQueue()
+    backend = MagicMock(spec=['save', 'save_many'])
+    queue.enqueue(backend, 1, make_order(1))
+
+    order_service = MagicMock()
+    order_service.emergency_cancel_all_orders = AsyncMock(return_value=0)
+    order_service.get_open_orders.return_value = []
+    deal_service = MagicMock()
+    deal_service.get_open_deals.return_value = []
+    service = OrderExecutionService(order_service, deal_service, MagicMock(), persistence_queue=queue)
+
+    result = await service.emergency_stop_all_trading()
+    assert result['persisted_records'] == 1
+    backend.save_many.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_rows_are_built_on_the_loop_and_only_written_in_thread(tmp_path):
+    orders_backend, _ = create_sqlite_repositories(str(tmp_path / "trading.db"))
+    threads = {}
+    to_rows, save_rows = orders_backend.to_rows, orders_backend.save_rows
+
+    def recording_to_rows(orders):
+        threads['to_rows'] = threading.get_ident()
+        return to_rows(orders)
+
+    def recording_save_rows(rows):
+        threads['save_rows'] = threading.get_ident()
+        order.status = Order.STATUS_FILLED  # Ордер меняется, пока поток пишет
+        return save_rows(rows)
+
+    orders_backend.to_rows = recording_to_rows
+    orders_backend.save_rows = recording_save_rows
+    queue = WriteBehindQueue()
+    repo = WriteBehindOrdersRepository(orders_backend, queue)
+
+    order = make_order(1)
+    repo.save(order)
+    assert await queue.flush_async() == 1
+
+    assert threads['to_rows'] == threading.get_ident()
+    assert threads['save_rows'] != threading.get_ident()
+    # В базу ушел снимок на момент сбора пакета, а не полуизмененный объект
+    row = orders_backend.db.query("SELECT status FROM orders WHERE order_id = 1")
+    assert row == [(Order.STATUS_OPEN,)]
+    orders_backend.db.close()